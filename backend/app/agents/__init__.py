@@ -1,4 +1,20 @@
 from .agent import Agent, AgentRole
-from .orchestrator import SimulationOrchestrator
+from .orchestrator import SimulationOrchestrator, SimulationNotRunningError
+from .process_pool import ProcessPoolRunner, SimulationRecord
+from .sweep import AdaptiveSweep
+from .tree_search import TreeSearch
+from .rescore import RescoreJob
+from .archiver import Archiver
 
-__all__ = ["Agent", "AgentRole", "SimulationOrchestrator"]
+__all__ = [
+    "Agent",
+    "AgentRole",
+    "SimulationOrchestrator",
+    "SimulationNotRunningError",
+    "ProcessPoolRunner",
+    "SimulationRecord",
+    "AdaptiveSweep",
+    "TreeSearch",
+    "RescoreJob",
+    "Archiver"
+]
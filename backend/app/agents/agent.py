@@ -71,6 +71,17 @@ you can signal that you're ready for verification by including the phrase:
         if reasoning:
             self.reasoning_traces.append(reasoning)
 
+    def receive_message(self, incoming_message: Optional[str] = None):
+        """Add the other agent's message (or the start prompt) to history before a turn"""
+        if incoming_message:
+            # Format as MCP message for context
+            mcp_msg = self.mcp.create_request(incoming_message)
+            formatted_msg = self.mcp.format_for_llm(mcp_msg)
+            self.add_message_to_history("user", formatted_msg)
+        elif len(self.conversation_history) == 0:
+            # First turn with no incoming message - add a start prompt
+            self.add_message_to_history("user", "Begin working on your objective. You may start the conversation.")
+
     async def generate_response(self, incoming_message: Optional[str] = None) -> tuple[str, Optional[str], bool]:
         """
         Generate a response from this agent.
@@ -84,24 +95,17 @@ you can signal that you're ready for verification by including the phrase:
             - reasoning: Internal reasoning/thinking
             - should_verify: Whether the candidate agent wants to verify (candidate only)
         """
-        # Add incoming message to history if present
-        if incoming_message:
-            # Format as MCP message for context
-            mcp_msg = self.mcp.create_request(incoming_message)
-            formatted_msg = self.mcp.format_for_llm(mcp_msg)
-            self.add_message_to_history("user", formatted_msg)
-        elif len(self.conversation_history) == 0:
-            # First turn with no incoming message - add a start prompt
-            self.add_message_to_history("user", "Begin working on your objective. You may start the conversation.")
+        self.receive_message(incoming_message)
 
         # Generate response from LLM
         system_prompt = self._build_system_prompt()
-        content, reasoning = await self.llm_service.generate_response(
+        content, reasoning, _ = await self.llm_service.generate_response(
             model=self.config.model,
             system_prompt=system_prompt,
             messages=self.conversation_history,
             temperature=self.config.temperature,
-            max_tokens=self.config.max_tokens
+            max_tokens=self.config.max_tokens,
+            failover=self.config.failover_models
         )
 
         # Add response to history
@@ -127,41 +131,46 @@ you can signal that you're ready for verification by including the phrase:
 
         Yields:
             {"type": "content"|"reasoning", "delta": str, "should_verify": bool}
+            and a final {"type": "usage", "input_tokens": int, "output_tokens": int}
         """
-        # Add incoming message to history if present
-        if incoming_message:
-            mcp_msg = self.mcp.create_request(incoming_message)
-            formatted_msg = self.mcp.format_for_llm(mcp_msg)
-            self.add_message_to_history("user", formatted_msg)
-        elif len(self.conversation_history) == 0:
-            # First turn with no incoming message - add a start prompt
-            self.add_message_to_history("user", "Begin working on your objective. You may start the conversation.")
+        self.receive_message(incoming_message)
 
         # Generate streaming response from LLM
         system_prompt = self._build_system_prompt()
 
-        content_buffer = ""
-        reasoning_buffer = ""
+        content_parts: List[str] = []
+        reasoning_parts: List[str] = []
+        should_verify = False
+        # End of the content so far, enough to catch the marker split across chunks
+        tail = ""
 
         async for chunk in self.llm_service.generate_response_stream(
             model=self.config.model,
             system_prompt=system_prompt,
             messages=self.conversation_history,
             temperature=self.config.temperature,
-            max_tokens=self.config.max_tokens
+            max_tokens=self.config.max_tokens,
+            hedge_after_seconds=self.config.hedge_after_seconds,
+            hedge_adaptive=self.config.hedge_adaptive,
+            hedge_model=self.config.hedge_model,
+            failover=self.config.failover_models
         ):
             chunk_type = chunk["type"]
+            if chunk_type == "usage":
+                yield chunk
+                continue
+
             delta = chunk["delta"]
 
             if chunk_type == "content":
-                content_buffer += delta
+                content_parts.append(delta)
+                # Check for verification request in real-time
+                if self.role == AgentRole.CANDIDATE and not should_verify:
+                    window = tail + delta
+                    should_verify = "REQUEST_VERIFICATION" in window
+                    tail = window[-(len("REQUEST_VERIFICATION") - 1):]
             elif chunk_type == "reasoning":
-                reasoning_buffer += delta
-
-            # Check for verification request in real-time
-            should_verify = False
-            if self.role == AgentRole.CANDIDATE and "REQUEST_VERIFICATION" in content_buffer:
-                should_verify = True
+                reasoning_parts.append(delta)
 
             yield {
                 "type": chunk_type,
@@ -170,9 +179,66 @@ you can signal that you're ready for verification by including the phrase:
             }
 
         # Add complete response to history
-        self.add_message_to_history("assistant", content_buffer)
-        if reasoning_buffer:
-            self.add_reasoning_trace(reasoning_buffer)
+        self.add_message_to_history("assistant", "".join(content_parts))
+        if reasoning_parts:
+            self.add_reasoning_trace("".join(reasoning_parts))
+
+    async def complete_turn(
+        self,
+        incoming_message: Optional[str] = None
+    ) -> tuple[str, Optional[str], bool, Dict[str, int]]:
+        """
+        Take a turn without surfacing chunks (headless runs).
+        Consumes generate_response_stream, so hedging, failover and usage
+        reporting work the same, but only the finished response is returned.
+
+        Returns:
+            (content, reasoning, should_verify, usage) tuple
+        """
+        content_parts: List[str] = []
+        reasoning_parts: List[str] = []
+        should_verify = False
+        usage = {"input_tokens": 0, "output_tokens": 0}
+        async for chunk in self.generate_response_stream(incoming_message):
+            if chunk["type"] == "usage":
+                usage = {"input_tokens": chunk["input_tokens"], "output_tokens": chunk["output_tokens"]}
+                continue
+            if chunk["type"] == "content":
+                content_parts.append(chunk["delta"])
+            elif chunk["type"] == "reasoning":
+                reasoning_parts.append(chunk["delta"])
+            should_verify = chunk["should_verify"]
+
+        return "".join(content_parts), "".join(reasoning_parts) or None, should_verify, usage
+
+    async def sample_responses(
+        self,
+        n: int,
+        incoming_message: Optional[str] = None
+    ) -> tuple[List[tuple[str, Optional[str], bool]], Dict[str, int]]:
+        """
+        Sample n alternative responses for this turn, for branching.
+        Unlike generate_response, none of them is added to history.
+
+        Returns:
+            ([(content, reasoning, should_verify), ...], usage)
+        """
+        self.receive_message(incoming_message)
+
+        samples, usage = await self.llm_service.sample_responses(
+            model=self.config.model,
+            system_prompt=self._build_system_prompt(),
+            messages=self.conversation_history,
+            n=n,
+            temperature=self.config.temperature,
+            max_tokens=self.config.max_tokens,
+            failover=self.config.failover_models
+        )
+
+        return [
+            (content, reasoning, self.role == AgentRole.CANDIDATE and "REQUEST_VERIFICATION" in content)
+            for content, reasoning in samples
+        ], usage
 
     def get_conversation_history(self) -> List[Dict[str, str]]:
         """Get this agent's conversation history"""
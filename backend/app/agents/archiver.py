@@ -0,0 +1,67 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from app.agents.orchestrator import SimulationOrchestrator
+
+
+class Archiver:
+    """
+    Periodically moves simulations not updated for `max_age_seconds` out of
+    memory and into the orchestrator's archive.
+    """
+
+    def __init__(
+        self,
+        orchestrator: SimulationOrchestrator,
+        max_age_seconds: float = 24 * 3600,
+        interval_seconds: float = 3600
+    ):
+        self.orchestrator = orchestrator
+        self.max_age_seconds = max_age_seconds
+        self.interval_seconds = interval_seconds
+        self.total_archived = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_archived = 0
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start archiving in the background (call from inside the running loop)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def run_once(self, max_age_seconds: Optional[float] = None) -> int:
+        """Archive everything older than the threshold now; returns how many were moved"""
+        age = self.max_age_seconds if max_age_seconds is None else max_age_seconds
+        archived = await self.orchestrator.archive_simulations(datetime.now() - timedelta(seconds=age))
+        self.total_archived += archived
+        self.last_archived = archived
+        self.last_run_at = datetime.now()
+        return archived
+
+    def snapshot(self) -> Dict:
+        return {
+            "running": self._task is not None,
+            "max_age_seconds": self.max_age_seconds,
+            "interval_seconds": self.interval_seconds,
+            "total_archived": self.total_archived,
+            "last_archived": self.last_archived,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_error": self.last_error,
+        }
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+                self.last_error = None
+            except Exception as e:
+                # A full disk shouldn't stop later passes; the simulations stay in memory
+                self.last_error = str(e)
+            await asyncio.sleep(self.interval_seconds)
@@ -0,0 +1,68 @@
+import re
+from collections import deque
+from typing import Deque, FrozenSet, Optional
+
+_WORD_RE = re.compile(r"\w+")
+
+
+class LoopDetector:
+    """
+    Detects conversations stuck repeating themselves.
+
+    Each message is fingerprinted once, as the set of hashed word shingles
+    (n-grams), and only the last `window` fingerprints are kept. A new message
+    is compared against those by Jaccard similarity, so the per-turn cost is
+    independent of conversation length. The conversation counts as looping
+    once `patience` consecutive messages score at or above `threshold`.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        window: int = 4,
+        patience: int = 2,
+        shingle_size: int = 3
+    ):
+        self.threshold = threshold
+        self.patience = patience
+        self.shingle_size = shingle_size
+        self._fingerprints: Deque[FrozenSet[int]] = deque(maxlen=window)
+        self._streak = 0
+        self.last_similarity = 0.0
+
+    def fingerprint(self, text: str) -> FrozenSet[int]:
+        """Hashed word n-grams of a message (unigrams for very short ones)"""
+        words = _WORD_RE.findall(text.lower())
+        n = self.shingle_size if len(words) >= self.shingle_size else 1
+        return frozenset(
+            hash(tuple(words[i:i + n]))
+            for i in range(len(words) - n + 1)
+        )
+
+    def add(self, text: str) -> Optional[float]:
+        """
+        Record a message; returns its highest similarity to the recent window
+        (None if there was nothing to compare against).
+        """
+        current = self.fingerprint(text)
+        similarity = None
+
+        for previous in self._fingerprints:
+            union = len(current | previous)
+            score = len(current & previous) / union if union else 1.0
+            if similarity is None or score > similarity:
+                similarity = score
+
+        self._fingerprints.append(current)
+        self.last_similarity = similarity or 0.0
+
+        if similarity is not None and similarity >= self.threshold:
+            self._streak += 1
+        else:
+            self._streak = 0
+
+        return similarity
+
+    @property
+    def is_looping(self) -> bool:
+        return self._streak >= self.patience
@@ -1,5 +1,7 @@
+import asyncio
 import uuid
-from typing import Dict, Optional, AsyncIterator
+import weakref
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, AsyncIterator, Iterator, Tuple
 from datetime import datetime
 
 from app.models import (
@@ -8,11 +10,102 @@ from app.models import (
     SimulationStatus,
     Message,
     MessageRole,
+    TerminationReason,
     VerificationResult
 )
 from app.services import LLMService
 from app.agents.agent import Agent, AgentRole
+from app.agents.loop_detector import LoopDetector
 from app.verification import Verifier
+from app.storage import ResultsStore, SimulationArchive, TranscriptIndex
+
+# Queue markers used by _RunControl.stream
+_STREAM_END = object()
+_STREAM_INTERRUPTED = object()
+
+
+class SimulationInterrupted(Exception):
+    """Raised inside a run when it was cancelled or hit a deadline"""
+
+    def __init__(self, reason: TerminationReason):
+        super().__init__(reason.value)
+        self.reason = reason
+
+
+class SimulationNotRunningError(Exception):
+    """Raised when cancelling a simulation that isn't running"""
+
+
+class _RunControl:
+    """
+    Interrupt handle for one run_simulation call.
+
+    Provider streams are pumped by a task so that interrupt() can cancel it
+    directly, which closes the underlying HTTP stream at once instead of
+    waiting for the next chunk to be pulled.
+    """
+
+    def __init__(self):
+        self.reason: Optional[TerminationReason] = None
+        self._task: Optional[asyncio.Task] = None
+        self._queue: Optional[asyncio.Queue] = None
+
+    def interrupt(self, reason: TerminationReason):
+        if self.reason is not None:
+            return
+        self.reason = reason
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        if self._queue is not None:
+            self._queue.put_nowait(_STREAM_INTERRUPTED)
+
+    def check(self):
+        if self.reason is not None:
+            raise SimulationInterrupted(self.reason)
+
+    async def stream(self, source: AsyncIterator[Dict]) -> AsyncIterator[Dict]:
+        """Iterate a stream that can be interrupted at any point"""
+        self.check()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def pump():
+            try:
+                async for item in source:
+                    queue.put_nowait(item)
+                queue.put_nowait(_STREAM_END)
+            except Exception as e:
+                queue.put_nowait(e)
+
+        self._task = asyncio.create_task(pump())
+        self._queue = queue
+        try:
+            while True:
+                item = await queue.get()
+                if item is _STREAM_END:
+                    return
+                if item is _STREAM_INTERRUPTED:
+                    raise SimulationInterrupted(self.reason)
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            self._task.cancel()
+            self._task = None
+            self._queue = None
+
+    async def run(self, awaitable: Awaitable[Any]) -> Any:
+        """Await a coroutine that can be interrupted at any point"""
+        self.check()
+        task = asyncio.ensure_future(awaitable)
+        self._task = task
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if self.reason is not None and task.cancelled():
+                raise SimulationInterrupted(self.reason)
+            raise
+        finally:
+            self._task = None
 
 
 class SimulationOrchestrator:
@@ -21,10 +114,40 @@ class SimulationOrchestrator:
     Manages turn-taking, message passing, and verification.
     """
 
-    def __init__(self):
-        self.llm_service = LLMService()
+    def __init__(
+        self,
+        llm_service: Optional[LLMService] = None,
+        results_store: Optional[ResultsStore] = None,
+        search_index: Optional[TranscriptIndex] = None,
+        archive: Optional[SimulationArchive] = None
+    ):
+        self.llm_service = llm_service or LLMService()
         self.verifier = Verifier(self.llm_service)
         self.active_simulations: Dict[str, SimulationState] = {}
+        # Optional indexed summary of every finished run
+        self.results_store = results_store
+        # Optional full-text index over message content and reasoning
+        self.search_index = search_index
+        # Optional cold storage that old simulations are moved out of memory into
+        self.archive = archive
+        # Interrupt handles for simulations currently running
+        self._run_controls: Dict[str, _RunControl] = {}
+        # Simulations background jobs are modifying, kept out of the archive (ID -> holders)
+        self._pinned: Dict[str, int] = {}
+        # One shared instance per distinct config, dropped when no state uses it
+        self._configs: "weakref.WeakValueDictionary[str, SimulationConfig]" = weakref.WeakValueDictionary()
+
+    def intern_config(self, config: SimulationConfig) -> SimulationConfig:
+        """The shared instance of a config with this content"""
+        content_hash = config.content_hash()
+        shared = self._configs.get(content_hash)
+        if shared is None:
+            shared = self._configs[content_hash] = config
+        return shared
+
+    def get_config(self, content_hash: str) -> Optional[SimulationConfig]:
+        """A config by content hash, if any stored simulation uses it"""
+        return self._configs.get(content_hash)
 
     def create_simulation(self, config: SimulationConfig) -> str:
         """
@@ -32,10 +155,12 @@ class SimulationOrchestrator:
         Returns: simulation_id
         """
         simulation_id = str(uuid.uuid4())
+        config = self.intern_config(config)
 
         state = SimulationState(
             simulation_id=simulation_id,
             config=config,
+            config_hash=config.content_hash(),
             status=SimulationStatus.IDLE,
             messages=[],
             current_turn=0
@@ -45,15 +170,181 @@ class SimulationOrchestrator:
         return simulation_id
 
     def get_simulation(self, simulation_id: str) -> Optional[SimulationState]:
-        """Get simulation state by ID"""
-        return self.active_simulations.get(simulation_id)
+        """Get simulation state by ID; archived simulations are read from the archive"""
+        state = self.active_simulations.get(simulation_id)
+        if state is None and self.archive is not None:
+            state = self.archive.load(simulation_id)
+            if state is not None:
+                state.config = self.intern_config(state.config)
+        return state
+
+    def running_simulation_ids(self) -> List[str]:
+        """IDs of the simulations running right now, however they were started"""
+        return list(self._run_controls)
+
+    def restore_simulation(self, simulation_id: str) -> Optional[SimulationState]:
+        """
+        Get a simulation to modify, moving it back into memory if it was archived.
+        It is archived again once it is old enough.
+        """
+        state = self.active_simulations.get(simulation_id)
+        if state is None and self.archive is not None:
+            state = self.get_simulation(simulation_id)
+            if state is not None:
+                self.active_simulations[simulation_id] = state
+        return state
+
+    def pin(self, simulation_ids: Iterable[str]):
+        """Keep simulations in memory (out of the archive) until unpinned"""
+        for simulation_id in simulation_ids:
+            self._pinned[simulation_id] = self._pinned.get(simulation_id, 0) + 1
+
+    def unpin(self, simulation_ids: Iterable[str]):
+        for simulation_id in simulation_ids:
+            holders = self._pinned.get(simulation_id, 0) - 1
+            if holders > 0:
+                self._pinned[simulation_id] = holders
+            else:
+                self._pinned.pop(simulation_id, None)
+
+    async def archive_simulations(self, before: datetime, batch_size: int = 500) -> int:
+        """
+        Move simulations last updated before a time from memory into the archive.
+        Running and pinned simulations are skipped. Batches are compressed and written
+        off the event loop. Returns how many were archived.
+        """
+        if self.archive is None:
+            raise ValueError("Archive is not configured")
+
+        states = [
+            state for state in list(self.active_simulations.values())
+            if state.status != SimulationStatus.RUNNING
+            and state.updated_at < before
+            and state.simulation_id not in self._pinned
+        ]
+        archived = 0
+        for i in range(0, len(states), batch_size):
+            batch = states[i:i + batch_size]
+            await asyncio.to_thread(self.archive.append, batch)
+            for state in batch:
+                # Keep the in-memory copy if it was replaced, edited or started meanwhile
+                if (
+                    self.active_simulations.get(state.simulation_id) is state
+                    and state.status != SimulationStatus.RUNNING
+                    and state.updated_at < before
+                    and state.simulation_id not in self._pinned
+                ):
+                    del self.active_simulations[state.simulation_id]
+                    archived += 1
+        return archived
+
+    def iter_simulations(
+        self,
+        status: Optional[SimulationStatus] = None,
+        model: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        success: Optional[bool] = None,
+        config_hash: Optional[str] = None,
+        include_archived: bool = False
+    ) -> Iterator[SimulationState]:
+        """
+        Iterate over stored simulations matching the given filters.
+        Works from a snapshot of the IDs so new simulations can be created meanwhile.
+        With include_archived, archived simulations follow the in-memory ones.
+        """
+        def matches(state: SimulationState) -> bool:
+            if status is not None and state.status != status:
+                return False
+            if config_hash is not None and state.config_hash != config_hash:
+                return False
+            if model is not None and model not in (
+                state.config.candidate_config.model,
+                state.config.sim_config.model
+            ):
+                return False
+            if created_after is not None and state.created_at < created_after:
+                return False
+            if created_before is not None and state.created_at >= created_before:
+                return False
+            if success is not None and (
+                state.verification_result is None
+                or state.verification_result.success != success
+            ):
+                return False
+            return True
+
+        simulation_ids = list(self.active_simulations.keys())
+        for simulation_id in simulation_ids:
+            state = self.active_simulations.get(simulation_id)
+            if state is not None and matches(state):
+                yield state
+
+        if include_archived and self.archive is not None:
+            for state in self.archive.iter_states(exclude=set(simulation_ids)):
+                if matches(state):
+                    yield state
+
+    def import_simulation(
+        self,
+        state: SimulationState,
+        overwrite: bool = False,
+        record: bool = True
+    ) -> bool:
+        """
+        Store a previously exported simulation.
+        Returns False if the ID already exists and overwrite is not set.
+        A state exported mid-run is stored as cancelled, since nothing here
+        is running it. With record=False the caller is responsible for the results store
+        and search index (e.g. to write a whole batch at once).
+        """
+        existing = self.active_simulations.get(state.simulation_id)
+        if existing is not None:
+            if not overwrite:
+                return False
+            if existing.status == SimulationStatus.RUNNING:
+                raise ValueError(f"Simulation {state.simulation_id} is running")
+        elif not overwrite and self.archive is not None and self.archive.contains(state.simulation_id):
+            return False
+
+        if state.status == SimulationStatus.RUNNING:
+            state.status = SimulationStatus.CANCELLED
+            state.termination_reason = TerminationReason.CANCELLED
+        state.config = self.intern_config(state.config)
+        state.config_hash = state.config.content_hash()
+        self.active_simulations[state.simulation_id] = state
+        if record and self.results_store is not None:
+            self.results_store.record(state)
+        if record and self.search_index is not None:
+            self.search_index.index_simulations([state])
+        return True
+
+    def cancel_simulation(self, simulation_id: str):
+        """
+        Stop a running simulation.
+        The in-flight provider stream is closed immediately; the run itself
+        finishes with a simulation_cancelled event and CANCELLED status.
+        """
+        state = self.active_simulations.get(simulation_id)
+        if not state:
+            raise ValueError(f"Simulation {simulation_id} not found")
+
+        control = self._run_controls.get(simulation_id)
+        if control is None:
+            raise SimulationNotRunningError(f"Simulation {simulation_id} is not running")
 
-    async def run_simulation(self, simulation_id: str) -> AsyncIterator[Dict]:
+        control.interrupt(TerminationReason.CANCELLED)
+
+    async def run_simulation(self, simulation_id: str, headless: bool = False) -> AsyncIterator[Dict]:
         """
         Run a simulation turn-by-turn.
         Yields state updates as they happen.
+
+        Headless runs (batch jobs nobody watches) skip the per-chunk path:
+        each turn and the verification are collected whole, and only
+        turn-level, message_complete and verification events are yielded.
         """
-        state = self.active_simulations.get(simulation_id)
+        state = self.restore_simulation(simulation_id)
         if not state:
             raise ValueError(f"Simulation {simulation_id} not found")
 
@@ -62,8 +353,59 @@ class SimulationOrchestrator:
 
         # Update status
         state.status = SimulationStatus.RUNNING
-        state.updated_at = datetime.now()
-        yield {"type": "status", "status": "running"}
+        state.updated_at = state.started_at = datetime.now()
+        state.finished_at = None
+
+        control = _RunControl()
+        self._run_controls[simulation_id] = control
+        deadline = None
+        if state.config.timeout_seconds:
+            deadline = asyncio.get_running_loop().call_later(
+                state.config.timeout_seconds, control.interrupt, TerminationReason.SIMULATION_DEADLINE
+            )
+
+        try:
+            yield {"type": "status", "status": "running"}
+
+            async for event in self._run_turns(state, control, headless):
+                yield event
+        except SimulationInterrupted as e:
+            state.termination_reason = e.reason
+            if e.reason == TerminationReason.CANCELLED:
+                state.status = SimulationStatus.CANCELLED
+                yield {"type": "simulation_cancelled"}
+            else:
+                state.status = SimulationStatus.FAILED
+                yield {"type": "error", "message": self._describe_interrupt(state, e.reason)}
+        except (GeneratorExit, asyncio.CancelledError):
+            # The consumer went away (e.g. the client disconnected)
+            state.status = SimulationStatus.CANCELLED
+            state.termination_reason = TerminationReason.CANCELLED
+            raise
+        except Exception:
+            state.status = SimulationStatus.FAILED
+            state.termination_reason = TerminationReason.ERROR
+            raise
+        finally:
+            if deadline:
+                deadline.cancel()
+            # Make sure nothing keeps streaming from the provider
+            control.interrupt(TerminationReason.CANCELLED)
+            self._run_controls.pop(simulation_id, None)
+            state.updated_at = state.finished_at = datetime.now()
+            if self.results_store is not None:
+                self.results_store.record_in_background(state)
+            if self.search_index is not None:
+                self.search_index.flush()
+
+    async def _run_turns(
+        self,
+        state: SimulationState,
+        control: "_RunControl",
+        headless: bool = False
+    ) -> AsyncIterator[Dict]:
+        """Turn loop and verification for run_simulation"""
+        loop = asyncio.get_running_loop()
 
         # Create agents
         candidate_agent = Agent(
@@ -87,9 +429,19 @@ class SimulationOrchestrator:
 
         last_message = None
         should_verify = False
+        state.termination_reason = TerminationReason.MAX_TURNS
+
+        loop_detector = None
+        if state.config.loop_similarity_threshold is not None:
+            loop_detector = LoopDetector(
+                threshold=state.config.loop_similarity_threshold,
+                window=state.config.loop_window,
+                patience=state.config.loop_patience
+            )
 
         # Run turns
         while state.current_turn < state.config.max_turns and not should_verify:
+            control.check()
             state.current_turn += 1
             turn_number = state.current_turn
 
@@ -107,30 +459,50 @@ class SimulationOrchestrator:
                 "speaker": current_speaker.value
             }
 
-            # Generate response (streaming)
+            # Generate response (streamed, or collected whole when headless)
             content = ""
             reasoning = ""
 
-            async for chunk in agent.generate_response_stream(last_message):
-                if chunk["type"] == "content":
-                    content += chunk["delta"]
-                    yield {
-                        "type": "content_delta",
-                        "speaker": role.value,
-                        "delta": chunk["delta"],
-                        "turn": turn_number
-                    }
-                elif chunk["type"] == "reasoning":
-                    reasoning += chunk["delta"]
-                    yield {
-                        "type": "reasoning_delta",
-                        "speaker": role.value,
-                        "delta": chunk["delta"],
-                        "turn": turn_number
-                    }
-
-                if chunk.get("should_verify"):
-                    should_verify = True
+            turn_deadline = None
+            if state.config.turn_timeout_seconds:
+                turn_deadline = loop.call_later(
+                    state.config.turn_timeout_seconds, control.interrupt, TerminationReason.TURN_DEADLINE
+                )
+
+            try:
+                if headless:
+                    content, reasoning, should_verify, usage = await control.run(
+                        agent.complete_turn(last_message)
+                    )
+                    state.usage.input_tokens += usage["input_tokens"]
+                    state.usage.output_tokens += usage["output_tokens"]
+                else:
+                    async for chunk in control.stream(agent.generate_response_stream(last_message)):
+                        if chunk["type"] == "content":
+                            content += chunk["delta"]
+                            yield {
+                                "type": "content_delta",
+                                "speaker": role.value,
+                                "delta": chunk["delta"],
+                                "turn": turn_number
+                            }
+                        elif chunk["type"] == "reasoning":
+                            reasoning += chunk["delta"]
+                            yield {
+                                "type": "reasoning_delta",
+                                "speaker": role.value,
+                                "delta": chunk["delta"],
+                                "turn": turn_number
+                            }
+                        elif chunk["type"] == "usage":
+                            state.usage.input_tokens += chunk["input_tokens"]
+                            state.usage.output_tokens += chunk["output_tokens"]
+
+                        if chunk.get("should_verify"):
+                            should_verify = True
+            finally:
+                if turn_deadline:
+                    turn_deadline.cancel()
 
             # Create message record
             message = Message(
@@ -140,6 +512,8 @@ class SimulationOrchestrator:
                 turn_number=turn_number
             )
             state.messages.append(message)
+            if self.search_index is not None:
+                self.search_index.add_message(state.simulation_id, message)
 
             yield {
                 "type": "message_complete",
@@ -158,17 +532,48 @@ class SimulationOrchestrator:
 
             # Check if verification was requested
             if should_verify:
+                state.termination_reason = TerminationReason.VERIFICATION_REQUESTED
                 yield {"type": "verification_requested"}
                 break
 
+            # Stop degenerate conversations instead of running to max_turns
+            if loop_detector is not None:
+                loop_detector.add(content)
+                if loop_detector.is_looping:
+                    state.termination_reason = TerminationReason.LOOP_DETECTED
+                    yield {
+                        "type": "loop_detected",
+                        "turn": turn_number,
+                        "similarity": loop_detector.last_similarity
+                    }
+                    break
+
         # Run verification if requested or max turns reached
+        control.check()
         yield {"type": "verification_start"}
 
-        verification_result = await self.verifier.verify(
+        # Stream the judge's output so the verdict shows up before the explanation is done
+        verification_result = None
+        events = self.verifier.verify_stream(
             candidate_objective=state.config.candidate_config.objective,
             verification_prompt=state.config.verification_prompt,
-            conversation_history=state.messages
+            conversation_history=state.messages,
+            judges=state.config.judges,
+            vote_method=state.config.judge_vote
         )
+        if headless:
+            verification_result = await control.run(self._collect_verification(state, events))
+        else:
+            async for event in control.stream(events):
+                if event["type"] == "delta":
+                    yield {"type": "verification_delta", "delta": event["delta"]}
+                elif event["type"] == "verdict":
+                    yield {"type": "verification_verdict", "success": event["success"]}
+                elif event["type"] == "usage":
+                    state.usage.input_tokens += event["input_tokens"]
+                    state.usage.output_tokens += event["output_tokens"]
+                elif event["type"] == "result":
+                    verification_result = event["result"]
 
         state.verification_result = verification_result
         state.status = SimulationStatus.COMPLETED
@@ -179,7 +584,63 @@ class SimulationOrchestrator:
             "result": verification_result.model_dump(mode='json')
         }
 
-        yield {"type": "simulation_complete"}
+        yield {
+            "type": "simulation_complete",
+            "termination_reason": state.termination_reason.value,
+            "usage": state.usage.model_dump()
+        }
+
+    def replay_agents(self, config: SimulationConfig, messages: List[Message]) -> Tuple[Agent, Agent]:
+        """
+        Candidate and sim agents with the histories a live run would have
+        built over `messages`, ready to take the next turn (for branching).
+        """
+        candidate_agent = Agent(
+            role=AgentRole.CANDIDATE,
+            config=config.candidate_config,
+            llm_service=self.llm_service
+        )
+        sim_agent = Agent(
+            role=AgentRole.SIM,
+            config=config.sim_config,
+            llm_service=self.llm_service
+        )
+
+        last_message = None
+        for message in messages:
+            agent = candidate_agent if message.role == MessageRole.CANDIDATE else sim_agent
+            agent.receive_message(last_message)
+            agent.add_message_to_history("assistant", message.content)
+            if message.reasoning:
+                agent.add_reasoning_trace(message.reasoning)
+            last_message = message.content
+
+        return candidate_agent, sim_agent
+
+    async def _collect_verification(
+        self,
+        state: SimulationState,
+        events: AsyncIterator[Dict]
+    ) -> VerificationResult:
+        """Drain verify_stream without surfacing deltas (headless runs)"""
+        result = None
+        async for event in events:
+            if event["type"] == "usage":
+                state.usage.input_tokens += event["input_tokens"]
+                state.usage.output_tokens += event["output_tokens"]
+            elif event["type"] == "result":
+                result = event["result"]
+        return result
+
+    def _describe_interrupt(self, state: SimulationState, reason: TerminationReason) -> str:
+        if reason == TerminationReason.TURN_DEADLINE:
+            return (
+                f"Turn {state.current_turn} exceeded the "
+                f"{state.config.turn_timeout_seconds}s turn deadline"
+            )
+        if reason == TerminationReason.SIMULATION_DEADLINE:
+            return f"Simulation exceeded the {state.config.timeout_seconds}s deadline"
+        return f"Simulation interrupted: {reason.value}"
 
     async def run_single_turn(
         self,
@@ -191,7 +652,7 @@ class SimulationOrchestrator:
         Run a single turn manually (for editing/rerunning).
         Returns the generated message.
         """
-        state = self.active_simulations.get(simulation_id)
+        state = self.restore_simulation(simulation_id)
         if not state:
             raise ValueError(f"Simulation {simulation_id} not found")
 
@@ -251,7 +712,7 @@ class SimulationOrchestrator:
         new_reasoning: Optional[str] = None
     ):
         """Update a message in place (for editing)"""
-        state = self.active_simulations.get(simulation_id)
+        state = self.restore_simulation(simulation_id)
         if not state:
             raise ValueError(f"Simulation {simulation_id} not found")
 
@@ -262,13 +723,15 @@ class SimulationOrchestrator:
                 if new_reasoning is not None:
                     message.reasoning = new_reasoning
                 state.updated_at = datetime.now()
+                if self.search_index is not None:
+                    self.search_index.replace_message(simulation_id, message)
                 return
 
         raise ValueError(f"Message with turn {turn_number} not found")
 
     def delete_messages_from(self, simulation_id: str, turn_number: int):
         """Delete all messages from a specific turn onwards (for rerunning)"""
-        state = self.active_simulations.get(simulation_id)
+        state = self.restore_simulation(simulation_id)
         if not state:
             raise ValueError(f"Simulation {simulation_id} not found")
 
@@ -278,3 +741,5 @@ class SimulationOrchestrator:
         ]
         state.current_turn = turn_number - 1
         state.updated_at = datetime.now()
+        if self.search_index is not None:
+            self.search_index.delete_messages_from(simulation_id, turn_number)
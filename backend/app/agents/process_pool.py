@@ -0,0 +1,201 @@
+import asyncio
+import multiprocessing
+import os
+import queue
+import threading
+from typing import AsyncIterator, Iterable, NamedTuple, Optional, Tuple
+
+from app.models import SimulationConfig, SimulationStatus
+from app.services import LLMService, SharedRateLimiter
+from app.agents.orchestrator import SimulationOrchestrator
+
+
+class SimulationRecord(NamedTuple):
+    """
+    Compact result sent from a worker process back to the parent.
+    The state is already serialized so the parent never re-validates it.
+    `error` says why a FAILED run raised.
+    """
+    key: str
+    simulation_id: str
+    status: str
+    input_tokens: int
+    output_tokens: int
+    state_json: str
+    error: Optional[str] = None
+
+
+def _worker_main(
+    job_queue,
+    result_queue,
+    concurrency: int,
+    rate_limiter: Optional[SharedRateLimiter]
+):
+    """Entry point of a worker process: one event loop, one LLMService"""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    asyncio.run(_worker_loop(job_queue, result_queue, concurrency, rate_limiter))
+
+
+async def _worker_loop(
+    job_queue,
+    result_queue,
+    concurrency: int,
+    rate_limiter: Optional[SharedRateLimiter]
+):
+    orchestrator = SimulationOrchestrator(LLMService(rate_limiter=rate_limiter))
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    tasks = set()
+
+    async def run_job(key: str, config_json: str):
+        try:
+            config = SimulationConfig.model_validate_json(config_json)
+            simulation_id = orchestrator.create_simulation(config)
+        except Exception as e:
+            result_queue.put(("error", key, str(e)))
+            return
+
+        state = orchestrator.get_simulation(simulation_id)
+        error = None
+        try:
+            async for _ in orchestrator.run_simulation(simulation_id, headless=True):
+                pass
+        except Exception as e:
+            state.status = SimulationStatus.FAILED
+            error = str(e)
+
+        result_queue.put(SimulationRecord(
+            key=key,
+            simulation_id=simulation_id,
+            status=state.status.value,
+            input_tokens=state.usage.input_tokens,
+            output_tokens=state.usage.output_tokens,
+            state_json=state.model_dump_json(),
+            error=error
+        ))
+        orchestrator.active_simulations.pop(simulation_id, None)
+
+    while True:
+        await semaphore.acquire()
+        # Blocking queue read happens off the event loop
+        job = await loop.run_in_executor(None, job_queue.get)
+        if job is None:
+            semaphore.release()
+            break
+
+        task = asyncio.create_task(run_job(*job))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        task.add_done_callback(lambda _: semaphore.release())
+
+    if tasks:
+        await asyncio.gather(*tasks)
+
+
+class ProcessPoolRunner:
+    """
+    Shards simulations across a pool of worker processes.
+
+    Each worker runs its own asyncio loop, SimulationOrchestrator and LLMService
+    (and therefore its own connection pool), so JSON encoding, validation and
+    stream parsing spread over all cores. Workers share one request budget via
+    SharedRateLimiter and send back compact SimulationRecords.
+    """
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        concurrency_per_process: int = 16,
+        requests_per_minute: Optional[float] = None
+    ):
+        self.processes = processes or os.cpu_count() or 1
+        self.concurrency_per_process = concurrency_per_process
+        self._ctx = multiprocessing.get_context("spawn")
+        self.rate_limiter = (
+            SharedRateLimiter(requests_per_minute, context=self._ctx)
+            if requests_per_minute else None
+        )
+
+    async def run(
+        self,
+        jobs: Iterable[Tuple[str, SimulationConfig]]
+    ) -> AsyncIterator[SimulationRecord]:
+        """
+        Run (key, config) jobs and yield a SimulationRecord for each as it completes.
+        Jobs are fed lazily so large inputs are never fully materialized.
+        """
+        job_queue = self._ctx.Queue()
+        result_queue = self._ctx.Queue()
+        workers = [
+            self._ctx.Process(
+                target=_worker_main,
+                args=(job_queue, result_queue, self.concurrency_per_process, self.rate_limiter),
+                daemon=True
+            )
+            for _ in range(self.processes)
+        ]
+        for worker in workers:
+            worker.start()
+
+        loop = asyncio.get_running_loop()
+        results: asyncio.Queue = asyncio.Queue()
+        stop_reader = threading.Event()
+
+        def read_results():
+            # Forward records from the multiprocessing queue onto the event loop,
+            # watching for workers that die without reporting back
+            while not stop_reader.is_set():
+                try:
+                    item = result_queue.get(timeout=0.5)
+                except queue.Empty:
+                    crashed = [w for w in workers if w.exitcode not in (None, 0)]
+                    if crashed:
+                        error = RuntimeError(f"Worker process exited with code {crashed[0].exitcode}")
+                        loop.call_soon_threadsafe(results.put_nowait, error)
+                        return
+                    continue
+                loop.call_soon_threadsafe(results.put_nowait, item)
+
+        reader = threading.Thread(target=read_results, daemon=True)
+        reader.start()
+
+        # Keep every worker busy without queueing the whole input up front
+        max_outstanding = self.processes * self.concurrency_per_process * 2
+        outstanding = 0
+        job_iter = iter(jobs)
+        exhausted = False
+
+        try:
+            while True:
+                while not exhausted and outstanding < max_outstanding:
+                    try:
+                        key, config = next(job_iter)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    job_queue.put((key, config.model_dump_json()))
+                    outstanding += 1
+
+                if outstanding == 0:
+                    break
+
+                item = await results.get()
+                if isinstance(item, Exception):
+                    raise item
+                outstanding -= 1
+
+                if isinstance(item, SimulationRecord):
+                    yield item
+                else:
+                    _, key, error = item
+                    raise ValueError(f"Job {key} failed to start: {error}")
+        finally:
+            stop_reader.set()
+            for _ in workers:
+                job_queue.put(None)
+            for worker in workers:
+                await loop.run_in_executor(None, worker.join, 5)
+                if worker.is_alive():
+                    worker.terminate()
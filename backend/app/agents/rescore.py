@@ -0,0 +1,243 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.models import (
+    SimulationState,
+    SimulationStatus,
+    VerificationResult,
+    RescoreRequest,
+    RescoreState,
+    RescoreStatus
+)
+from app.services import AdmissionController, CircuitOpenError, Priority
+from app.agents.orchestrator import SimulationOrchestrator
+
+# Backoff after a rate limit or provider error: 1s, 2s, 4s, ... capped
+BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+MAX_REPORTED_ERRORS = 100
+
+
+class RescoreJob:
+    """
+    Re-runs verification over stored transcripts with a new verifier config.
+
+    Only the judge is called; the agent turns are reused as stored. Each
+    verdict is stored on the simulation under `version` in `rescores`,
+    next to the original verification_result, which is left untouched.
+
+    Judging runs up to `concurrency` simulations at a time and backs off
+    on rate limits: a 429 (or an open circuit) halves the concurrency and
+    pauses new calls for the Retry-After period, and the concurrency grows
+    back by one per window of successful calls. Other provider errors are
+    retried with exponential backoff, up to max_retries per simulation.
+    With an admission controller, each judging call holds a batch run slot
+    (released while backing off).
+    """
+
+    def __init__(
+        self,
+        orchestrator: SimulationOrchestrator,
+        request: RescoreRequest,
+        rescore_id: Optional[str] = None,
+        admission: Optional[AdmissionController] = None
+    ):
+        self.orchestrator = orchestrator
+        self.admission = admission
+        self.state = RescoreState(
+            rescore_id=rescore_id or str(uuid.uuid4()),
+            version=request.version or request.verifier.content_hash()[:12],
+            request=request,
+            concurrency=request.concurrency
+        )
+        self._limit = float(request.concurrency)
+        self._resume_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> asyncio.Task:
+        """Run the job in the background"""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    def cancel(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    async def run(self) -> RescoreState:
+        state = self.state
+        running: Dict[asyncio.Task, SimulationState] = {}
+        pinned: List[str] = []
+
+        try:
+            queue = self._targets()
+            # Keep targets out of the archive until their verdicts are stored
+            pinned = [simulation.simulation_id for simulation in queue]
+            self.orchestrator.pin(pinned)
+            queue.reverse()
+            while queue or running:
+                while queue and len(running) < int(self._limit):
+                    simulation = queue.pop()
+                    running[asyncio.create_task(self._score(simulation))] = simulation
+
+                done, _ = await asyncio.wait(set(running), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    self._record(running.pop(task), task)
+                state.concurrency = int(self._limit)
+
+            self._finish(RescoreStatus.COMPLETED)
+        except asyncio.CancelledError:
+            self._finish(RescoreStatus.CANCELLED)
+            raise
+        except Exception as e:
+            self._error("job", str(e))
+            self._finish(RescoreStatus.FAILED)
+        finally:
+            for task in running:
+                task.cancel()
+            self.orchestrator.unpin(pinned)
+
+        return state
+
+    def _targets(self) -> List[SimulationState]:
+        """
+        Simulations to score, in order, including archived ones;
+        the rest are counted as skipped or failed
+        """
+        state = self.state
+        request = state.request
+        if request.simulation_ids is not None:
+            candidates = []
+            for simulation_id in dict.fromkeys(request.simulation_ids):
+                simulation = self.orchestrator.restore_simulation(simulation_id)
+                if simulation is None:
+                    state.failed += 1
+                    self._error(simulation_id, "Simulation not found")
+                else:
+                    candidates.append(simulation)
+        else:
+            candidates = list(self.orchestrator.iter_simulations(
+                status=request.status,
+                model=request.model,
+                created_after=request.created_after,
+                created_before=request.created_before,
+                success=request.success,
+                config_hash=request.config_hash,
+                include_archived=True
+            ))
+
+        targets = []
+        for simulation in candidates:
+            if (
+                simulation.status == SimulationStatus.RUNNING
+                or not simulation.messages
+                or (state.version in simulation.rescores and not request.overwrite)
+            ):
+                state.skipped += 1
+            else:
+                # Archived matches move back into memory so their verdicts are kept
+                targets.append(self.orchestrator.restore_simulation(simulation.simulation_id) or simulation)
+        state.total = len(targets)
+        return targets
+
+    async def _score(self, simulation: SimulationState) -> VerificationResult:
+        verifier = self.state.request.verifier
+        config = simulation.config
+        attempt = 0
+        while True:
+            delay = self._resume_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # A batch run slot per call, so backoff waits don't hold one
+            ticket = await self.admission.acquire(Priority.BATCH) if self.admission is not None else None
+            try:
+                result = await self.orchestrator.verifier.verify(
+                    candidate_objective=config.candidate_config.objective,
+                    verification_prompt=(
+                        verifier.verification_prompt
+                        if verifier.verification_prompt is not None
+                        else config.verification_prompt
+                    ),
+                    conversation_history=list(simulation.messages),
+                    judges=verifier.judges if verifier.judges is not None else config.judges,
+                    vote_method=verifier.judge_vote or config.judge_vote,
+                    model=verifier.model
+                )
+            except Exception as e:
+                rate_limited = self._is_rate_limit(e)
+                if attempt >= self.state.request.max_retries or not (rate_limited or self._is_transient(e)):
+                    raise
+                attempt += 1
+                delay = min(MAX_BACKOFF_SECONDS, BACKOFF_SECONDS * 2 ** (attempt - 1))
+                if rate_limited:
+                    self.state.rate_limited += 1
+                    self._limit = max(1.0, self._limit / 2)
+                    delay = max(delay, self._retry_after(e) or 0.0)
+                    self._resume_at = max(self._resume_at, time.monotonic() + delay)
+                    continue
+            else:
+                # Additive increase: about +1 per `limit` successful calls
+                self._limit = min(float(self.state.request.concurrency), self._limit + 1 / self._limit)
+                return result
+            finally:
+                if ticket is not None:
+                    ticket.release()
+            await asyncio.sleep(delay)
+
+    def _record(self, simulation: SimulationState, task: asyncio.Task):
+        state = self.state
+        if task.cancelled() or task.exception() is not None:
+            state.failed += 1
+            self._error(simulation.simulation_id, "cancelled" if task.cancelled() else str(task.exception()))
+            return
+
+        result = task.result()
+        result.version = state.version
+        simulation.rescores[state.version] = result
+        simulation.updated_at = datetime.now()
+
+        state.scored += 1
+        state.successes += result.success
+        original = simulation.verification_result
+        if original is not None:
+            state.original_successes += original.success
+            if result.success and not original.success:
+                state.flipped_to_success += 1
+            elif original.success and not result.success:
+                state.flipped_to_failure += 1
+
+    def _error(self, key: str, message: str):
+        errors = self.state.errors
+        if key in errors or len(errors) < MAX_REPORTED_ERRORS:
+            errors[key] = message
+
+    @staticmethod
+    def _is_rate_limit(error: Exception) -> bool:
+        return isinstance(error, CircuitOpenError) or getattr(error, "status_code", None) == 429
+
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        """Timeouts, dropped connections and 5xx/408 responses"""
+        status = getattr(error, "status_code", None)
+        if status is None:
+            return not isinstance(error, (ValueError, LookupError))
+        return status >= 500 or status == 408
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """Seconds the provider asked us to wait, if it said"""
+        if isinstance(error, CircuitOpenError):
+            return error.retry_after
+        response = getattr(error, "response", None)
+        value = getattr(response, "headers", {}).get("retry-after")
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
+
+    def _finish(self, status: RescoreStatus):
+        self.state.status = status
+        self.state.completed_at = datetime.now()
@@ -0,0 +1,188 @@
+import asyncio
+import math
+import uuid
+from datetime import datetime
+from typing import Dict, Optional
+
+from app.models import SimulationState
+from app.models.sweep import (
+    SweepRequest,
+    SweepState,
+    SweepStatus,
+    SweepStopReason,
+    SweepConfigResult
+)
+from app.services import AdmissionController, Priority
+from app.agents.orchestrator import SimulationOrchestrator
+
+
+class AdaptiveSweep:
+    """
+    Pass@k sweep that samples each config only as much as it needs.
+
+    Samples are run incrementally, keeping a Wilson confidence interval on
+    each config's pass rate. After min_samples, a config stops once its
+    interval is narrower than target_width, or once it no longer overlaps
+    any other config's interval (its rank is settled). Each free slot goes
+    to the config whose interval is widest, discounted by the samples it
+    already has in flight, so the budget saved on clear-cut configs is
+    spent on the uncertain ones. With an admission controller, each
+    sample waits for a batch run slot before it starts.
+    """
+
+    def __init__(
+        self,
+        orchestrator: SimulationOrchestrator,
+        request: SweepRequest,
+        sweep_id: Optional[str] = None,
+        admission: Optional[AdmissionController] = None
+    ):
+        self.orchestrator = orchestrator
+        self.admission = admission
+        self.state = SweepState(
+            sweep_id=sweep_id or str(uuid.uuid4()),
+            request=request,
+            results=[SweepConfigResult(index=i) for i in range(len(request.configs))],
+            budget=request.budget or request.max_samples * len(request.configs)
+        )
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> asyncio.Task:
+        """Run the sweep in the background"""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    def cancel(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    async def run(self) -> SweepState:
+        state = self.state
+        request = state.request
+        running: Dict[asyncio.Task, SweepConfigResult] = {}
+
+        try:
+            while True:
+                while len(running) < request.concurrency and state.samples_used < state.budget:
+                    result = self._next_config()
+                    if result is None:
+                        break
+                    result.in_flight += 1
+                    state.samples_used += 1
+                    running[asyncio.create_task(self._sample(result))] = result
+
+                if not running:
+                    break
+
+                done, _ = await asyncio.wait(set(running), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = running.pop(task)
+                    result.in_flight -= 1
+                    self._record(result, task)
+                self._update_stops()
+
+            self._finish(SweepStatus.COMPLETED, SweepStopReason.BUDGET)
+        except asyncio.CancelledError:
+            self._finish(SweepStatus.CANCELLED, SweepStopReason.CANCELLED)
+            raise
+        except Exception as e:
+            state.error = str(e)
+            self._finish(SweepStatus.FAILED, None)
+        finally:
+            for task in running:
+                task.cancel()
+
+        return state
+
+    async def _sample(self, result: SweepConfigResult) -> SimulationState:
+        config = self.state.request.configs[result.index]
+        ticket = None
+        if self.admission is not None:
+            ticket = await self.admission.acquire(Priority.BATCH)
+            ticket.bind(asyncio.current_task())
+        simulation_id = self.orchestrator.create_simulation(config)
+        result.simulation_ids.append(simulation_id)
+        if ticket is not None:
+            # Counted once: as this ticket until the run starts, then as a running simulation
+            ticket.simulation_id = simulation_id
+        async for _ in self.orchestrator.run_simulation(simulation_id, headless=True):
+            pass
+        return self.orchestrator.get_simulation(simulation_id)
+
+    def _record(self, result: SweepConfigResult, task: asyncio.Task):
+        """Fold a finished run into its config's estimate"""
+        simulation = None if task.cancelled() or task.exception() else task.result()
+        if simulation is None or simulation.verification_result is None:
+            # No verdict (provider error, deadline, ...): not a pass@k sample
+            result.errors += 1
+            return
+
+        # app.stats pulls in NumPy, so it is imported on first use rather than at startup
+        from app.stats import pass_at_k_from_rate, wilson_interval
+
+        request = self.state.request
+        result.samples += 1
+        result.successes += simulation.verification_result.success
+        result.pass_rate = result.successes / result.samples
+        low, high = wilson_interval(result.successes, result.samples, request.confidence)
+        result.ci_low, result.ci_high = float(low), float(high)
+        result.pass_at_k_low = float(pass_at_k_from_rate(low, request.k))
+        result.pass_at_k_high = float(pass_at_k_from_rate(high, request.k))
+
+    def _update_stops(self):
+        request = self.state.request
+        for result in self.state.results:
+            if result.stop_reason is not None:
+                continue
+            if result.errors >= request.max_samples:
+                result.stop_reason = SweepStopReason.ERRORS
+            elif result.samples >= request.max_samples:
+                result.stop_reason = SweepStopReason.MAX_SAMPLES
+            elif result.samples < request.min_samples:
+                continue
+            elif result.ci_high - result.ci_low <= request.target_width:
+                result.stop_reason = SweepStopReason.CONVERGED
+            elif self._separated(result):
+                result.stop_reason = SweepStopReason.SEPARATED
+
+    def _separated(self, result: SweepConfigResult) -> bool:
+        """Whether a config's interval overlaps no other config's"""
+        others = [other for other in self.state.results if other is not result]
+        return bool(others) and all(
+            result.ci_low > other.ci_high or result.ci_high < other.ci_low
+            for other in others
+        )
+
+    def _next_config(self) -> Optional[SweepConfigResult]:
+        """The config that should get the next sample, if any still needs one"""
+        request = self.state.request
+        candidates = [
+            result for result in self.state.results
+            if result.stop_reason is None
+            and result.samples + result.in_flight < request.max_samples
+        ]
+        if not candidates:
+            return None
+
+        # Every config gets min_samples before any comparison is made
+        warming_up = [
+            result for result in candidates
+            if result.samples + result.in_flight < request.min_samples
+        ]
+        if warming_up:
+            return min(warming_up, key=lambda result: result.samples + result.in_flight)
+
+        def expected_width(result: SweepConfigResult) -> float:
+            # Width shrinks roughly with sqrt(n); count in-flight samples as done
+            width = result.ci_high - result.ci_low
+            return width * math.sqrt((result.samples + 1) / (result.samples + result.in_flight + 1))
+
+        return max(candidates, key=expected_width)
+
+    def _finish(self, status: SweepStatus, unfinished_reason: Optional[SweepStopReason]):
+        self.state.status = status
+        self.state.completed_at = datetime.now()
+        for result in self.state.results:
+            if result.stop_reason is None:
+                result.stop_reason = unfinished_reason
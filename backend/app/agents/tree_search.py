@@ -0,0 +1,319 @@
+import asyncio
+import math
+import uuid
+from datetime import datetime
+from typing import List, Optional, Set
+
+from app.models import (
+    Message,
+    MessageRole,
+    TerminationReason,
+    ExplorationRequest,
+    ExplorationState,
+    ExplorationStatus,
+    ExplorationStrategy,
+    ExplorationTarget,
+    TreeNode
+)
+from app.services import AdmissionController, Priority
+from app.agents.orchestrator import SimulationOrchestrator
+
+
+class TreeSearch:
+    """
+    Explores the outcome space of one config as a tree of conversations.
+
+    Each candidate turn branches into `branching` sampled responses, drawn
+    with one n>1 request where the provider supports it, so the shared
+    prefix is only paid for once per branch point instead of once per
+    restart. Sim turns don't branch. A node becomes a leaf when the
+    candidate requests verification or max_turns is reached, and every
+    leaf is verified as soon as it appears.
+
+    With the breadth strategy the shallowest open node is expanded next.
+    With mcts the search descends by UCB on how often each subtree's
+    leaves reached the target outcome, expands that node, and rolls one
+    new branch out to a leaf (one sample per turn) so every expansion is
+    scored. The search stops when the token budget or max_leaves is
+    reached, or the tree is exhausted; leaves still being verified count
+    towards max_leaves, and at most `concurrency` expansions and
+    verifications are in flight at once. With an admission controller,
+    each exploration holds a batch run slot while it runs.
+    """
+
+    def __init__(
+        self,
+        orchestrator: SimulationOrchestrator,
+        request: ExplorationRequest,
+        exploration_id: Optional[str] = None,
+        admission: Optional[AdmissionController] = None
+    ):
+        self.orchestrator = orchestrator
+        self.admission = admission
+        self.state = ExplorationState(
+            exploration_id=exploration_id or str(uuid.uuid4()),
+            request=request,
+            nodes=[TreeNode(node_id=0)]
+        )
+        # Nodes being expanded or rolled out, and nodes with nothing left to explore
+        self._busy: Set[int] = set()
+        self._closed: Set[int] = set()
+        # Leaves claimed for verification whose verdict isn't in yet
+        self._verifying = 0
+        # Provider calls in flight; created in run() so it binds to the running loop
+        self._calls: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> asyncio.Task:
+        """Run the search in the background"""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    def cancel(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    def path(self, node_id: int) -> List[Message]:
+        """The conversation from the root to a node"""
+        messages = []
+        node = self.state.nodes[node_id]
+        while node.message is not None:
+            messages.append(node.message)
+            node = self.state.nodes[node.parent_id]
+        return messages[::-1]
+
+    async def run(self) -> ExplorationState:
+        state = self.state
+        running: Set[asyncio.Task] = set()
+        self._calls = asyncio.Semaphore(state.request.concurrency)
+
+        try:
+            while True:
+                while len(running) < state.request.concurrency and not self._out_of_budget():
+                    node = self._select()
+                    if node is None:
+                        break
+                    self._busy.add(node.node_id)
+                    running.add(asyncio.create_task(self._explore(node)))
+
+                if not running:
+                    break
+                _, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+
+            self._finish(ExplorationStatus.COMPLETED)
+        except asyncio.CancelledError:
+            self._finish(ExplorationStatus.CANCELLED)
+            raise
+        except Exception as e:
+            state.error = str(e)
+            self._finish(ExplorationStatus.FAILED)
+        finally:
+            for task in running:
+                task.cancel()
+
+        return state
+
+    async def _explore(self, node: TreeNode):
+        """Expand a node, verify new leaves and (mcts) roll one branch out to a leaf"""
+        rollout = None
+        try:
+            if self.admission is not None:
+                ticket = await self.admission.acquire(Priority.BATCH)
+                ticket.bind(asyncio.current_task())
+            children = await self._expand(node)
+            await asyncio.gather(*[self._verify(leaf) for leaf in self._claim_leaves(children)])
+
+            if self.state.request.strategy == ExplorationStrategy.MCTS:
+                rollout = next((child for child in children if not child.terminal_reason), None)
+                if rollout is not None:
+                    self._busy.add(rollout.node_id)
+                    leaf = rollout
+                    while not leaf.terminal_reason and not self._out_of_budget():
+                        leaf = (await self._expand(leaf, samples=1))[0]
+                    for leaf in self._claim_leaves([leaf]):
+                        await self._verify(leaf)
+        except Exception as e:
+            # A provider error closes this branch; the rest of the tree carries on
+            failed = rollout or node
+            failed.error = str(e)
+            self._close(failed)
+        finally:
+            self._busy.discard(node.node_id)
+            if rollout is not None:
+                self._busy.discard(rollout.node_id)
+            self._close(node)
+
+    async def _expand(self, node: TreeNode, samples: Optional[int] = None) -> List[TreeNode]:
+        """
+        Sample the next turn after a node and add the responses as children.
+        Without `samples`, fills the node up to its full branching factor.
+        """
+        state = self.state
+        config = state.request.config
+        role = self._speaker(node.depth + 1)
+        if samples is None:
+            samples = state.request.branching - len(node.children) if role == MessageRole.CANDIDATE else 1
+
+        new_children = []
+        if samples > 0:
+            messages = self.path(node.node_id)
+            candidate_agent, sim_agent = self.orchestrator.replay_agents(config, messages)
+            agent = candidate_agent if role == MessageRole.CANDIDATE else sim_agent
+            async with self._calls:
+                responses, usage = await agent.sample_responses(
+                    samples, messages[-1].content if messages else None
+                )
+            state.usage.input_tokens += usage["input_tokens"]
+            state.usage.output_tokens += usage["output_tokens"]
+
+            turn_number = node.depth + 1
+            for content, reasoning, should_verify in responses:
+                child = TreeNode(
+                    node_id=len(state.nodes),
+                    parent_id=node.node_id,
+                    depth=turn_number,
+                    message=Message(
+                        role=role,
+                        content=content,
+                        reasoning=reasoning or None,
+                        turn_number=turn_number
+                    )
+                )
+                if should_verify:
+                    child.terminal_reason = TerminationReason.VERIFICATION_REQUESTED
+                elif turn_number >= config.max_turns:
+                    child.terminal_reason = TerminationReason.MAX_TURNS
+                state.nodes.append(child)
+                node.children.append(child.node_id)
+                new_children.append(child)
+
+        if role != MessageRole.CANDIDATE or len(node.children) >= state.request.branching:
+            node.expanded = True
+        return new_children
+
+    def _claim_leaves(self, nodes: List[TreeNode]) -> List[TreeNode]:
+        """
+        The leaves among `nodes` that fit in what's left of max_leaves,
+        counted as verifying until _verify finishes them. Leaves past the
+        limit are closed unverified.
+        """
+        leaves = [node for node in nodes if node.terminal_reason]
+        max_leaves = self.state.request.max_leaves
+        if max_leaves is not None:
+            room = max(0, max_leaves - self.state.leaves - self._verifying)
+            for leaf in leaves[room:]:
+                self._close(leaf)
+            leaves = leaves[:room]
+        self._verifying += len(leaves)
+        return leaves
+
+    async def _verify(self, leaf: TreeNode):
+        """Verify a claimed leaf's conversation and back the outcome up to the root"""
+        state = self.state
+        config = state.request.config
+        result = None
+        try:
+            async with self._calls:
+                async for event in self.orchestrator.verifier.verify_stream(
+                    candidate_objective=config.candidate_config.objective,
+                    verification_prompt=config.verification_prompt,
+                    conversation_history=self.path(leaf.node_id),
+                    judges=config.judges,
+                    vote_method=config.judge_vote
+                ):
+                    if event["type"] == "usage":
+                        state.usage.input_tokens += event["input_tokens"]
+                        state.usage.output_tokens += event["output_tokens"]
+                    elif event["type"] == "result":
+                        result = event["result"]
+            if result is None:
+                raise ValueError("Verification ended without a result")
+        except Exception as e:
+            leaf.error = str(e)
+            self._close(leaf)
+            return
+        finally:
+            self._verifying -= 1
+
+        leaf.verification_result = result
+        hit = result.success == (state.request.target == ExplorationTarget.SUCCESS)
+        state.leaves += 1
+        state.hits += hit
+
+        node = leaf
+        while True:
+            node.visits += 1
+            node.hits += hit
+            if node.parent_id is None:
+                break
+            node = state.nodes[node.parent_id]
+        self._close(leaf)
+
+    def _select(self) -> Optional[TreeNode]:
+        """The next node to expand, if any is free"""
+        if self.state.request.strategy == ExplorationStrategy.BREADTH:
+            open_nodes = [node for node in self.state.nodes if self._expandable(node)]
+            return min(open_nodes, key=lambda node: (node.depth, node.node_id)) if open_nodes else None
+        return self._descend(self.state.nodes[0])
+
+    def _descend(self, node: TreeNode) -> Optional[TreeNode]:
+        """UCB descent; falls back to the next-best child if a subtree has nothing free"""
+        if not node.expanded:
+            return node if self._expandable(node) else None
+
+        weight = self.state.request.exploration_weight
+        log_visits = math.log(max(1, node.visits))
+
+        def ucb(child: TreeNode) -> float:
+            if child.visits == 0:
+                return math.inf
+            return child.hits / child.visits + weight * math.sqrt(log_visits / child.visits)
+
+        children = [
+            self.state.nodes[child_id] for child_id in node.children
+            if child_id not in self._closed and child_id not in self._busy
+        ]
+        for child in sorted(children, key=ucb, reverse=True):
+            found = self._descend(child)
+            if found is not None:
+                return found
+        return None
+
+    def _expandable(self, node: TreeNode) -> bool:
+        return (
+            not node.expanded
+            and not node.terminal_reason
+            and node.node_id not in self._busy
+            and node.node_id not in self._closed
+        )
+
+    def _close(self, node: TreeNode):
+        """Mark nodes with nothing left to explore, from a node up towards the root"""
+        while node is not None:
+            finished = (
+                node.error is not None
+                or bool(node.terminal_reason)
+                or (node.expanded and all(child_id in self._closed for child_id in node.children))
+            )
+            if not finished or node.node_id in self._closed:
+                return
+            self._closed.add(node.node_id)
+            node = self.state.nodes[node.parent_id] if node.parent_id is not None else None
+
+    def _speaker(self, turn_number: int) -> MessageRole:
+        first = self.state.request.config.first_speaker
+        if turn_number % 2 == 1:
+            return first
+        return MessageRole.SIM if first == MessageRole.CANDIDATE else MessageRole.CANDIDATE
+
+    def _out_of_budget(self) -> bool:
+        state = self.state
+        request = state.request
+        if state.usage.input_tokens + state.usage.output_tokens >= request.token_budget:
+            return True
+        return request.max_leaves is not None and state.leaves + self._verifying >= request.max_leaves
+
+    def _finish(self, status: ExplorationStatus):
+        self.state.status = status
+        self.state.completed_at = datetime.now()
@@ -0,0 +1,131 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, List
+import asyncio
+import cProfile
+import pstats
+import tracemalloc
+
+from app.services.loop_monitor import LoopLagMonitor, module_name
+
+router = APIRouter()
+
+# Started on app startup when LOOP_MONITOR is enabled
+loop_monitor = LoopLagMonitor()
+
+# Only one profile or memory capture runs at a time
+_capture_lock = asyncio.Lock()
+
+
+def _group(name: str, depth: int) -> str:
+    return ".".join(name.split(".")[:depth]) if depth > 0 else name
+
+
+def _top(totals: Dict[str, float], limit: int, key: str, scale: float) -> List[Dict]:
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return [{"module": name, key: round(value * scale, 3)} for name, value in ranked]
+
+
+@router.get("/debug/loop")
+async def loop_lag():
+    """Event-loop lag percentiles and the stacks of recent stalls"""
+    if not loop_monitor.running:
+        raise HTTPException(status_code=404, detail="Loop monitor is not running (set LOOP_MONITOR=true)")
+    return loop_monitor.snapshot()
+
+
+@router.post("/debug/profile")
+async def profile(
+    seconds: float = Query(5.0, gt=0, le=60),
+    limit: int = Query(25, ge=1, le=200),
+    depth: int = Query(0, ge=0, description="Group by the first N module name parts (0 = full name)")
+):
+    """
+    Profile the event loop thread for `seconds` and report where CPU time went,
+    by module and by function.
+    """
+    if _capture_lock.locked():
+        raise HTTPException(status_code=409, detail="A capture is already running")
+
+    async with _capture_lock:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Another profiler is already active in this thread
+            raise HTTPException(status_code=409, detail=str(e))
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.disable()
+
+    stats = pstats.Stats(profiler).stats
+    by_module: Dict[str, float] = {}
+    functions = []
+    for (filename, line, function), (_, calls, own_time, cumulative, _) in stats.items():
+        module = _group(module_name(filename), depth)
+        by_module[module] = by_module.get(module, 0.0) + own_time
+        functions.append((own_time, cumulative, calls, f"{module}:{line}({function})"))
+
+    functions.sort(reverse=True)
+    return {
+        "seconds": seconds,
+        "total_ms": round(sum(by_module.values()) * 1000, 3),
+        "modules": _top(by_module, limit, "self_ms", 1000),
+        "functions": [
+            {
+                "function": name,
+                "self_ms": round(own_time * 1000, 3),
+                "cumulative_ms": round(cumulative * 1000, 3),
+                "calls": calls
+            }
+            for own_time, cumulative, calls, name in functions[:limit]
+        ]
+    }
+
+
+@router.post("/debug/memory")
+async def memory(
+    seconds: float = Query(5.0, ge=0, le=300),
+    limit: int = Query(25, ge=1, le=200),
+    depth: int = Query(0, ge=0, description="Group by the first N module name parts (0 = full name)")
+):
+    """
+    Trace allocations for `seconds` and report, by module, what is allocated
+    now and what grew during the window. Tracing is switched off again
+    afterwards unless it was already on.
+    """
+    if _capture_lock.locked():
+        raise HTTPException(status_code=409, detail="A capture is already running")
+
+    async with _capture_lock:
+        started_here = not tracemalloc.is_tracing()
+        if started_here:
+            tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            await asyncio.sleep(seconds)
+            after = tracemalloc.take_snapshot()
+            traced, peak = tracemalloc.get_traced_memory()
+        finally:
+            if started_here:
+                tracemalloc.stop()
+
+    current: Dict[str, float] = {}
+    for stat in after.statistics("filename"):
+        module = _group(module_name(stat.traceback[0].filename), depth)
+        current[module] = current.get(module, 0.0) + stat.size
+
+    growth: Dict[str, float] = {}
+    for diff in after.compare_to(before, "filename"):
+        module = _group(module_name(diff.traceback[0].filename), depth)
+        growth[module] = growth.get(module, 0.0) + diff.size_diff
+
+    return {
+        "seconds": seconds,
+        "traced_mb": round(traced / 2 ** 20, 3),
+        "peak_mb": round(peak / 2 ** 20, 3),
+        # Objects allocated before tracing started are not included
+        "complete": not started_here,
+        "current": _top(current, limit, "kb", 1 / 1024),
+        "growth": _top(growth, limit, "kb", 1 / 1024)
+    }
@@ -0,0 +1,106 @@
+from fastapi import APIRouter, HTTPException
+import os
+
+from app.models import (
+    SimulationJob,
+    JobSubmission,
+    LeaseRequest,
+    LeaseRenewal,
+    JobResult,
+    JobFailure
+)
+from app.distributed import JobQueue, LeaseError
+from app.api.routes import orchestrator
+
+router = APIRouter()
+
+# Global job queue (coordinator mode only)
+job_queue = JobQueue(
+    lease_seconds=float(os.getenv("JOB_LEASE_SECONDS", 60)),
+    max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+)
+
+
+@router.post("/jobs")
+async def submit_jobs(submission: JobSubmission):
+    """Enqueue simulation configs for workers to run"""
+    job_ids = job_queue.submit(submission.configs)
+    return {"job_ids": job_ids}
+
+
+@router.get("/jobs")
+async def job_stats():
+    """Count jobs by status"""
+    return job_queue.stats()
+
+
+@router.post("/jobs/lease")
+async def lease_jobs(request: LeaseRequest):
+    """Lease queued jobs to a worker"""
+    jobs = job_queue.lease(request.worker_id, request.max_jobs)
+    return {
+        "lease_seconds": job_queue.lease_seconds,
+        "jobs": [
+            {
+                "job_id": job.job_id,
+                "lease_id": job.lease_id,
+                "config": job.config.model_dump(mode="json")
+            }
+            for job in jobs
+        ]
+    }
+
+
+@router.get("/jobs/{job_id}", response_model=SimulationJob)
+async def get_job(job_id: str):
+    """Get job status"""
+    try:
+        return job_queue.get(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/jobs/{job_id}/heartbeat")
+async def heartbeat_job(job_id: str, renewal: LeaseRenewal):
+    """Extend a worker's lease on a job"""
+    try:
+        job = job_queue.heartbeat(job_id, renewal.lease_id)
+        return {"lease_expires_at": job.lease_expires_at}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except LeaseError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.post("/jobs/{job_id}/result")
+async def complete_job(job_id: str, result: JobResult):
+    """Store a worker's finished simulation"""
+    try:
+        job_queue.check_lease(job_id, result.lease_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except LeaseError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    # Results become visible through the regular simulation endpoints
+    try:
+        orchestrator.import_simulation(result.state, overwrite=True)
+    except ValueError as e:
+        # e.g. a simulation with this ID is running here; count it as a failed attempt
+        job_queue.fail(job_id, result.lease_id, str(e))
+        raise HTTPException(status_code=409, detail=str(e))
+
+    job_queue.complete(job_id, result.lease_id, result.state.simulation_id)
+    return {"status": "completed"}
+
+
+@router.post("/jobs/{job_id}/fail")
+async def fail_job(job_id: str, failure: JobFailure):
+    """Record a failed attempt (the job is retried up to JOB_MAX_ATTEMPTS)"""
+    try:
+        job = job_queue.fail(job_id, failure.lease_id, failure.error)
+        return {"status": job.status.value}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except LeaseError as e:
+        raise HTTPException(status_code=409, detail=str(e))
@@ -1,20 +1,135 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse
-from typing import Optional
+from pydantic import ValidationError
+from typing import Dict, List, Optional
+from datetime import datetime
+import asyncio
 import json
+import math
+import os
+import zlib
 
-from app.models import SimulationConfig, SimulationState, MessageRole
-from app.agents import SimulationOrchestrator
+from app.models import (
+    SimulationConfig,
+    SimulationState,
+    SimulationStatus,
+    MessageRole,
+    SweepRequest,
+    SweepState,
+    ExplorationRequest,
+    ExplorationState,
+    RescoreRequest,
+    RescoreState,
+    PassAtKRequest,
+    ComparisonRequest
+)
+from app.agents import (
+    SimulationOrchestrator,
+    SimulationNotRunningError,
+    AdaptiveSweep,
+    TreeSearch,
+    RescoreJob,
+    Archiver
+)
+from app.services import AdmissionController, AdmissionRejected, EventHub, Priority, SlowConsumerPolicy
+from app.storage import ResultsStore, SearchQueryError, SimulationArchive, TranscriptIndex
 
 router = APIRouter()
 
+# Indexed summary of finished runs (off unless RESULTS_DB names a SQLite file)
+RESULTS_DB = os.getenv("RESULTS_DB", "")
+results_store = ResultsStore(RESULTS_DB) if RESULTS_DB else None
+
+# Full-text index over transcripts (off unless SEARCH_DB names a SQLite file)
+SEARCH_DB = os.getenv("SEARCH_DB", "")
+search_index = TranscriptIndex(SEARCH_DB) if SEARCH_DB else None
+
+# Compressed cold storage for old simulations (set ARCHIVE_DIR to enable)
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "")
+simulation_archive = SimulationArchive(ARCHIVE_DIR) if ARCHIVE_DIR else None
+
 # Global orchestrator instance
-orchestrator = SimulationOrchestrator()
+orchestrator = SimulationOrchestrator(
+    results_store=results_store,
+    search_index=search_index,
+    archive=simulation_archive
+)
+
+# Moves simulations idle for ARCHIVE_AFTER_HOURS into the archive (started with the app)
+archiver = Archiver(
+    orchestrator,
+    max_age_seconds=float(os.getenv("ARCHIVE_AFTER_HOURS", 24)) * 3600,
+    interval_seconds=float(os.getenv("ARCHIVE_INTERVAL_SECONDS", 3600))
+) if simulation_archive else None
+
+# Fans each running simulation out to its viewers through bounded queues
+event_hub = EventHub(orchestrator, queue_size=int(os.getenv("STREAM_QUEUE_SIZE", 256)))
+
+# Admission control for runs: per-priority limits on runs in flight, queueing and token use
+admission = AdmissionController(
+    max_running=int(os.getenv("ADMISSION_MAX_RUNNING", 64)),
+    batch_share=float(os.getenv("ADMISSION_BATCH_SHARE", 0.75)),
+    max_queued={
+        Priority.INTERACTIVE: int(os.getenv("ADMISSION_MAX_QUEUED_INTERACTIVE", 32)),
+        Priority.BATCH: int(os.getenv("ADMISSION_MAX_QUEUED_BATCH", 256)),
+    },
+    max_wait={
+        Priority.INTERACTIVE: float(os.getenv("ADMISSION_MAX_WAIT_INTERACTIVE", 5)),
+        Priority.BATCH: float(os.getenv("ADMISSION_MAX_WAIT_BATCH", 30)),
+    },
+    tokens_per_minute=int(os.getenv("ADMISSION_TOKENS_PER_MINUTE", 0)) or None,
+    batch_token_share=float(os.getenv("ADMISSION_BATCH_TOKEN_SHARE", 0.8)),
+    token_usage=orchestrator.llm_service.token_usage,
+    running=orchestrator.running_simulation_ids
+)
+
+# Adaptive pass@k sweeps by ID
+sweeps: Dict[str, AdaptiveSweep] = {}
+
+# Tree searches over candidate responses by ID
+explorations: Dict[str, TreeSearch] = {}
+
+# Verification re-score jobs by ID
+rescores: Dict[str, RescoreJob] = {}
+
+# Bulk export/import tuning
+EXPORT_FLUSH_BYTES = 64 * 1024
+IMPORT_BATCH_SIZE = 500
+IMPORT_MAX_LINE_BYTES = 16 * 1024 * 1024
+# Most bytes a gzip body is inflated by per step, so a small body can't expand unchecked
+IMPORT_DECOMPRESS_BYTES = 1024 * 1024
+IMPORT_MAX_REPORTED_ERRORS = 20
+
+
+def overloaded(error: AdmissionRejected) -> HTTPException:
+    """429 for a rejected run, with Retry-After"""
+    return HTTPException(
+        status_code=429,
+        detail={
+            "message": str(error),
+            "priority": error.priority.value,
+            "reason": error.reason,
+            "retry_after": math.ceil(error.retry_after),
+            "queue_position": error.queue_position,
+        },
+        headers={"Retry-After": str(math.ceil(error.retry_after))}
+    )
 
 
 @router.post("/simulations", response_model=dict)
-async def create_simulation(config: SimulationConfig):
-    """Create a new simulation"""
+async def create_simulation(
+    config: SimulationConfig,
+    priority: Priority = Header(Priority.INTERACTIVE, alias="X-Priority")
+):
+    """
+    Create a new simulation.
+    Returns 429 when runs of this priority (X-Priority header) are being turned away.
+    """
+    try:
+        admission.check(priority)
+    except AdmissionRejected as e:
+        raise overloaded(e)
+
     try:
         simulation_id = orchestrator.create_simulation(config)
         return {
@@ -25,6 +140,191 @@ async def create_simulation(config: SimulationConfig):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/simulations/export")
+async def export_simulations(
+    status: Optional[SimulationStatus] = None,
+    model: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    success: Optional[bool] = None,
+    config_hash: Optional[str] = None,
+    gzip: bool = False,
+    shared_configs: bool = False,
+    include_archived: bool = False
+):
+    """
+    Stream matching simulations as JSONL (one SimulationState per line).
+    With shared_configs=true each distinct config is written once, as a
+    {"config_hash", "config"} line, and states refer to it by config_hash.
+    With include_archived=true archived simulations are exported too.
+    """
+    states = orchestrator.iter_simulations(
+        status=status,
+        model=model,
+        created_after=created_after,
+        created_before=created_before,
+        success=success,
+        config_hash=config_hash,
+        include_archived=include_archived
+    )
+
+    async def jsonl_generator():
+        # Buffer lines into ~64KB chunks instead of one write per simulation
+        compressor = zlib.compressobj(wbits=31) if gzip else None
+        buffer = []
+        buffered = 0
+
+        written_configs = set()
+
+        for state in states:
+            if shared_configs:
+                if state.config_hash not in written_configs:
+                    written_configs.add(state.config_hash)
+                    config_line = (
+                        '{"config_hash":' + json.dumps(state.config_hash)
+                        + ',"config":' + state.config.model_dump_json() + "}\n"
+                    ).encode("utf-8")
+                    buffer.append(config_line)
+                    buffered += len(config_line)
+                line = state.model_dump_json(exclude={"config"}).encode("utf-8") + b"\n"
+            else:
+                line = state.model_dump_json().encode("utf-8") + b"\n"
+            buffer.append(line)
+            buffered += len(line)
+            if buffered >= EXPORT_FLUSH_BYTES:
+                chunk = b"".join(buffer)
+                buffer, buffered = [], 0
+                if compressor:
+                    chunk = compressor.compress(chunk)
+                if chunk:
+                    yield chunk
+
+        chunk = b"".join(buffer)
+        if compressor:
+            chunk = compressor.compress(chunk) + compressor.flush()
+        if chunk:
+            yield chunk
+
+    filename = "simulations.jsonl.gz" if gzip else "simulations.jsonl"
+    return StreamingResponse(
+        jsonl_generator(),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.post("/simulations/import")
+async def import_simulations(request: Request, overwrite: bool = False):
+    """
+    Import simulations from a JSONL stream (plain or gzip, including concatenated gzip files).
+    The body is consumed incrementally, so memory stays bounded by the batch size.
+    """
+    decompressor = None
+    pending = b""
+    batch = []
+    configs: Dict[str, SimulationConfig] = {}
+    line_number = 0
+    result = {"imported": 0, "skipped": 0, "failed": 0, "errors": []}
+
+    def record_error(line_no: int, message: str):
+        result["failed"] += 1
+        if len(result["errors"]) < IMPORT_MAX_REPORTED_ERRORS:
+            result["errors"].append({"line": line_no, "error": message})
+
+    def flush_batch():
+        imported = []
+        for line_no, state in batch:
+            try:
+                if orchestrator.import_simulation(state, overwrite=overwrite, record=False):
+                    result["imported"] += 1
+                    imported.append(state)
+                else:
+                    result["skipped"] += 1
+            except ValueError as e:
+                record_error(line_no, str(e))
+        if results_store is not None:
+            results_store.record_many(imported)
+        if search_index is not None:
+            search_index.index_simulations(imported)
+        batch.clear()
+
+    def parse_line(line_no: int, line: bytes):
+        if not line.strip():
+            return
+        try:
+            if line.startswith(b'{"config_hash"'):
+                # Shared config written by an export with shared_configs=true
+                record = json.loads(line)
+                configs[record["config_hash"]] = SimulationConfig.model_validate(record["config"])
+                return
+            if configs:
+                data = json.loads(line)
+                if "config" not in data:
+                    data["config"] = configs.get(data.get("config_hash"))
+                batch.append((line_no, SimulationState.model_validate(data)))
+            else:
+                batch.append((line_no, SimulationState.model_validate_json(line)))
+        except (ValidationError, ValueError, KeyError) as e:
+            record_error(line_no, str(e))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            flush_batch()
+
+    def consume(data: bytes):
+        nonlocal pending, line_number
+        pending += data
+        lines = pending.split(b"\n")
+        pending = lines.pop()
+        if len(pending) > IMPORT_MAX_LINE_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Line {line_number + 1} exceeds {IMPORT_MAX_LINE_BYTES} bytes"
+            )
+
+        for line in lines:
+            line_number += 1
+            parse_line(line_number, line)
+
+    def inflate(data: bytes):
+        nonlocal decompressor
+        while True:
+            # Inflate in bounded steps so each line is size-checked as it grows
+            consume(decompressor.decompress(data, IMPORT_DECOMPRESS_BYTES))
+            while decompressor.unconsumed_tail:
+                consume(decompressor.decompress(decompressor.unconsumed_tail, IMPORT_DECOMPRESS_BYTES))
+            if not (decompressor.eof and decompressor.unused_data):
+                return
+            # Concatenated gzip members (cat a.jsonl.gz b.jsonl.gz): inflate the next one
+            data = decompressor.unused_data
+            decompressor = zlib.decompressobj(wbits=31)
+
+    try:
+        async for chunk in request.stream():
+            if not chunk:
+                continue
+            if decompressor is None:
+                # Detect gzip from the magic bytes rather than trusting headers
+                is_gzip = chunk[:2] == b"\x1f\x8b"
+                decompressor = zlib.decompressobj(wbits=31) if is_gzip else False
+            if decompressor:
+                inflate(chunk)
+            else:
+                consume(chunk)
+
+        if decompressor:
+            consume(decompressor.flush())
+            if not decompressor.eof:
+                raise HTTPException(status_code=400, detail="Truncated gzip body")
+    except zlib.error as e:
+        raise HTTPException(status_code=400, detail=f"Invalid gzip body: {e}")
+
+    for line in pending.split(b"\n"):
+        line_number += 1
+        parse_line(line_number, line)
+    flush_batch()
+
+    return result
+
+
 @router.get("/simulations/{simulation_id}", response_model=SimulationState)
 async def get_simulation(simulation_id: str):
     """Get simulation state"""
@@ -34,29 +334,104 @@ async def get_simulation(simulation_id: str):
     return state
 
 
+@router.get("/archive")
+async def get_archive():
+    """Archive size and compression, and the background archiver's last pass"""
+    if simulation_archive is None:
+        raise HTTPException(status_code=404, detail="Archive is disabled (ARCHIVE_DIR)")
+    stats = await asyncio.to_thread(simulation_archive.stats)
+    return {
+        **stats,
+        "in_memory": len(orchestrator.active_simulations),
+        "archiver": archiver.snapshot()
+    }
+
+
+@router.post("/archive")
+async def archive_simulations(older_than_hours: Optional[float] = Query(None, ge=0)):
+    """
+    Archive simulations not updated for older_than_hours (default ARCHIVE_AFTER_HOURS) now.
+    Archived simulations are still served by GET /simulations/{id}.
+    """
+    if simulation_archive is None:
+        raise HTTPException(status_code=404, detail="Archive is disabled (ARCHIVE_DIR)")
+    archived = await archiver.run_once(None if older_than_hours is None else older_than_hours * 3600)
+    return {"archived": archived, "in_memory": len(orchestrator.active_simulations)}
+
+
+@router.get("/configs/{config_hash}", response_model=SimulationConfig)
+async def get_config(config_hash: str):
+    """Get the config shared by simulations with this config_hash"""
+    config = orchestrator.get_config(config_hash)
+    if not config:
+        raise HTTPException(status_code=404, detail="Config not found")
+    return config
+
+
 @router.post("/simulations/{simulation_id}/run")
-async def run_simulation(simulation_id: str):
-    """Run a simulation (streaming response)"""
+async def run_simulation(
+    simulation_id: str,
+    policy: SlowConsumerPolicy = SlowConsumerPolicy.COALESCE,
+    priority: Priority = Header(Priority.INTERACTIVE, alias="X-Priority")
+):
+    """
+    Run a simulation (streaming response).
+    If it is already being streamed, join that run instead of starting another.
+    A new run goes through admission control for its priority (X-Priority:
+    interactive or batch) and may wait briefly for a slot; when over capacity
+    the response is 429 with Retry-After.
+    """
+    ticket = None
+    if not event_hub.is_streaming(simulation_id):
+        if orchestrator.get_simulation(simulation_id) is None:
+            raise HTTPException(status_code=404, detail="Simulation not found")
+        try:
+            ticket = await admission.admit(priority, simulation_id)
+        except AdmissionRejected as e:
+            raise overloaded(e)
+        if event_hub.is_streaming(simulation_id):
+            # Someone else started it while we waited: join their run instead
+            ticket.release()
+            ticket = None
+
     try:
-        async def event_generator():
-            try:
-                async for event in orchestrator.run_simulation(simulation_id):
-                    # Send as Server-Sent Events
-                    yield f"data: {json.dumps(event)}\n\n"
-            except Exception as e:
-                error_event = {"type": "error", "message": str(e)}
-                yield f"data: {json.dumps(error_event)}\n\n"
-
-        return StreamingResponse(
-            event_generator(),
-            media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-            }
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        subscription = event_hub.subscribe(simulation_id, policy)
+    except ValueError as e:
+        if ticket is not None:
+            ticket.release()
+        raise HTTPException(status_code=404, detail=str(e))
+    if ticket is not None:
+        ticket.bind(event_hub.run_task(simulation_id))
+
+    async def event_generator():
+        try:
+            async for event in subscription.events():
+                # Send as Server-Sent Events
+                yield f"data: {json.dumps(event)}\n\n"
+        except Exception as e:
+            error_event = {"type": "error", "message": str(e)}
+            yield f"data: {json.dumps(error_event)}\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+        }
+    )
+
+
+@router.post("/simulations/{simulation_id}/cancel")
+async def cancel_simulation(simulation_id: str):
+    """Cancel a running simulation and close its provider stream"""
+    try:
+        orchestrator.cancel_simulation(simulation_id)
+        return {"status": "cancelling"}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except SimulationNotRunningError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
 
 @router.put("/simulations/{simulation_id}/messages/{turn_number}")
@@ -93,28 +468,304 @@ async def rerun_from_turn(simulation_id: str, from_turn: int):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/models")
-async def list_models():
-    """List available models - only for providers with API keys configured"""
-    import os
-
-    result = {}
-
-    # Only include Anthropic models if key is set
-    if os.getenv("ANTHROPIC_API_KEY"):
-        result["anthropic"] = [
-            "claude-sonnet-4-5-20250929",  # Claude Sonnet 4.5 (latest)
-            "claude-opus-4-5-20251101",     # Claude Opus 4.5
-            "claude-3-5-haiku-20241022",    # Claude 3.5 Haiku
-            "claude-3-haiku-20240307"       # Claude 3 Haiku
-        ]
-
-    # Only include OpenAI models if key is set
-    if os.getenv("OPENAI_API_KEY"):
-        result["openai"] = [
-            "gpt-4-turbo",
-            "gpt-4",
-            "gpt-3.5-turbo"
-        ]
+@router.post("/sweeps")
+async def create_sweep(request: SweepRequest):
+    """Start an adaptive pass@k sweep in the background"""
+    sweep = AdaptiveSweep(orchestrator, request, admission=admission)
+    sweeps[sweep.state.sweep_id] = sweep
+    sweep.start()
+    return {
+        "sweep_id": sweep.state.sweep_id,
+        "status": sweep.state.status.value,
+        "budget": sweep.state.budget
+    }
 
-    return result
+
+@router.get("/sweeps/{sweep_id}", response_model=SweepState)
+async def get_sweep(sweep_id: str):
+    """Get sweep progress and per-config pass-rate intervals"""
+    sweep = sweeps.get(sweep_id)
+    if not sweep:
+        raise HTTPException(status_code=404, detail="Sweep not found")
+    return sweep.state
+
+
+@router.post("/sweeps/{sweep_id}/cancel")
+async def cancel_sweep(sweep_id: str):
+    """Stop sampling; in-flight simulations are cancelled"""
+    sweep = sweeps.get(sweep_id)
+    if not sweep:
+        raise HTTPException(status_code=404, detail="Sweep not found")
+    sweep.cancel()
+    return {"status": "cancelling"}
+
+
+@router.post("/explorations")
+async def create_exploration(request: ExplorationRequest):
+    """Start a tree search over candidate responses in the background"""
+    search = TreeSearch(orchestrator, request, admission=admission)
+    explorations[search.state.exploration_id] = search
+    search.start()
+    return {
+        "exploration_id": search.state.exploration_id,
+        "status": search.state.status.value,
+        "token_budget": request.token_budget
+    }
+
+
+@router.get("/explorations/{exploration_id}", response_model=ExplorationState)
+async def get_exploration(exploration_id: str):
+    """Get the explored tree, with a verification result on each leaf"""
+    search = explorations.get(exploration_id)
+    if not search:
+        raise HTTPException(status_code=404, detail="Exploration not found")
+    return search.state
+
+
+@router.get("/explorations/{exploration_id}/nodes/{node_id}/transcript")
+async def get_exploration_transcript(exploration_id: str, node_id: int):
+    """The conversation from the root to one node of the tree"""
+    search = explorations.get(exploration_id)
+    if not search:
+        raise HTTPException(status_code=404, detail="Exploration not found")
+    if not 0 <= node_id < len(search.state.nodes):
+        raise HTTPException(status_code=404, detail="Node not found")
+    return {
+        "node": search.state.nodes[node_id],
+        "messages": search.path(node_id)
+    }
+
+
+@router.post("/explorations/{exploration_id}/cancel")
+async def cancel_exploration(exploration_id: str):
+    """Stop the search; the tree explored so far is kept"""
+    search = explorations.get(exploration_id)
+    if not search:
+        raise HTTPException(status_code=404, detail="Exploration not found")
+    search.cancel()
+    return {"status": "cancelling"}
+
+
+@router.post("/rescores")
+async def create_rescore(request: RescoreRequest):
+    """
+    Re-verify stored simulations with a new verifier config in the background.
+    Verdicts are stored on each simulation under rescores[version].
+    """
+    job = RescoreJob(orchestrator, request, admission=admission)
+    rescores[job.state.rescore_id] = job
+    job.start()
+    return {
+        "rescore_id": job.state.rescore_id,
+        "version": job.state.version,
+        "status": job.state.status.value
+    }
+
+
+@router.get("/rescores/{rescore_id}", response_model=RescoreState)
+async def get_rescore(rescore_id: str):
+    """Get re-score progress and how the new verdicts compare to the originals"""
+    job = rescores.get(rescore_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Re-score job not found")
+    return job.state
+
+
+@router.post("/rescores/{rescore_id}/cancel")
+async def cancel_rescore(rescore_id: str):
+    """Stop the job; verdicts already stored are kept"""
+    job = rescores.get(rescore_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Re-score job not found")
+    job.cancel()
+    return {"status": "cancelling"}
+
+
+@router.get("/results")
+async def query_results(
+    candidate_model: Optional[str] = None,
+    sim_model: Optional[str] = None,
+    config_hash: Optional[str] = None,
+    status: Optional[SimulationStatus] = None,
+    termination_reason: Optional[str] = None,
+    success: Optional[bool] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    group_by: Optional[List[str]] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    offset: int = Query(0, ge=0)
+):
+    """
+    Query finished runs from the results index.
+    Without group_by: matching rows, newest first (follow next_cursor for more).
+    With group_by (e.g. ?group_by=candidate_model&group_by=day): per-group
+    run counts, pass rate, average turns and duration, and token totals.
+    """
+    if results_store is None:
+        raise HTTPException(status_code=404, detail="Results index is disabled (RESULTS_DB)")
+
+    filters = {
+        "candidate_model": candidate_model,
+        "sim_model": sim_model,
+        "config_hash": config_hash,
+        "status": status,
+        "termination_reason": termination_reason,
+        "success": success,
+        "created_after": created_after,
+        "created_before": created_before,
+    }
+    try:
+        if group_by:
+            return results_store.aggregate(filters, group_by, limit=limit, offset=offset)
+        return results_store.query(filters, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/results/pass-at-k")
+async def query_results_pass_at_k(
+    k: List[int] = Query([1]),
+    candidate_model: Optional[str] = None,
+    sim_model: Optional[str] = None,
+    config_hash: Optional[str] = None,
+    status: Optional[SimulationStatus] = None,
+    termination_reason: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    group_by: Optional[List[str]] = Query(None),
+    confidence: float = Query(0.95, gt=0.0, lt=1.0),
+    resamples: int = Query(2000, ge=100, le=100000),
+    seed: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0)
+):
+    """
+    pass@k from the results index, per group (e.g. ?group_by=candidate_model&k=1&k=5).
+    Verified runs are pooled per config; a group's pass@k is the mean over its
+    configs with at least k runs, with a bootstrap interval over configs (over
+    runs when grouping by config_hash).
+    """
+    # app.stats pulls in NumPy, so it is imported on first use rather than at startup
+    from app.stats import grouped_pass_at_k_report
+
+    if results_store is None:
+        raise HTTPException(status_code=404, detail="Results index is disabled (RESULTS_DB)")
+    if min(k) < 1:
+        raise HTTPException(status_code=400, detail="k must be at least 1")
+
+    filters = {
+        "candidate_model": candidate_model,
+        "sim_model": sim_model,
+        "config_hash": config_hash,
+        "status": status,
+        "termination_reason": termination_reason,
+        "created_after": created_after,
+        "created_before": created_before,
+    }
+    group_by = group_by or []
+    try:
+        rows = results_store.config_counts(filters, group_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    report = await asyncio.to_thread(
+        grouped_pass_at_k_report, rows, group_by, k,
+        confidence=confidence, resamples=resamples, seed=seed
+    )
+    report["groups"] = report["groups"][offset:offset + limit]
+    return report
+
+
+@router.post("/stats/pass-at-k")
+async def compute_pass_at_k(request: PassAtKRequest):
+    """
+    Unbiased pass@k with confidence intervals for a batch of configs, each
+    given as runs (samples) and passes (successes). Estimates for k > samples
+    are null.
+    """
+    from app.stats import pass_at_k_report
+
+    try:
+        return await asyncio.to_thread(
+            pass_at_k_report,
+            [config.key for config in request.configs],
+            [config.samples for config in request.configs],
+            [config.successes for config in request.configs],
+            ks=request.ks,
+            interval=request.interval.value,
+            confidence=request.confidence
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/stats/compare")
+async def compare_pass_at_k(request: ComparisonRequest):
+    """
+    Paired pass@k comparisons (a - b) over units both configs ran: mean
+    difference, bootstrap interval, permutation p-value and per-unit wins.
+    """
+    from app.stats import comparison_report
+
+    try:
+        return await asyncio.to_thread(
+            comparison_report,
+            [comparison.key for comparison in request.comparisons],
+            [[(unit.samples, unit.successes) for unit in comparison.a] for comparison in request.comparisons],
+            [[(unit.samples, unit.successes) for unit in comparison.b] for comparison in request.comparisons],
+            k=request.k,
+            confidence=request.confidence,
+            resamples=request.resamples,
+            seed=request.seed
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/search")
+async def search_transcripts(
+    q: str = Query(..., min_length=1),
+    field: str = "all",
+    sort: str = "relevance",
+    role: Optional[MessageRole] = None,
+    simulation_id: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=200),
+    offset: int = Query(0, ge=0)
+):
+    """
+    Full-text search over message content and reasoning traces.
+    q uses FTS5 syntax: words, "exact phrases", prefix*, AND/OR/NOT, NEAR(...).
+    field is all, content or reasoning. sort is relevance (best first) or
+    recent (newest first, faster for very broad queries). Matches come with
+    <mark>-highlighted snippets.
+    """
+    if search_index is None:
+        raise HTTPException(status_code=404, detail="Search index is disabled (SEARCH_DB)")
+
+    # Write buffered messages here, on the loop thread that buffers them
+    search_index.flush()
+    # Broad queries can take a while to rank; keep them off the event loop
+    try:
+        results = await asyncio.to_thread(
+            search_index.search,
+            q,
+            field=field,
+            sort=sort,
+            role=role.value if role else None,
+            simulation_id=simulation_id,
+            limit=limit,
+            offset=offset
+        )
+    except SearchQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"query": q, "results": results}
+
+
+@router.get("/models")
+async def list_models(details: bool = False):
+    """
+    List available models - only for providers with API keys configured.
+    With details=true, each model includes its provider capabilities.
+    """
+    return orchestrator.llm_service.registry.available_models(details=details)
@@ -0,0 +1,132 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from typing import Dict, List, Tuple
+import asyncio
+import json
+import math
+import os
+
+from app.services import AdmissionRejected, Priority, SlowConsumerPolicy
+from app.api.routes import admission, event_hub, orchestrator
+
+router = APIRouter()
+
+# Events are collected for up to this long and sent together in one frame
+WS_BATCH_SECONDS = float(os.getenv("WS_BATCH_SECONDS", 0.05))
+WS_MAX_BATCH = 500
+# Pending events per connection before subscriptions feel backpressure
+WS_OUTBOX_SIZE = 1000
+
+
+@router.websocket("/ws")
+async def simulation_socket(websocket: WebSocket):
+    """
+    Stream any number of simulations over one WebSocket.
+
+    Client messages:
+        {"action": "subscribe", "simulation_ids": [...], "policy": "coalesce", "priority": "interactive"}
+        {"action": "unsubscribe", "simulation_ids": [...]}
+    Server frames:
+        {"type": "events", "events": [{"simulation_id": ..., "type": ..., ...}, ...]}
+        {"type": "subscribed" | "unsubscribed", "simulation_ids": [...]}
+        {"type": "error", "simulation_id": ..., "message": ..., "status": ..., "retry_after": ...}
+
+    Subscribing starts a simulation (or joins it if it's already streaming),
+    like POST /simulations/{id}/run. New runs go through the same admission
+    control: they wait in their priority's queue, and when rejected the
+    error frame has status 429 and a retry_after in seconds. Unsubscribing
+    from a queued run gives up its place in the queue.
+    """
+    await websocket.accept()
+    outbox: asyncio.Queue = asyncio.Queue(maxsize=WS_OUTBOX_SIZE)
+    forwarders: Dict[str, asyncio.Task] = {}
+
+    async def forward(simulation_id: str, policy: SlowConsumerPolicy, priority: Priority):
+        try:
+            ticket = None
+            if not event_hub.is_streaming(simulation_id) and orchestrator.get_simulation(simulation_id) is not None:
+                try:
+                    ticket = await admission.admit(priority, simulation_id)
+                except AdmissionRejected as e:
+                    await websocket.send_json({
+                        "type": "error", "simulation_id": simulation_id, "message": str(e),
+                        "status": 429, "retry_after": math.ceil(e.retry_after)
+                    })
+                    return
+                if event_hub.is_streaming(simulation_id):
+                    # Someone else started it while we waited: join their run instead
+                    ticket.release()
+                    ticket = None
+
+            try:
+                subscription = event_hub.subscribe(simulation_id, policy)
+            except ValueError as e:
+                if ticket is not None:
+                    ticket.release()
+                await websocket.send_json({"type": "error", "simulation_id": simulation_id, "message": str(e)})
+                return
+            if ticket is not None:
+                ticket.bind(event_hub.run_task(simulation_id))
+
+            async for event in subscription.events():
+                await outbox.put((simulation_id, event))
+        finally:
+            if forwarders.get(simulation_id) is asyncio.current_task():
+                del forwarders[simulation_id]
+
+    async def send_frames():
+        while True:
+            batch: List[Tuple[str, Dict]] = [await outbox.get()]
+            # Let a few more events arrive so that one frame carries many
+            await asyncio.sleep(WS_BATCH_SECONDS)
+            while not outbox.empty() and len(batch) < WS_MAX_BATCH:
+                batch.append(outbox.get_nowait())
+            await websocket.send_text(json.dumps({
+                "type": "events",
+                "events": [dict(event, simulation_id=simulation_id) for simulation_id, event in batch]
+            }))
+
+    async def receive_commands():
+        while True:
+            message = await websocket.receive_json()
+            action = message.get("action")
+            simulation_ids = message.get("simulation_ids") or []
+
+            if action == "subscribe":
+                try:
+                    policy = SlowConsumerPolicy(message.get("policy", SlowConsumerPolicy.COALESCE.value))
+                    priority = Priority(message.get("priority", Priority.INTERACTIVE.value))
+                except ValueError as e:
+                    await websocket.send_json({"type": "error", "simulation_id": None, "message": str(e)})
+                    continue
+                subscribed = []
+                for simulation_id in simulation_ids:
+                    if simulation_id in forwarders:
+                        continue
+                    # Admission may queue, so each subscription waits on its own task
+                    forwarders[simulation_id] = asyncio.create_task(forward(simulation_id, policy, priority))
+                    subscribed.append(simulation_id)
+                await websocket.send_json({"type": "subscribed", "simulation_ids": subscribed})
+
+            elif action == "unsubscribe":
+                for simulation_id in simulation_ids:
+                    task = forwarders.pop(simulation_id, None)
+                    if task:
+                        task.cancel()
+                await websocket.send_json({"type": "unsubscribed", "simulation_ids": simulation_ids})
+
+            else:
+                await websocket.send_json({"type": "error", "simulation_id": None, "message": f"Unknown action {action!r}"})
+
+    sender = asyncio.create_task(send_frames())
+    receiver = asyncio.create_task(receive_commands())
+    try:
+        await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        for task in (sender, receiver):
+            if task.done() and not task.cancelled() and task.exception():
+                if not isinstance(task.exception(), WebSocketDisconnect):
+                    raise task.exception()
+    finally:
+        sender.cancel()
+        receiver.cancel()
+        for task in list(forwarders.values()):
+            task.cancel()
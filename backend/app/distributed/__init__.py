@@ -0,0 +1,3 @@
+from .job_queue import JobQueue, LeaseError
+
+__all__ = ["JobQueue", "LeaseError"]
@@ -0,0 +1,123 @@
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Deque, Dict, List
+
+from app.models import SimulationConfig, SimulationJob, JobStatus
+
+
+class LeaseError(Exception):
+    """Raised when a worker acts on a lease it no longer holds"""
+
+
+class JobQueue:
+    """
+    In-memory queue of simulation jobs owned by the coordinator.
+
+    Workers lease jobs for a limited time and must heartbeat to keep them.
+    Jobs whose lease expires are put back on the queue, up to max_attempts.
+    """
+
+    def __init__(self, lease_seconds: float = 60.0, max_attempts: int = 3):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.jobs: Dict[str, SimulationJob] = {}
+        self._queued: Deque[str] = deque()
+        self._leased: Dict[str, SimulationJob] = {}
+
+    def submit(self, configs: List[SimulationConfig]) -> List[str]:
+        """Enqueue configs; returns the new job IDs"""
+        job_ids = []
+        for config in configs:
+            job = SimulationJob(job_id=str(uuid.uuid4()), config=config)
+            self.jobs[job.job_id] = job
+            self._queued.append(job.job_id)
+            job_ids.append(job.job_id)
+        return job_ids
+
+    def get(self, job_id: str) -> SimulationJob:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise ValueError(f"Job {job_id} not found")
+        return job
+
+    def lease(self, worker_id: str, max_jobs: int) -> List[SimulationJob]:
+        """Hand up to max_jobs queued jobs to a worker"""
+        self.requeue_expired()
+
+        now = datetime.now()
+        leased = []
+        while self._queued and len(leased) < max_jobs:
+            job = self.jobs[self._queued.popleft()]
+            job.status = JobStatus.LEASED
+            job.attempts += 1
+            job.worker_id = worker_id
+            job.lease_id = str(uuid.uuid4())
+            job.lease_expires_at = now + timedelta(seconds=self.lease_seconds)
+            job.updated_at = now
+            self._leased[job.job_id] = job
+            leased.append(job)
+        return leased
+
+    def heartbeat(self, job_id: str, lease_id: str) -> SimulationJob:
+        """Extend a lease"""
+        job = self.check_lease(job_id, lease_id)
+        job.lease_expires_at = datetime.now() + timedelta(seconds=self.lease_seconds)
+        return job
+
+    def complete(self, job_id: str, lease_id: str, simulation_id: str) -> SimulationJob:
+        """Record a finished job"""
+        job = self.check_lease(job_id, lease_id)
+        self._release(job, JobStatus.COMPLETED)
+        job.simulation_id = simulation_id
+        return job
+
+    def fail(self, job_id: str, lease_id: str, error: str) -> SimulationJob:
+        """Record a failed attempt; the job is retried until max_attempts"""
+        job = self.check_lease(job_id, lease_id)
+        job.error = error
+        self._retry_or_fail(job)
+        return job
+
+    def requeue_expired(self):
+        """Put jobs whose lease ran out back on the queue"""
+        now = datetime.now()
+        expired = [
+            job for job in self._leased.values()
+            if job.lease_expires_at is not None and job.lease_expires_at <= now
+        ]
+        for job in expired:
+            job.error = f"Lease expired on worker {job.worker_id}"
+            self._retry_or_fail(job)
+
+    def stats(self) -> Dict[str, int]:
+        """Count jobs per status"""
+        self.requeue_expired()
+        counts = {status.value: 0 for status in JobStatus}
+        for job in self.jobs.values():
+            counts[job.status.value] += 1
+        return counts
+
+    def check_lease(self, job_id: str, lease_id: str) -> SimulationJob:
+        """The job, if this lease on it is still held (LeaseError otherwise)"""
+        job = self.get(job_id)
+        if job.status != JobStatus.LEASED or job.lease_id != lease_id:
+            raise LeaseError(f"Lease on job {job_id} is no longer held")
+        if job.lease_expires_at <= datetime.now():
+            self.requeue_expired()
+            raise LeaseError(f"Lease on job {job_id} has expired")
+        return job
+
+    def _retry_or_fail(self, job: SimulationJob):
+        if job.attempts >= self.max_attempts:
+            self._release(job, JobStatus.FAILED)
+        else:
+            self._release(job, JobStatus.QUEUED)
+            self._queued.append(job.job_id)
+
+    def _release(self, job: SimulationJob, status: JobStatus):
+        self._leased.pop(job.job_id, None)
+        job.status = status
+        job.lease_id = None
+        job.lease_expires_at = None
+        job.updated_at = datetime.now()
@@ -0,0 +1,200 @@
+"""
+Distributed worker.
+
+Leases simulation jobs from a coordinator over HTTP, runs them with a local
+SimulationOrchestrator and posts the results back:
+
+    python -m app.distributed.worker --coordinator http://coordinator:8000 --concurrency 8
+"""
+from dotenv import load_dotenv
+
+# Load environment variables FIRST before any other imports
+load_dotenv()
+
+import argparse
+import asyncio
+import os
+import socket
+import sys
+from typing import Dict, Optional, Set
+
+import httpx
+
+from app.models import SimulationConfig, SimulationStatus
+from app.agents import SimulationOrchestrator
+
+
+class SimulationWorker:
+    """Pulls jobs from a coordinator and runs up to `concurrency` at a time"""
+
+    def __init__(
+        self,
+        coordinator_url: str,
+        concurrency: int = 4,
+        poll_interval: float = 2.0,
+        worker_id: Optional[str] = None,
+        orchestrator: Optional[SimulationOrchestrator] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.coordinator_url = coordinator_url.rstrip("/")
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.orchestrator = orchestrator or SimulationOrchestrator()
+        # Custom HTTP transport (e.g. an in-process coordinator in tests)
+        self.transport = transport
+        self.completed = 0
+        self.failed = 0
+
+    async def run(self, exit_when_idle: bool = False):
+        """Lease and run jobs until stopped (or until the queue is empty)"""
+        active: Set[asyncio.Task] = set()
+
+        async with httpx.AsyncClient(
+            base_url=f"{self.coordinator_url}/api", timeout=30.0, transport=self.transport
+        ) as client:
+            try:
+                while True:
+                    free = self.concurrency - len(active)
+                    leased = []
+                    if free > 0:
+                        leased = await self._lease(client, free)
+                        for lease in leased:
+                            task = asyncio.create_task(self._run_job(client, lease))
+                            active.add(task)
+                            task.add_done_callback(active.discard)
+
+                    if not active:
+                        if exit_when_idle and not leased:
+                            return
+                        await asyncio.sleep(self.poll_interval)
+                    elif not leased or len(active) >= self.concurrency:
+                        # Wake up when a slot frees or it's time to poll again
+                        await asyncio.wait(
+                            set(active),
+                            timeout=self.poll_interval,
+                            return_when=asyncio.FIRST_COMPLETED
+                        )
+            finally:
+                for task in active:
+                    task.cancel()
+
+    async def _lease(self, client: httpx.AsyncClient, max_jobs: int):
+        try:
+            response = await client.post(
+                "/jobs/lease",
+                json={"worker_id": self.worker_id, "max_jobs": max_jobs}
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            print(f"[{self.worker_id}] Lease request failed: {e}", file=sys.stderr)
+            return []
+
+        body = response.json()
+        return [dict(job, lease_seconds=body["lease_seconds"]) for job in body["jobs"]]
+
+    async def _run_job(self, client: httpx.AsyncClient, lease: Dict):
+        job_id = lease["job_id"]
+        lease_id = lease["lease_id"]
+        run_task = asyncio.current_task()
+        heartbeat = asyncio.create_task(
+            self._heartbeat(client, job_id, lease_id, lease["lease_seconds"] / 3, run_task)
+        )
+
+        simulation_id = None
+        try:
+            config = SimulationConfig.model_validate(lease["config"])
+            simulation_id = self.orchestrator.create_simulation(config)
+            async for _ in self.orchestrator.run_simulation(simulation_id, headless=True):
+                pass
+
+            state = self.orchestrator.get_simulation(simulation_id)
+            heartbeat.cancel()
+            await self._post(client, f"/jobs/{job_id}/result", {
+                "lease_id": lease_id,
+                "state": state.model_dump(mode="json")
+            })
+            self.completed += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            heartbeat.cancel()
+            if simulation_id:
+                self.orchestrator.get_simulation(simulation_id).status = SimulationStatus.FAILED
+            await self._post(client, f"/jobs/{job_id}/fail", {"lease_id": lease_id, "error": str(e)})
+            self.failed += 1
+        finally:
+            heartbeat.cancel()
+            if simulation_id:
+                self.orchestrator.active_simulations.pop(simulation_id, None)
+
+    async def _heartbeat(
+        self,
+        client: httpx.AsyncClient,
+        job_id: str,
+        lease_id: str,
+        interval: float,
+        run_task: asyncio.Task
+    ):
+        """Keep the lease alive; abandon the job if the coordinator revoked it"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                response = await client.post(f"/jobs/{job_id}/heartbeat", json={"lease_id": lease_id})
+            except httpx.HTTPError as e:
+                print(f"[{self.worker_id}] Heartbeat for {job_id} failed: {e}", file=sys.stderr)
+                continue
+
+            if response.status_code == 409:
+                print(f"[{self.worker_id}] Lost lease on {job_id}, abandoning", file=sys.stderr)
+                run_task.cancel()
+                return
+
+    async def _post(self, client: httpx.AsyncClient, path: str, payload: Dict, attempts: int = 3):
+        """POST with a few retries on transport errors"""
+        for attempt in range(attempts):
+            try:
+                response = await client.post(path, json=payload)
+                if response.status_code == 409:
+                    print(f"[{self.worker_id}] {path}: lease no longer held", file=sys.stderr)
+                return response
+            except httpx.HTTPError as e:
+                if attempt == attempts - 1:
+                    print(f"[{self.worker_id}] {path} failed: {e}", file=sys.stderr)
+                    return None
+                await asyncio.sleep(2 ** attempt)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m app.distributed.worker",
+        description="Run simulation jobs leased from a coordinator"
+    )
+    parser.add_argument("--coordinator", required=True, help="Coordinator base URL, e.g. http://localhost:8000")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="Jobs to run at once")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds between lease attempts")
+    parser.add_argument("--worker-id", help="Identifier reported to the coordinator")
+    parser.add_argument("--exit-when-idle", action="store_true", help="Exit once the queue is empty")
+    args = parser.parse_args(argv)
+
+    worker = SimulationWorker(
+        coordinator_url=args.coordinator,
+        concurrency=args.concurrency,
+        poll_interval=args.poll_interval,
+        worker_id=args.worker_id
+    )
+
+    try:
+        asyncio.run(worker.run(exit_when_idle=args.exit_when_idle))
+    except KeyboardInterrupt:
+        pass
+
+    print(
+        f"[{worker.worker_id}] completed={worker.completed} failed={worker.failed}",
+        file=sys.stderr
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
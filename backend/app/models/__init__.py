@@ -5,7 +5,50 @@ from .simulation import (
     MessageRole,
     SimulationState,
     SimulationStatus,
-    VerificationResult
+    TerminationReason,
+    TokenUsage,
+    VerificationResult,
+    JudgeConfig,
+    JudgeVote,
+    VoteMethod
+)
+from .jobs import (
+    JobStatus,
+    SimulationJob,
+    JobSubmission,
+    LeaseRequest,
+    LeaseRenewal,
+    JobResult,
+    JobFailure
+)
+from .sweep import (
+    SweepStatus,
+    SweepStopReason,
+    SweepRequest,
+    SweepConfigResult,
+    SweepState
+)
+from .exploration import (
+    ExplorationStatus,
+    ExplorationStrategy,
+    ExplorationTarget,
+    ExplorationRequest,
+    TreeNode,
+    ExplorationState
+)
+from .rescore import (
+    RescoreStatus,
+    VerifierConfig,
+    RescoreRequest,
+    RescoreState
+)
+from .stats import (
+    IntervalMethod,
+    UnitCounts,
+    ConfigCounts,
+    PassAtKRequest,
+    Comparison,
+    ComparisonRequest
 )
 
 __all__ = [
@@ -15,5 +58,38 @@ __all__ = [
     "MessageRole",
     "SimulationState",
     "SimulationStatus",
-    "VerificationResult"
+    "TerminationReason",
+    "TokenUsage",
+    "VerificationResult",
+    "JudgeConfig",
+    "JudgeVote",
+    "VoteMethod",
+    "JobStatus",
+    "SimulationJob",
+    "JobSubmission",
+    "LeaseRequest",
+    "LeaseRenewal",
+    "JobResult",
+    "JobFailure",
+    "SweepStatus",
+    "SweepStopReason",
+    "SweepRequest",
+    "SweepConfigResult",
+    "SweepState",
+    "ExplorationStatus",
+    "ExplorationStrategy",
+    "ExplorationTarget",
+    "ExplorationRequest",
+    "TreeNode",
+    "ExplorationState",
+    "RescoreStatus",
+    "VerifierConfig",
+    "RescoreRequest",
+    "RescoreState",
+    "IntervalMethod",
+    "UnitCounts",
+    "ConfigCounts",
+    "PassAtKRequest",
+    "Comparison",
+    "ComparisonRequest"
 ]
@@ -0,0 +1,77 @@
+from enum import Enum
+from typing import Optional, List
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+from app.models.simulation import (
+    SimulationConfig,
+    Message,
+    TerminationReason,
+    TokenUsage,
+    VerificationResult
+)
+
+
+class ExplorationStatus(str, Enum):
+    RUNNING = "running"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+
+class ExplorationStrategy(str, Enum):
+    """Which open node of the tree is expanded next"""
+    BREADTH = "breadth"  # Shallowest first; every branch gets equal depth
+    MCTS = "mcts"  # UCB descent towards the target outcome, with a rollout to a leaf per expansion
+
+
+class ExplorationTarget(str, Enum):
+    """The verification outcome the search is looking for"""
+    FAILURE = "failure"
+    SUCCESS = "success"
+
+
+class ExplorationRequest(BaseModel):
+    """A tree search over candidate responses for one config"""
+    config: SimulationConfig
+    branching: int = Field(default=3, ge=1, le=16)  # Candidate responses sampled per candidate turn
+    strategy: ExplorationStrategy = ExplorationStrategy.MCTS
+    target: ExplorationTarget = ExplorationTarget.FAILURE
+    token_budget: int = Field(default=200_000, ge=1)  # Input + output tokens, incl. verification
+    max_leaves: Optional[int] = Field(default=None, ge=1)  # Stop after this many verified leaves (in-flight ones count)
+    exploration_weight: float = Field(default=1.4, ge=0.0)  # UCB exploration constant (mcts)
+    concurrency: int = Field(default=4, ge=1)  # Expansions and verifications in flight at once
+
+
+class TreeNode(BaseModel):
+    """One message in the exploration tree; the root (node 0) is the empty conversation"""
+    node_id: int
+    parent_id: Optional[int] = None
+    depth: int = 0  # Turn number of the message
+    message: Optional[Message] = None
+    children: List[int] = []
+    expanded: bool = False  # All branches of the next turn have been sampled
+    terminal_reason: Optional[TerminationReason] = None  # Set on leaves
+    verification_result: Optional[VerificationResult] = None
+    visits: int = 0  # Verified leaves at or below this node
+    hits: int = 0  # ... of which reached the target outcome
+    error: Optional[str] = None
+
+
+class ExplorationState(BaseModel):
+    """Current state of a tree search"""
+    exploration_id: str
+    request: ExplorationRequest
+    status: ExplorationStatus = ExplorationStatus.RUNNING
+    nodes: List[TreeNode] = []
+    usage: TokenUsage = Field(default_factory=TokenUsage)
+    leaves: int = 0  # Verified leaves
+    hits: int = 0  # Verified leaves with the target outcome
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        json_encoders = {
+            datetime: lambda v: v.isoformat()
+        }
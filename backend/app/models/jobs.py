@@ -0,0 +1,61 @@
+from enum import Enum
+from typing import Optional, List
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+from app.models.simulation import SimulationConfig, SimulationState
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    LEASED = "leased"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class SimulationJob(BaseModel):
+    """A simulation queued on the coordinator for a worker to run"""
+    job_id: str
+    config: SimulationConfig
+    status: JobStatus = JobStatus.QUEUED
+    attempts: int = 0
+    worker_id: Optional[str] = None
+    lease_id: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    simulation_id: Optional[str] = None  # Set once the result is posted
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+    class Config:
+        json_encoders = {
+            datetime: lambda v: v.isoformat()
+        }
+
+
+class JobSubmission(BaseModel):
+    """Batch of simulation configs to enqueue"""
+    configs: List[SimulationConfig]
+
+
+class LeaseRequest(BaseModel):
+    """A worker asking for up to max_jobs jobs"""
+    worker_id: str
+    max_jobs: int = 1
+
+
+class LeaseRenewal(BaseModel):
+    """Heartbeat proving the worker still holds a lease"""
+    lease_id: str
+
+
+class JobResult(BaseModel):
+    """Final state of a simulation run by a worker"""
+    lease_id: str
+    state: SimulationState
+
+
+class JobFailure(BaseModel):
+    """A worker reporting that it couldn't run a job"""
+    lease_id: str
+    error: str
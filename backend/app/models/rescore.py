@@ -0,0 +1,83 @@
+from enum import Enum
+from typing import Optional, List, Dict
+from pydantic import BaseModel, Field, PrivateAttr
+from datetime import datetime
+import hashlib
+import json
+
+from app.models.simulation import (
+    JudgeConfig,
+    SimulationStatus,
+    VoteMethod
+)
+
+
+class RescoreStatus(str, Enum):
+    RUNNING = "running"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+
+class VerifierConfig(BaseModel):
+    """How to judge a stored transcript; unset fields keep the simulation's own settings"""
+    verification_prompt: Optional[str] = None
+    model: Optional[str] = None  # Single-judge model (ignored when judges are given)
+    judges: Optional[List[JudgeConfig]] = None
+    judge_vote: Optional[VoteMethod] = None
+
+    _content_hash: Optional[str] = PrivateAttr(default=None)
+
+    class Config:
+        frozen = True
+
+    def content_hash(self) -> str:
+        """sha256 of the config's canonical JSON, computed once"""
+        if self._content_hash is None:
+            # Sorted keys: dicts written in a different order are still the same config
+            canonical = json.dumps(self.model_dump(mode="json"), sort_keys=True)
+            self._content_hash = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        return self._content_hash
+
+
+class RescoreRequest(BaseModel):
+    """Re-verify stored simulations (by ID or by filter) with a new verifier config"""
+    verifier: VerifierConfig
+    simulation_ids: Optional[List[str]] = None  # Takes precedence over the filters
+    status: Optional[SimulationStatus] = None
+    model: Optional[str] = None
+    config_hash: Optional[str] = None
+    success: Optional[bool] = None  # Original verdict
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    # Label the results are stored under; defaults to a hash of the verifier config
+    version: Optional[str] = Field(default=None, min_length=1, max_length=64)
+    overwrite: bool = False  # Re-score simulations that already have this version
+    concurrency: int = Field(default=8, ge=1)
+    max_retries: int = Field(default=3, ge=0)  # Per simulation, for rate limits and provider errors
+
+
+class RescoreState(BaseModel):
+    """Progress of a re-score job and how its verdicts compare to the originals"""
+    rescore_id: str
+    version: str
+    request: RescoreRequest
+    status: RescoreStatus = RescoreStatus.RUNNING
+    total: int = 0
+    scored: int = 0
+    skipped: int = 0  # Running, empty, or already scored under this version
+    failed: int = 0
+    successes: int = 0  # New verdicts that are YES
+    original_successes: int = 0  # ... and how many of the same simulations were YES originally
+    flipped_to_success: int = 0
+    flipped_to_failure: int = 0
+    rate_limited: int = 0  # 429s / open circuits backed off from
+    concurrency: int = 0  # Current concurrency (reduced while rate limited)
+    errors: Dict[str, str] = {}  # simulation_id -> last error (first 100)
+    created_at: datetime = Field(default_factory=datetime.now)
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        json_encoders = {
+            datetime: lambda v: v.isoformat()
+        }
@@ -1,7 +1,9 @@
 from enum import Enum
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from datetime import datetime
+import hashlib
+import json
 
 
 class MessageRole(str, Enum):
@@ -15,6 +17,34 @@ class SimulationStatus(str, Enum):
     RUNNING = "running"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class TerminationReason(str, Enum):
+    """Why a simulation run stopped"""
+    VERIFICATION_REQUESTED = "verification_requested"
+    MAX_TURNS = "max_turns"
+    LOOP_DETECTED = "loop_detected"
+    CANCELLED = "cancelled"
+    TURN_DEADLINE = "turn_deadline"
+    SIMULATION_DEADLINE = "simulation_deadline"
+    ERROR = "error"
+
+
+class VoteMethod(str, Enum):
+    """How an ensemble of judges reaches a verdict"""
+    MAJORITY = "majority"  # One vote per judge
+    WEIGHTED = "weighted"  # Votes count by judge weight
+
+
+class JudgeConfig(BaseModel):
+    """One judge in a verification ensemble"""
+    model: str = "claude-sonnet-4-5-20250929"
+    temperature: float = 0.0
+    weight: float = Field(default=1.0, gt=0.0)
+
+    class Config:
+        frozen = True
 
 
 class AgentConfig(BaseModel):
@@ -24,6 +54,15 @@ class AgentConfig(BaseModel):
     model: str = "claude-sonnet-4-5-20250929"  # Default to latest Anthropic model
     temperature: float = 1.0
     max_tokens: int = 4096
+    # Hedging: resend the request if the first token is slow to arrive
+    hedge_after_seconds: Optional[float] = None
+    hedge_adaptive: bool = False  # Use the learned p95 time-to-first-token once available
+    hedge_model: Optional[str] = None  # Send the hedge to another model/provider
+    # Route around outages: model -> fallback model, used when a circuit is open
+    failover_models: Dict[str, str] = {}
+
+    class Config:
+        frozen = True
 
 
 class Message(BaseModel):
@@ -40,10 +79,23 @@ class Message(BaseModel):
         }
 
 
+class JudgeVote(BaseModel):
+    """One judge's verdict within an ensemble verification"""
+    model: str
+    temperature: float
+    weight: float
+    success: Optional[bool] = None  # None if the judge didn't vote
+    explanation: Optional[str] = None
+    cancelled: bool = False  # Skipped because the quorum was already decided
+    error: Optional[str] = None
+
+
 class VerificationResult(BaseModel):
     """Result of the verification check"""
     success: bool
     explanation: str
+    votes: List[JudgeVote] = []  # Per-judge verdicts when an ensemble was used
+    version: Optional[str] = None  # Re-score version; None for the run's own verification
     timestamp: datetime = Field(default_factory=datetime.now)
 
     class Config:
@@ -52,6 +104,12 @@ class VerificationResult(BaseModel):
         }
 
 
+class TokenUsage(BaseModel):
+    """Token counts accumulated across all LLM calls of a simulation"""
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
 class SimulationConfig(BaseModel):
     """Full configuration for a simulation"""
     candidate_config: AgentConfig
@@ -59,18 +117,49 @@ class SimulationConfig(BaseModel):
     verification_prompt: str  # Prompt for the verifier to check success
     max_turns: int = 10
     first_speaker: MessageRole = MessageRole.CANDIDATE  # Who speaks first
+    turn_timeout_seconds: Optional[float] = None  # Wall-clock limit per turn
+    timeout_seconds: Optional[float] = None  # Wall-clock limit for the whole run, incl. verification
+    # Stop early when recent turns are near-duplicates (None disables detection)
+    loop_similarity_threshold: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+    loop_window: int = Field(default=4, ge=1)  # Recent messages each new one is compared against
+    loop_patience: int = Field(default=2, ge=1)  # Consecutive similar messages before stopping
+    # Verification ensemble (empty = a single default judge)
+    judges: List[JudgeConfig] = []
+    judge_vote: VoteMethod = VoteMethod.MAJORITY
+
+    # Configs are shared between simulations (see SimulationOrchestrator.intern_config)
+    _content_hash: Optional[str] = PrivateAttr(default=None)
+
+    class Config:
+        frozen = True
+
+    def content_hash(self) -> str:
+        """sha256 of the config's canonical JSON, computed once"""
+        if self._content_hash is None:
+            # Sorted keys: dicts written in a different order are still the same config
+            canonical = json.dumps(self.model_dump(mode="json"), sort_keys=True)
+            self._content_hash = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        return self._content_hash
 
 
 class SimulationState(BaseModel):
     """Current state of a running simulation"""
     simulation_id: str
     config: SimulationConfig
+    config_hash: Optional[str] = None  # SimulationConfig.content_hash(); equal configs share one instance
     status: SimulationStatus
     messages: List[Message] = []
     current_turn: int = 0
+    termination_reason: Optional[TerminationReason] = None
     verification_result: Optional[VerificationResult] = None
+    # Later verdicts from re-scoring the transcript, by version
+    rescores: Dict[str, VerificationResult] = {}
+    usage: TokenUsage = Field(default_factory=TokenUsage)
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
+    # When the latest run started and ended (None until it has)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
     class Config:
         json_encoders = {
@@ -0,0 +1,42 @@
+from enum import Enum
+from typing import Optional, List
+from pydantic import BaseModel, Field
+
+
+class IntervalMethod(str, Enum):
+    WILSON = "wilson"  # From the Wilson interval on the per-run pass rate
+    BOOTSTRAP = "bootstrap"  # Percentile bootstrap over runs
+
+
+class UnitCounts(BaseModel):
+    """Runs and passes for one config (or one config on one unit of a comparison)"""
+    samples: int = Field(ge=0)
+    successes: int = Field(ge=0)
+
+
+class ConfigCounts(UnitCounts):
+    key: str
+
+
+class PassAtKRequest(BaseModel):
+    """pass@k with confidence intervals for a batch of configs"""
+    configs: List[ConfigCounts] = Field(min_length=1)
+    ks: Optional[List[int]] = None  # Defaults to every k up to the largest sample count
+    interval: IntervalMethod = IntervalMethod.WILSON
+    confidence: float = Field(default=0.95, gt=0.0, lt=1.0)
+
+
+class Comparison(BaseModel):
+    """Two configs run on the same units (tasks, seeds, ...); a[i] and b[i] are the same unit"""
+    key: str
+    a: List[UnitCounts] = Field(min_length=1)
+    b: List[UnitCounts] = Field(min_length=1)
+
+
+class ComparisonRequest(BaseModel):
+    """Paired pass@k comparisons for a batch of config pairs"""
+    comparisons: List[Comparison] = Field(min_length=1)
+    k: int = Field(default=1, ge=1)
+    confidence: float = Field(default=0.95, gt=0.0, lt=1.0)
+    resamples: int = Field(default=2000, ge=100, le=100000)
+    seed: Optional[int] = None
@@ -0,0 +1,69 @@
+from enum import Enum
+from typing import Optional, List
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+from app.models.simulation import SimulationConfig
+
+
+class SweepStatus(str, Enum):
+    RUNNING = "running"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+
+class SweepStopReason(str, Enum):
+    """Why a config stopped receiving samples"""
+    CONVERGED = "converged"  # Confidence interval narrower than target_width
+    SEPARATED = "separated"  # Interval no longer overlaps any other config's
+    MAX_SAMPLES = "max_samples"
+    ERRORS = "errors"  # Too many runs failed to produce a verdict
+    BUDGET = "budget"  # Sweep budget ran out first
+    CANCELLED = "cancelled"
+
+
+class SweepRequest(BaseModel):
+    """An adaptive pass@k sweep over several configs"""
+    configs: List[SimulationConfig] = Field(min_length=1)
+    k: int = Field(default=1, ge=1)  # Report pass@k as well as the per-sample pass rate
+    max_samples: int = Field(default=50, ge=1)  # Per config
+    min_samples: int = Field(default=5, ge=1)  # Before any early stop
+    target_width: float = Field(default=0.2, gt=0.0, le=1.0)  # Stop once the interval is this narrow
+    confidence: float = Field(default=0.95, gt=0.0, lt=1.0)
+    budget: Optional[int] = Field(default=None, ge=1)  # Total samples; defaults to max_samples per config
+    concurrency: int = Field(default=8, ge=1)
+
+
+class SweepConfigResult(BaseModel):
+    """Sampling progress and pass-rate estimate for one config of a sweep"""
+    index: int
+    samples: int = 0
+    successes: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    pass_rate: Optional[float] = None
+    ci_low: float = 0.0
+    ci_high: float = 1.0
+    pass_at_k_low: float = 0.0
+    pass_at_k_high: float = 1.0
+    stop_reason: Optional[SweepStopReason] = None
+    simulation_ids: List[str] = []
+
+
+class SweepState(BaseModel):
+    """Current state of an adaptive sweep"""
+    sweep_id: str
+    request: SweepRequest
+    status: SweepStatus = SweepStatus.RUNNING
+    results: List[SweepConfigResult] = []
+    samples_used: int = 0
+    budget: int
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        json_encoders = {
+            datetime: lambda v: v.isoformat()
+        }
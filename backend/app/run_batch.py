@@ -0,0 +1,363 @@
+"""
+Offline batch runner.
+
+Runs SimulationConfigs from a JSONL file without the web server:
+
+    python -m app.run_batch configs.jsonl -o results.jsonl --concurrency 8
+
+Each completed simulation is appended to the output file as a SimulationState
+JSON line (the same format as GET /api/simulations/export), and its input line
+number, simulation ID and status are recorded in a checkpoint file. Re-running
+the same command resumes from where an interrupted job stopped; with
+--retry-failed, configs whose run failed are run again.
+"""
+from dotenv import load_dotenv
+
+# Load environment variables FIRST before any other imports
+load_dotenv()
+
+import argparse
+import asyncio
+import os
+import re
+import sys
+import time
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+from pydantic import ValidationError
+
+from app.models import SimulationConfig, SimulationStatus
+from app.agents import SimulationOrchestrator, ProcessPoolRunner
+
+
+def read_configs(path: str) -> Iterator[Tuple[int, str]]:
+    """Yield (line_number, raw_line) for every non-empty line of the input file"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if line:
+                yield line_number, line
+
+
+# Results are SimulationState JSON, which starts with the simulation ID
+_RESULT_ID_RE = re.compile(rb'^\{"simulation_id":"([^"]*)"')
+
+
+def load_checkpoint(path: str) -> Dict[int, Tuple[str, str]]:
+    """
+    Input line number -> (simulation_id, status) for every line already run.
+    A line run more than once (--retry-failed) keeps its latest entry.
+    """
+    completed: Dict[int, Tuple[str, str]] = {}
+    if not os.path.exists(path):
+        return completed
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if fields[0].strip().isdigit():
+                simulation_id = fields[1] if len(fields) > 1 else ""
+                status = fields[2] if len(fields) > 2 else ""
+                completed[int(fields[0])] = (simulation_id, status)
+    return completed
+
+
+def drop_results(path: str, keep: Set[str]):
+    """
+    Rewrite the output without results whose simulation isn't in `keep`:
+    a result written just before a crash that never reached the checkpoint,
+    or a failed attempt that is about to be retried
+    """
+    if not os.path.exists(path):
+        return
+
+    def kept(line: bytes) -> bool:
+        match = _RESULT_ID_RE.match(line)
+        return match is None or match.group(1).decode() in keep
+
+    with open(path, "rb") as f:
+        if all(kept(line) for line in f):
+            return
+
+    temporary = f"{path}.tmp"
+    with open(path, "rb") as source, open(temporary, "wb") as target:
+        for line in source:
+            if kept(line):
+                target.write(line)
+        target.flush()
+        os.fsync(target.fileno())
+    os.replace(temporary, path)
+
+
+def truncate_partial_line(path: str):
+    """Drop a trailing partial line left behind by an interrupted write"""
+    if not os.path.exists(path):
+        return
+
+    with open(path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+
+        # Walk back to the last complete line
+        position = size
+        while position > 0:
+            step = min(64 * 1024, position)
+            position -= step
+            f.seek(position)
+            block = f.read(step)
+            newline = block.rfind(b"\n")
+            if newline != -1:
+                f.truncate(position + newline + 1)
+                return
+        f.truncate(0)
+
+
+class BatchRunner:
+    """
+    Drives a SimulationOrchestrator over a JSONL file of configs with bounded
+    concurrency, writing results and checkpoints incrementally.
+    """
+
+    def __init__(
+        self,
+        input_path: str,
+        output_path: str,
+        checkpoint_path: Optional[str] = None,
+        concurrency: int = 4,
+        progress_interval: float = 10.0,
+        orchestrator: Optional[SimulationOrchestrator] = None,
+        pool: Optional[ProcessPoolRunner] = None,
+        retry_failed: bool = False
+    ):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.checkpoint_path = checkpoint_path or f"{output_path}.checkpoint"
+        self.concurrency = concurrency
+        self.progress_interval = progress_interval
+        self.retry_failed = retry_failed
+        # With a process pool, simulations run in worker processes instead
+        self.pool = pool
+        self.orchestrator = None if pool else (orchestrator or SimulationOrchestrator())
+
+        self.total = 0
+        self.skipped = 0
+        self.completed = 0
+        self.failed = 0
+        self.tokens = 0
+        self.started_at = 0.0
+
+    async def run(self):
+        """Run every config not yet recorded in the checkpoint"""
+        truncate_partial_line(self.checkpoint_path)
+        truncate_partial_line(self.output_path)
+        checkpointed = load_checkpoint(self.checkpoint_path)
+        done = {
+            line_number for line_number, (_, status) in checkpointed.items()
+            if not (self.retry_failed and status == SimulationStatus.FAILED.value)
+        }
+        # The output keeps exactly one result per finished line: its checkpointed one
+        drop_results(self.output_path, {checkpointed[line_number][0] for line_number in done})
+
+        self.total = sum(1 for _ in read_configs(self.input_path))
+        self.skipped = len(done)
+        self.started_at = time.monotonic()
+
+        reporter = asyncio.create_task(self._report_progress())
+
+        with open(self.output_path, "a", encoding="utf-8") as output, \
+                open(self.checkpoint_path, "a", encoding="utf-8") as checkpoint:
+            try:
+                if self.pool:
+                    await self._run_pool(done, output, checkpoint)
+                else:
+                    await self._run_local(done, output, checkpoint)
+            finally:
+                reporter.cancel()
+                self._print_progress()
+
+    def _pending_configs(self, done: Set[int]) -> Iterator[Tuple[int, SimulationConfig]]:
+        """Yield valid configs whose line isn't checkpointed yet"""
+        for line_number, line in read_configs(self.input_path):
+            if line_number in done:
+                continue
+
+            try:
+                yield line_number, SimulationConfig.model_validate_json(line)
+            except ValidationError as e:
+                self.failed += 1
+                print(f"Line {line_number}: invalid config: {e}", file=sys.stderr)
+
+    async def _run_local(self, done: Set[int], output, checkpoint):
+        """Run simulations on this process's event loop"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        pending: Set[asyncio.Task] = set()
+
+        try:
+            for line_number, config in self._pending_configs(done):
+                # Acquire before creating the task so we never hold more
+                # than `concurrency` configs in memory at once
+                await semaphore.acquire()
+                task = asyncio.create_task(
+                    self._run_one(line_number, config, output, checkpoint)
+                )
+                task.add_done_callback(lambda _: semaphore.release())
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+
+            if pending:
+                await asyncio.gather(*pending)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _run_pool(self, done: Set[int], output, checkpoint):
+        """Run simulations across the worker process pool"""
+        jobs = (
+            (str(line_number), config)
+            for line_number, config in self._pending_configs(done)
+        )
+        async for record in self.pool.run(jobs):
+            if record.error is not None:
+                print(f"Line {record.key}: simulation failed: {record.error}", file=sys.stderr)
+            self._write_result(
+                int(record.key),
+                record.simulation_id,
+                record.status,
+                record.input_tokens + record.output_tokens,
+                record.state_json,
+                output,
+                checkpoint
+            )
+
+    async def _run_one(self, line_number: int, config: SimulationConfig, output, checkpoint):
+        """Run a single simulation and persist its final state"""
+        simulation_id = self.orchestrator.create_simulation(config)
+        state = self.orchestrator.get_simulation(simulation_id)
+
+        try:
+            async for _ in self.orchestrator.run_simulation(simulation_id, headless=True):
+                pass
+        except Exception as e:
+            state.status = SimulationStatus.FAILED
+            print(f"Line {line_number}: simulation failed: {e}", file=sys.stderr)
+
+        self._write_result(
+            line_number,
+            simulation_id,
+            state.status.value,
+            state.usage.input_tokens + state.usage.output_tokens,
+            state.model_dump_json(),
+            output,
+            checkpoint
+        )
+        # Results live on disk; keep the orchestrator's memory flat
+        self.orchestrator.active_simulations.pop(simulation_id, None)
+
+    def _write_result(
+        self,
+        line_number: int,
+        simulation_id: str,
+        status: str,
+        tokens: int,
+        state_json: str,
+        output,
+        checkpoint
+    ):
+        """
+        Append the result, then mark the input line as done. A crash in
+        between leaves a result with no checkpoint entry, which the next
+        run drops before running that line again.
+        """
+        output.write(state_json + "\n")
+        output.flush()
+        checkpoint.write(f"{line_number}\t{simulation_id}\t{status}\n")
+        checkpoint.flush()
+
+        if status == SimulationStatus.FAILED.value:
+            self.failed += 1
+        else:
+            self.completed += 1
+        self.tokens += tokens
+
+    async def _report_progress(self):
+        """Print throughput periodically"""
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            self._print_progress()
+
+    def _print_progress(self):
+        elapsed_min = max(time.monotonic() - self.started_at, 1e-6) / 60
+        finished = self.completed + self.failed
+        print(
+            f"[{self.skipped + finished}/{self.total}] "
+            f"completed={self.completed} failed={self.failed} "
+            f"{finished / elapsed_min:.1f} sims/min "
+            f"{self.tokens / elapsed_min:.0f} tokens/min",
+            file=sys.stderr,
+            flush=True
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m app.run_batch",
+        description="Run simulations from a JSONL file of SimulationConfigs"
+    )
+    parser.add_argument("input", help="JSONL file with one SimulationConfig per line")
+    parser.add_argument("-o", "--output", required=True, help="JSONL file to append results to")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument(
+        "-c", "--concurrency", type=int, default=4,
+        help="Simulations to run at once (per process with --processes)"
+    )
+    parser.add_argument(
+        "-p", "--processes", type=int, default=0,
+        help="Shard simulations across this many worker processes (0 = run in-process)"
+    )
+    parser.add_argument(
+        "--requests-per-minute", type=float,
+        help="Global LLM request budget shared by all worker processes"
+    )
+    parser.add_argument(
+        "--retry-failed", action="store_true",
+        help="Run configs whose previous run failed again (their failed results are replaced)"
+    )
+    parser.add_argument(
+        "--progress-interval", type=float, default=10.0,
+        help="Seconds between throughput reports"
+    )
+    args = parser.parse_args(argv)
+
+    pool = None
+    if args.processes > 0:
+        pool = ProcessPoolRunner(
+            processes=args.processes,
+            concurrency_per_process=args.concurrency,
+            requests_per_minute=args.requests_per_minute
+        )
+
+    runner = BatchRunner(
+        input_path=args.input,
+        output_path=args.output,
+        checkpoint_path=args.checkpoint,
+        concurrency=args.concurrency,
+        progress_interval=args.progress_interval,
+        pool=pool,
+        retry_failed=args.retry_failed
+    )
+
+    try:
+        asyncio.run(runner.run())
+    except KeyboardInterrupt:
+        print("Interrupted; re-run the same command to resume", file=sys.stderr)
+        return 130
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
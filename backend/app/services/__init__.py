@@ -1,3 +1,28 @@
 from .llm_service import LLMService
+from .rate_limiter import SharedRateLimiter, TokenWindow
+from .circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+from .cassette import Cassette, CassetteMissError
+from .event_hub import EventHub, SlowConsumerPolicy, Subscription
+from .admission import AdmissionController, AdmissionRejected, AdmissionTicket, Priority
+from .providers import ModelInfo, ModelRegistry, model_registry
 
-__all__ = ["LLMService"]
+__all__ = [
+    "LLMService",
+    "SharedRateLimiter",
+    "TokenWindow",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "CircuitState",
+    "Cassette",
+    "CassetteMissError",
+    "EventHub",
+    "SlowConsumerPolicy",
+    "Subscription",
+    "AdmissionController",
+    "AdmissionRejected",
+    "AdmissionTicket",
+    "Priority",
+    "ModelInfo",
+    "ModelRegistry",
+    "model_registry"
+]
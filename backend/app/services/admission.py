@@ -0,0 +1,271 @@
+import asyncio
+import math
+import time
+from collections import deque
+from enum import Enum
+from typing import Callable, Collection, Deque, Dict, Optional
+
+from app.services.rate_limiter import TokenWindow
+
+# How often queued requests re-check capacity freed outside of ticket releases
+# (runs started by sweeps and other jobs finishing, token usage ageing out)
+QUEUE_POLL_SECONDS = 0.25
+
+
+class Priority(str, Enum):
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+
+
+class AdmissionRejected(Exception):
+    """Raised when a run can't be admitted now; retry_after is a hint in seconds"""
+
+    def __init__(self, priority: Priority, reason: str, retry_after: float, queue_position: Optional[int] = None):
+        super().__init__(f"Over capacity for {priority.value} runs ({reason}); retry in {math.ceil(retry_after)}s")
+        self.priority = priority
+        self.reason = reason
+        self.retry_after = retry_after
+        self.queue_position = queue_position
+
+
+class AdmissionTicket:
+    """A granted run slot; released when the run ends"""
+
+    def __init__(self, controller: "AdmissionController", priority: Priority, simulation_id: Optional[str]):
+        self.controller = controller
+        self.priority = priority
+        self.simulation_id = simulation_id
+        self.granted_at = time.monotonic()
+        self.bound = False
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.controller._release(self)
+
+    def bind(self, task: Optional[asyncio.Task]):
+        """Release the ticket when a run task finishes (or now, without one)"""
+        if task is None or task.done():
+            self.release()
+        else:
+            self.bound = True
+            task.add_done_callback(lambda _: self.release())
+
+
+class _Waiter:
+    def __init__(self, priority: Priority, simulation_id: Optional[str]):
+        self.priority = priority
+        self.simulation_id = simulation_id
+        self.ready = asyncio.Event()
+        self.ticket: Optional[AdmissionTicket] = None
+
+
+class AdmissionController:
+    """
+    Admission control for simulation runs, by priority class.
+
+    A run is admitted while the number of runs in flight is under the
+    class's limit and provider token usage over the last minute leaves the
+    class enough headroom. Batch runs may only use `batch_share` of the run
+    slots and `batch_token_share` of the token budget, so interactive runs
+    find capacity that batch work can't take. Sweeps, tree searches and
+    re-scores take a batch ticket per run (acquire); anything that starts
+    a run without a ticket still counts towards the in-flight total, but
+    isn't held back by the controller.
+
+    A request that can't start straight away waits in its class's queue
+    for up to `max_wait` seconds; interactive waiters are served first.
+    When the queue is full or the wait runs out, AdmissionRejected carries
+    a Retry-After estimate from the recent run durations, so load is shed
+    early instead of every request timing out together.
+    """
+
+    def __init__(
+        self,
+        max_running: int = 64,
+        batch_share: float = 0.75,
+        max_queued: Optional[Dict[Priority, int]] = None,
+        max_wait: Optional[Dict[Priority, float]] = None,
+        tokens_per_minute: Optional[int] = None,
+        batch_token_share: float = 0.8,
+        token_usage: Optional[TokenWindow] = None,
+        running: Optional[Callable[[], Collection[str]]] = None
+    ):
+        self.max_running = max_running
+        self.batch_share = batch_share
+        self.max_queued = max_queued or {Priority.INTERACTIVE: 32, Priority.BATCH: 256}
+        self.max_wait = max_wait or {Priority.INTERACTIVE: 5.0, Priority.BATCH: 30.0}
+        self.tokens_per_minute = tokens_per_minute
+        self.batch_token_share = batch_token_share
+        self.token_usage = token_usage or TokenWindow(60.0)
+        # IDs of every simulation running, however it was started
+        self._running = running or (lambda: ())
+        self._tickets: Dict[int, AdmissionTicket] = {}
+        self._queues: Dict[Priority, Deque[_Waiter]] = {priority: deque() for priority in Priority}
+        self._average_run_seconds = 30.0
+        self.admitted = {priority: 0 for priority in Priority}
+        self.rejected = {priority: 0 for priority in Priority}
+
+    def limit(self, priority: Priority) -> int:
+        """Runs in flight up to which a class is admitted"""
+        if priority == Priority.INTERACTIVE:
+            return self.max_running
+        return max(1, int(self.max_running * self.batch_share))
+
+    def in_flight(self) -> int:
+        """Running simulations, plus admitted runs that haven't started yet"""
+        running = set(self._running())
+        waiting_to_start = sum(1 for ticket in self._tickets.values() if ticket.simulation_id not in running)
+        return len(running) + waiting_to_start
+
+    def check(self, priority: Priority):
+        """Raise AdmissionRejected if a new run of this class would be turned away right now"""
+        blocked = self._blocked(priority)
+        if blocked is not None and len(self._queues[priority]) >= self.max_queued[priority]:
+            self.rejected[priority] += 1
+            raise AdmissionRejected(
+                priority, blocked, self._retry_after(priority, blocked), len(self._queues[priority]) + 1
+            )
+
+    async def admit(self, priority: Priority, simulation_id: Optional[str] = None) -> AdmissionTicket:
+        """A run slot, waiting in the class's queue if needed; raises AdmissionRejected"""
+        queue = self._queues[priority]
+        if not queue and not self._waiting_ahead(priority) and self._blocked(priority) is None:
+            return self._grant(priority, simulation_id)
+
+        blocked = self._blocked(priority) or "queued"
+        if len(queue) >= self.max_queued[priority] or self.max_wait[priority] <= 0:
+            self.rejected[priority] += 1
+            raise AdmissionRejected(priority, blocked, self._retry_after(priority, blocked), len(queue) + 1)
+        return await self._wait(_Waiter(priority, simulation_id), time.monotonic() + self.max_wait[priority])
+
+    async def acquire(self, priority: Priority, simulation_id: Optional[str] = None) -> AdmissionTicket:
+        """
+        A run slot for background jobs (sweeps, tree searches, re-scores):
+        waits as long as it takes, and isn't bounded by the queue limit
+        """
+        queue = self._queues[priority]
+        if not queue and not self._waiting_ahead(priority) and self._blocked(priority) is None:
+            return self._grant(priority, simulation_id)
+        return await self._wait(_Waiter(priority, simulation_id), None)
+
+    def try_admit(self, priority: Priority, simulation_id: Optional[str] = None) -> AdmissionTicket:
+        """A run slot now, without queueing; raises AdmissionRejected"""
+        queue = self._queues[priority]
+        blocked = self._blocked(priority)
+        if blocked is None and (queue or self._waiting_ahead(priority)):
+            blocked = "queued"
+        if blocked is not None:
+            self.rejected[priority] += 1
+            raise AdmissionRejected(priority, blocked, self._retry_after(priority, blocked), len(queue) + 1)
+        return self._grant(priority, simulation_id)
+
+    def ready(self, priority: Priority) -> bool:
+        """Whether a run of this class would be admitted or queued now"""
+        return self._blocked(priority) is None or len(self._queues[priority]) < self.max_queued[priority]
+
+    def retry_after(self, priority: Priority) -> float:
+        """Seconds until a new run of this class is likely to be admitted"""
+        return self._retry_after(priority, self._blocked(priority) or "queued")
+
+    def snapshot(self) -> Dict:
+        tokens = self.token_usage.total()
+        return {
+            "in_flight": self.in_flight(),
+            "max_running": self.max_running,
+            "tokens_last_minute": tokens,
+            "tokens_per_minute": self.tokens_per_minute,
+            "average_run_seconds": round(self._average_run_seconds, 1),
+            "priorities": {
+                priority.value: {
+                    "ready": self.ready(priority),
+                    "limit": self.limit(priority),
+                    "queued": len(self._queues[priority]),
+                    "max_queued": self.max_queued[priority],
+                    "admitted": self.admitted[priority],
+                    "rejected": self.rejected[priority],
+                    "blocked": self._blocked(priority),
+                }
+                for priority in Priority
+            },
+        }
+
+    async def _wait(self, waiter: _Waiter, deadline: Optional[float]) -> AdmissionTicket:
+        """Queue a waiter until it is granted a ticket, or until the deadline"""
+        queue = self._queues[waiter.priority]
+        queue.append(waiter)
+        try:
+            while waiter.ticket is None:
+                timeout = QUEUE_POLL_SECONDS
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        position = queue.index(waiter) + 1
+                        reason = self._blocked(waiter.priority) or "queued"
+                        self.rejected[waiter.priority] += 1
+                        raise AdmissionRejected(
+                            waiter.priority, reason, self._retry_after(waiter.priority, reason, position), position
+                        )
+                    timeout = min(remaining, timeout)
+                try:
+                    await asyncio.wait_for(waiter.ready.wait(), timeout)
+                except asyncio.TimeoutError:
+                    self._pump()
+        except BaseException:
+            if waiter in queue:
+                queue.remove(waiter)
+            if waiter.ticket is not None:
+                # Granted just as the wait was abandoned
+                waiter.ticket.release()
+            raise
+        return waiter.ticket
+
+    def _blocked(self, priority: Priority) -> Optional[str]:
+        """Why a run of this class can't start right now (None if it can)"""
+        if self.in_flight() >= self.limit(priority):
+            return "runs"
+        if self.tokens_per_minute and self.token_usage.total() >= self._token_limit(priority):
+            return "tokens"
+        return None
+
+    def _token_limit(self, priority: Priority) -> float:
+        share = 1.0 if priority == Priority.INTERACTIVE else self.batch_token_share
+        return self.tokens_per_minute * share
+
+    def _waiting_ahead(self, priority: Priority) -> bool:
+        """Whether a higher class is waiting for the capacity a new run would take"""
+        return priority == Priority.BATCH and bool(self._queues[Priority.INTERACTIVE])
+
+    def _grant(self, priority: Priority, simulation_id: Optional[str]) -> AdmissionTicket:
+        ticket = AdmissionTicket(self, priority, simulation_id)
+        self._tickets[id(ticket)] = ticket
+        self.admitted[priority] += 1
+        return ticket
+
+    def _release(self, ticket: AdmissionTicket):
+        self._tickets.pop(id(ticket), None)
+        if ticket.bound:
+            # Recent run durations drive the Retry-After estimates
+            held = time.monotonic() - ticket.granted_at
+            self._average_run_seconds += 0.1 * (held - self._average_run_seconds)
+        self._pump()
+
+    def _pump(self):
+        """Hand freed capacity to queued requests, interactive first"""
+        for priority in Priority:
+            queue = self._queues[priority]
+            while queue and self._blocked(priority) is None and not self._waiting_ahead(priority):
+                waiter = queue.popleft()
+                waiter.ticket = self._grant(priority, waiter.simulation_id)
+                waiter.ready.set()
+
+    def _retry_after(self, priority: Priority, reason: str, position: Optional[int] = None) -> float:
+        """Seconds until a run of this class is likely to be admitted"""
+        if reason == "tokens":
+            return max(1.0, self.token_usage.seconds_until_below(self._token_limit(priority)))
+        ahead = len(self._queues[priority]) if position is None else position - 1
+        if priority == Priority.BATCH:
+            ahead += len(self._queues[Priority.INTERACTIVE])
+        # Slots free up at about limit / average_run_seconds per second
+        return max(1.0, (ahead + 1) * self._average_run_seconds / max(1, self.limit(priority)))
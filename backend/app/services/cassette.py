@@ -0,0 +1,152 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode for a request that was never recorded"""
+
+    def __init__(self, model: str, key: str):
+        super().__init__(f"No recorded response for {model} (fingerprint {key[:12]})")
+        self.model = model
+        self.key = key
+
+
+class Cassette:
+    """
+    Recorded LLM traffic for reproducible runs.
+
+    Each request is fingerprinted (sha256 of the model, prompt, messages and
+    sampling parameters). In "record" mode every completed provider response
+    is appended to a gzipped JSON-lines file: streams as their chunks with
+    the delay before each one (ms), plain calls as their result and latency.
+    In "replay" mode those responses are served back without touching the
+    network, either at the recorded pace (speed="recorded") or with no
+    delays (speed="fast").
+
+    A fingerprint can be recorded several times (e.g. the opening turn of
+    repeated runs of one config); replay serves the recordings in order and
+    keeps repeating the last one.
+
+    Each recording is written as its own gzip member with a single append,
+    so several processes can record into the same file.
+    """
+
+    MODES = ("record", "replay")
+
+    def __init__(self, path: str, mode: str, speed: str = "recorded"):
+        if mode not in self.MODES:
+            raise ValueError(f"Cassette mode must be one of {self.MODES}, got {mode!r}")
+        if speed not in ("recorded", "fast"):
+            raise ValueError(f"Cassette speed must be 'recorded' or 'fast', got {speed!r}")
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self._recordings: Optional[Dict[str, List[Dict]]] = None
+        self._served: Dict[str, int] = {}
+        self._write_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["Cassette"]:
+        """Cassette configured by LLM_CASSETTE_MODE / _PATH / _SPEED, if any"""
+        mode = os.getenv("LLM_CASSETTE_MODE", "off").lower()
+        if mode in ("", "off"):
+            return None
+        return cls(
+            path=os.getenv("LLM_CASSETTE_PATH", "llm_cassette.jsonl.gz"),
+            mode=mode,
+            speed=os.getenv("LLM_CASSETTE_SPEED", "recorded").lower()
+        )
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @staticmethod
+    def fingerprint(
+        kind: str,
+        model: str,
+        system_prompt: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        payload = json.dumps(
+            [kind, model, system_prompt, messages, temperature, max_tokens],
+            sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def record_stream(
+        self,
+        key: str,
+        model: str,
+        stream: AsyncIterator[Dict]
+    ) -> AsyncIterator[Dict]:
+        """Pass a provider stream through, saving it once it completes"""
+        chunks = []
+        last = time.monotonic()
+        async for chunk in stream:
+            now = time.monotonic()
+            chunks.append([round((now - last) * 1000), chunk])
+            last = now
+            yield chunk
+        # Interrupted streams are not recorded
+        self._append({"key": key, "model": model, "chunks": chunks})
+
+    def record_call(self, key: str, model: str, result: Tuple, latency: float):
+        self._append({
+            "key": key,
+            "model": model,
+            "result": list(result),
+            "latency_ms": round(latency * 1000)
+        })
+
+    async def replay_stream(self, key: str, model: str) -> AsyncIterator[Dict]:
+        for delay_ms, chunk in self._next(key, model)["chunks"]:
+            await self._wait(delay_ms)
+            yield chunk
+
+    async def replay_call(self, key: str, model: str) -> Tuple:
+        """The recorded result tuple, e.g. (content, reasoning)"""
+        recording = self._next(key, model)
+        await self._wait(recording["latency_ms"])
+        return tuple(recording["result"])
+
+    def _next(self, key: str, model: str) -> Dict:
+        if self._recordings is None:
+            self._recordings = self._load()
+        recordings = self._recordings.get(key)
+        if not recordings:
+            raise CassetteMissError(model, key)
+        index = self._served.get(key, 0)
+        self._served[key] = index + 1
+        return recordings[min(index, len(recordings) - 1)]
+
+    async def _wait(self, delay_ms: int):
+        if self.speed == "recorded" and delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+
+    def _load(self) -> Dict[str, List[Dict]]:
+        recordings: Dict[str, List[Dict]] = {}
+        if not os.path.exists(self.path):
+            return recordings
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    recordings.setdefault(entry["key"], []).append(entry)
+        return recordings
+
+    def _append(self, entry: Dict):
+        data = gzip.compress(
+            (json.dumps(entry, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8")
+        )
+        with self._write_lock:
+            with open(self.path, "ab") as f:
+                f.write(data)
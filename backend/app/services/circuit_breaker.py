@@ -0,0 +1,134 @@
+import time
+from collections import deque
+from enum import Enum
+from typing import Deque, Dict, Optional, Tuple
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit for {name} is open; retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Health tracker for one provider/model.
+
+    Keeps a rolling window of call outcomes and latencies. When the error rate
+    (slow calls count as errors if slow_call_seconds is set) exceeds the
+    threshold over at least min_requests calls, the circuit opens and calls
+    fail fast for open_seconds. It then goes half-open and lets a limited
+    number of probe calls through: a successful probe closes it again, a
+    failed one re-opens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        error_rate_threshold: float = 0.5,
+        min_requests: int = 10,
+        window_seconds: float = 60.0,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+        slow_call_seconds: Optional[float] = None
+    ):
+        self.name = name
+        self.error_rate_threshold = error_rate_threshold
+        self.min_requests = min_requests
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.slow_call_seconds = slow_call_seconds
+
+        self.state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        # (timestamp, failed, latency) for calls in the window
+        self._outcomes: Deque[Tuple[float, bool, float]] = deque()
+        self._failures = 0
+
+    def acquire(self):
+        """Claim permission for a call, or raise CircuitOpenError"""
+        if self.state == CircuitState.OPEN:
+            remaining = self._opened_at + self.open_seconds - time.monotonic()
+            if remaining > 0:
+                raise CircuitOpenError(self.name, remaining)
+            self.state = CircuitState.HALF_OPEN
+            self._probes_in_flight = 0
+
+        if self.state == CircuitState.HALF_OPEN:
+            if self._probes_in_flight >= self.half_open_probes:
+                raise CircuitOpenError(self.name, self.open_seconds)
+            self._probes_in_flight += 1
+
+    def release(self, success: Optional[bool], latency: float = 0.0):
+        """
+        Report the outcome of an acquired call.
+        success=None means the outcome says nothing about provider health
+        (e.g. the call was cancelled or rejected as a bad request).
+        """
+        if self.state == CircuitState.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if success is None:
+                return
+            if success and not self._is_slow(latency):
+                self._close()
+            else:
+                self._open()
+            return
+
+        if success is None:
+            return
+
+        now = time.monotonic()
+        failed = not success or self._is_slow(latency)
+        self._outcomes.append((now, failed, latency))
+        self._failures += failed
+        self._expire(now)
+
+        if (
+            self.state == CircuitState.CLOSED
+            and len(self._outcomes) >= self.min_requests
+            and self._failures / len(self._outcomes) >= self.error_rate_threshold
+        ):
+            self._open()
+
+    def snapshot(self) -> Dict:
+        """Current state and rolling stats"""
+        self._expire(time.monotonic())
+        latencies = sorted(latency for _, failed, latency in self._outcomes if not failed)
+        total = len(self._outcomes)
+        return {
+            "state": self.state.value,
+            "requests": total,
+            "error_rate": self._failures / total if total else 0.0,
+            "p50_latency": latencies[len(latencies) // 2] if latencies else None,
+            "p95_latency": latencies[int(0.95 * (len(latencies) - 1))] if latencies else None,
+        }
+
+    def _is_slow(self, latency: float) -> bool:
+        return self.slow_call_seconds is not None and latency > self.slow_call_seconds
+
+    def _expire(self, now: float):
+        while self._outcomes and self._outcomes[0][0] < now - self.window_seconds:
+            _, failed, _ = self._outcomes.popleft()
+            self._failures -= failed
+
+    def _open(self):
+        self.state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._probes_in_flight = 0
+
+    def _close(self):
+        self.state = CircuitState.CLOSED
+        self._outcomes.clear()
+        self._failures = 0
@@ -0,0 +1,255 @@
+import asyncio
+from collections import deque
+from enum import Enum
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Set
+
+# Events whose deltas can be merged without losing text
+_DELTA_EVENTS = {"content_delta", "reasoning_delta", "verification_delta"}
+# Events that must reach every subscriber
+_TERMINAL_EVENTS = {"simulation_complete", "simulation_cancelled", "error"}
+# Queue marker: deliver a fresh snapshot of the simulation here
+_SNAPSHOT = object()
+
+
+class SlowConsumerPolicy(str, Enum):
+    """What to do when a subscriber's queue is full"""
+    COALESCE = "coalesce"  # Merge queued deltas; fall back to a snapshot if that isn't enough
+    SNAPSHOT = "snapshot"  # Drop the backlog and send the current state instead
+    DISCONNECT = "disconnect"  # End the subscription (not the run) with an error event
+
+
+class Subscription:
+    """
+    One consumer of a simulation's events, with its own bounded queue.
+
+    The producer never waits on a subscription: offer() always returns
+    immediately, and a full queue is handled by the subscriber's policy.
+    """
+
+    def __init__(
+        self,
+        broadcast: "_Broadcast",
+        policy: SlowConsumerPolicy,
+        max_queue: int,
+        from_snapshot: bool = False
+    ):
+        self._broadcast = broadcast
+        self.policy = policy
+        self.max_queue = max_queue
+        self._queue: Deque[Any] = deque()
+        self._ready = asyncio.Event()
+        self._snapshot_pending = from_snapshot
+        self._finished = False
+        self.overflows = 0
+        if from_snapshot:
+            # Joined a run in progress: catch up from the current state
+            self._queue.extend([{"type": "status", "status": "running"}, _SNAPSHOT])
+
+    def offer(self, event: Dict):
+        if self._finished:
+            return
+
+        if self._snapshot_pending:
+            # The snapshot is built when it is read, so it will include this event
+            if event["type"] in _TERMINAL_EVENTS:
+                self._queue.append(event)
+            return
+
+        if len(self._queue) >= self.max_queue:
+            self.overflows += 1
+            if self.policy == SlowConsumerPolicy.DISCONNECT:
+                self._queue.clear()
+                self._queue.append({
+                    "type": "error",
+                    "message": "Event stream fell too far behind and was disconnected"
+                })
+                self._finished = True
+                # Only this subscription ends; the run carries on for everyone else
+                self._broadcast.unsubscribe(self, stop_run=False)
+                self._ready.set()
+                return
+            if self.policy == SlowConsumerPolicy.COALESCE:
+                self._coalesce()
+            if len(self._queue) >= self.max_queue:
+                self._queue.clear()
+                self._queue.append(_SNAPSHOT)
+                self._snapshot_pending = True
+                self._ready.set()
+                return
+
+        if not self._merge(event):
+            self._queue.append(event)
+        self._ready.set()
+
+    def finish(self):
+        """No more events will be offered"""
+        self._finished = True
+        self._ready.set()
+
+    def close(self):
+        """Stop consuming (e.g. the client went away)"""
+        self._finished = True
+        self._queue.clear()
+        self._broadcast.unsubscribe(self)
+        self._ready.set()
+
+    async def events(self) -> AsyncIterator[Dict]:
+        try:
+            while True:
+                while self._queue:
+                    item = self._queue.popleft()
+                    if item is _SNAPSHOT:
+                        self._snapshot_pending = False
+                        item = self._broadcast.snapshot()
+                    yield item
+                if self._finished:
+                    return
+                self._ready.clear()
+                await self._ready.wait()
+        finally:
+            self._broadcast.unsubscribe(self)
+
+    def _merge(self, event: Dict) -> bool:
+        """Append a delta to the last queued event if it continues it"""
+        if self.policy != SlowConsumerPolicy.COALESCE or not self._queue:
+            return False
+        last = self._queue[-1]
+        if not _continues(last, event):
+            return False
+        # Events are shared between subscribers, so never mutate them
+        self._queue[-1] = dict(last, delta=last["delta"] + event["delta"])
+        return True
+
+    def _coalesce(self):
+        """Merge runs of queued deltas into single events"""
+        merged: Deque[Any] = deque()
+        for item in self._queue:
+            if merged and _continues(merged[-1], item):
+                merged[-1] = dict(merged[-1], delta=merged[-1]["delta"] + item["delta"])
+            else:
+                merged.append(item)
+        self._queue = merged
+
+
+def _continues(previous: Any, event: Any) -> bool:
+    return (
+        isinstance(previous, dict) and isinstance(event, dict)
+        and event["type"] in _DELTA_EVENTS
+        and previous["type"] == event["type"]
+        and previous.get("speaker") == event.get("speaker")
+        and previous.get("turn") == event.get("turn")
+    )
+
+
+class _Broadcast:
+    """One running simulation, its producer task and its subscribers"""
+
+    def __init__(self, hub: "EventHub", simulation_id: str):
+        self.hub = hub
+        self.simulation_id = simulation_id
+        self.subscribers: Set[Subscription] = set()
+        self.task: Optional[asyncio.Task] = None
+        # Output not yet in the simulation state, for snapshots
+        self.streaming: Optional[Dict] = None
+        self.verification: Optional[Dict] = None
+
+    def publish(self, event: Dict):
+        self._track(event)
+        for subscriber in list(self.subscribers):
+            subscriber.offer(event)
+
+    def unsubscribe(self, subscriber: Subscription, stop_run: bool = True):
+        if subscriber not in self.subscribers:
+            return
+        self.subscribers.discard(subscriber)
+        if stop_run and not self.subscribers and self.task is not None and not self.task.done():
+            # Nobody is watching any more: stop the run, as a closed SSE stream used to
+            self.task.cancel()
+
+    def snapshot(self) -> Dict:
+        state = self.hub.orchestrator.get_simulation(self.simulation_id)
+        return {
+            "type": "snapshot",
+            "state": state.model_dump(mode="json") if state else None,
+            "streaming": dict(self.streaming) if self.streaming else None,
+            "verification": dict(self.verification) if self.verification else None
+        }
+
+    def _track(self, event: Dict):
+        kind = event["type"]
+        if kind == "turn_start":
+            self.streaming = {"turn": event["turn"], "speaker": event["speaker"], "content": "", "reasoning": ""}
+        elif kind == "content_delta" and self.streaming:
+            self.streaming["content"] += event["delta"]
+        elif kind == "reasoning_delta" and self.streaming:
+            self.streaming["reasoning"] += event["delta"]
+        elif kind == "message_complete":
+            self.streaming = None
+        elif kind == "verification_start":
+            self.verification = {"text": "", "success": None}
+        elif kind == "verification_delta" and self.verification:
+            self.verification["text"] += event["delta"]
+        elif kind == "verification_verdict" and self.verification:
+            self.verification["success"] = event["success"]
+        elif kind == "verification_complete":
+            self.verification = None
+
+
+class EventHub:
+    """
+    Fans simulation events out to any number of subscribers.
+
+    Each simulation has one producer task that drains run_simulation at
+    full speed, so slow clients never hold up the provider stream. Every
+    subscriber reads from its own bounded queue. Subscribers joining a run
+    in progress start from a snapshot of the current state. When the last
+    subscriber closes or disconnects, the run is cancelled; a subscriber
+    dropped for falling behind doesn't count as leaving.
+    """
+
+    def __init__(self, orchestrator, queue_size: int = 256):
+        self.orchestrator = orchestrator
+        self.queue_size = queue_size
+        self._broadcasts: Dict[str, _Broadcast] = {}
+
+    def subscribe(
+        self,
+        simulation_id: str,
+        policy: SlowConsumerPolicy = SlowConsumerPolicy.COALESCE
+    ) -> Subscription:
+        """Watch a simulation, starting it if it isn't already being streamed"""
+        broadcast = self._broadcasts.get(simulation_id)
+        if broadcast is not None:
+            subscription = Subscription(broadcast, policy, self.queue_size, from_snapshot=True)
+            broadcast.subscribers.add(subscription)
+            return subscription
+
+        if not self.orchestrator.get_simulation(simulation_id):
+            raise ValueError(f"Simulation {simulation_id} not found")
+        broadcast = self._broadcasts[simulation_id] = _Broadcast(self, simulation_id)
+        subscription = Subscription(broadcast, policy, self.queue_size)
+        broadcast.subscribers.add(subscription)
+        broadcast.task = asyncio.create_task(self._produce(broadcast))
+        return subscription
+
+    def is_streaming(self, simulation_id: str) -> bool:
+        return simulation_id in self._broadcasts
+
+    def run_task(self, simulation_id: str) -> Optional[asyncio.Task]:
+        """The task producing a streamed simulation's events, while it streams"""
+        broadcast = self._broadcasts.get(simulation_id)
+        return broadcast.task if broadcast is not None else None
+
+    async def _produce(self, broadcast: _Broadcast):
+        try:
+            async for event in self.orchestrator.run_simulation(broadcast.simulation_id):
+                broadcast.publish(event)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            broadcast.publish({"type": "error", "message": str(e)})
+        finally:
+            if self._broadcasts.get(broadcast.simulation_id) is broadcast:
+                del self._broadcasts[broadcast.simulation_id]
+            for subscriber in list(broadcast.subscribers):
+                subscriber.finish()
@@ -1,29 +1,55 @@
+import asyncio
 import os
-from typing import List, Dict, AsyncIterator, Optional
-from anthropic import AsyncAnthropic
-from openai import AsyncOpenAI
-import json
+import time
+from collections import deque
+from typing import Deque, List, Dict, AsyncIterator, Optional, Tuple
 
+from app.services.rate_limiter import SharedRateLimiter, TokenWindow
+from app.services.providers import ModelRegistry, UnknownModelError, model_registry
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.cassette import Cassette, CassetteMissError
+
+# Time-to-first-token samples kept per model for adaptive hedging
+HEDGE_LATENCY_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
 
-class LLMService:
-    """Service for interacting with LLM providers (Anthropic, OpenAI)"""
 
-    def __init__(self):
-        self.anthropic_client = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-        self.openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+def _circuit_settings() -> Dict:
+    """Circuit breaker tuning from the environment"""
+    slow_call = os.getenv("CIRCUIT_SLOW_CALL_SECONDS")
+    return {
+        "error_rate_threshold": float(os.getenv("CIRCUIT_ERROR_RATE", 0.5)),
+        "min_requests": int(os.getenv("CIRCUIT_MIN_REQUESTS", 10)),
+        "window_seconds": float(os.getenv("CIRCUIT_WINDOW_SECONDS", 60)),
+        "open_seconds": float(os.getenv("CIRCUIT_OPEN_SECONDS", 30)),
+        "slow_call_seconds": float(slow_call) if slow_call else None,
+    }
 
-    def _is_anthropic_model(self, model: str) -> bool:
-        """Check if model is an Anthropic model"""
-        return model.startswith("claude")
 
-    def _format_messages_for_provider(
+class LLMService:
+    """Service for interacting with LLM providers (Anthropic, OpenAI)"""
+
+    def __init__(
         self,
-        messages: List[Dict[str, str]],
-        is_anthropic: bool
-    ) -> List[Dict[str, str]]:
-        """Format messages for the specific provider"""
-        # Both providers use similar message format, but we can adapt if needed
-        return messages
+        rate_limiter: Optional[SharedRateLimiter] = None,
+        registry: Optional[ModelRegistry] = None,
+        cassette: Optional[Cassette] = None
+    ):
+        # Provider SDK clients are created lazily by the registry
+        self.registry = registry or model_registry
+        # Record/replay of provider traffic (LLM_CASSETTE_* env by default)
+        self.cassette = cassette if cassette is not None else Cassette.from_env()
+        # Optional global request budget (shared across worker processes)
+        self.rate_limiter = rate_limiter
+        # Tokens used over the last minute, for admission control
+        self.token_usage = TokenWindow(60.0)
+        # Recent time-to-first-token per model, and hedging counters
+        self._first_token_latencies: Dict[str, Deque[Tuple[float, bool]]] = {}
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        # One circuit breaker per model
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._circuit_settings = _circuit_settings()
 
     async def generate_response(
         self,
@@ -31,77 +57,158 @@ class LLMService:
         system_prompt: str,
         messages: List[Dict[str, str]],
         temperature: float = 1.0,
-        max_tokens: int = 4096
-    ) -> tuple[str, Optional[str]]:
+        max_tokens: int = 4096,
+        failover: Optional[Dict[str, str]] = None
+    ) -> Tuple[str, Optional[str], Dict[str, int]]:
         """
         Generate a response from the LLM.
-        Returns: (content, reasoning) tuple
+        Returns: (content, reasoning, {"input_tokens": int, "output_tokens": int})
+
+        The call is a single sample, so usage is reported (and counted in
+        token_usage) as for sample_responses. If the model's circuit is open
+        or the call fails with a provider error, the request is retried on
+        failover[model] (and so on).
         """
-        is_anthropic = self._is_anthropic_model(model)
+        if self.rate_limiter:
+            await self.rate_limiter.acquire()
 
-        if is_anthropic:
-            return await self._generate_anthropic(
-                model, system_prompt, messages, temperature, max_tokens
-            )
-        else:
-            return await self._generate_openai(
-                model, system_prompt, messages, temperature, max_tokens
-            )
+        last_error = None
+        for candidate in self._failover_chain(model, failover):
+            self.registry.get(candidate)
+            breaker = self._breaker(candidate)
+            try:
+                breaker.acquire()
+            except CircuitOpenError as e:
+                last_error = e
+                continue
 
-    async def generate_response_stream(
+            started = time.monotonic()
+            outcome = None
+            try:
+                samples, usage = await self._provider_sample(
+                    candidate, system_prompt, messages, temperature, max_tokens, 1
+                )
+                outcome = True
+                self.token_usage.record(usage["input_tokens"] + usage["output_tokens"])
+                content, reasoning = samples[0]
+                return content, reasoning, usage
+            except Exception as e:
+                if not self._is_provider_fault(e):
+                    raise
+                outcome = False
+                last_error = e
+            finally:
+                breaker.release(outcome, time.monotonic() - started)
+
+        raise last_error
+
+    async def sample_responses(
         self,
         model: str,
         system_prompt: str,
         messages: List[Dict[str, str]],
+        n: int,
         temperature: float = 1.0,
-        max_tokens: int = 4096
-    ) -> AsyncIterator[Dict[str, str]]:
+        max_tokens: int = 4096,
+        failover: Optional[Dict[str, str]] = None
+    ) -> Tuple[List[Tuple[str, Optional[str]]], Dict[str, int]]:
         """
-        Generate a streaming response from the LLM.
-        Yields: {"type": "content"|"reasoning", "delta": str}
+        Sample n alternative responses to the same prompt.
+        Returns: ([(content, reasoning), ...], {"input_tokens": int, "output_tokens": int})
+
+        Providers that support it serve all n from one request (the prompt is
+        processed once); others get n concurrent requests. Failover works as
+        in generate_response.
         """
-        is_anthropic = self._is_anthropic_model(model)
+        last_error = None
+        for candidate in self._failover_chain(model, failover):
+            self.registry.get(candidate)
+            breaker = self._breaker(candidate)
+            try:
+                breaker.acquire()
+            except CircuitOpenError as e:
+                last_error = e
+                continue
 
-        if is_anthropic:
-            async for chunk in self._generate_anthropic_stream(
-                model, system_prompt, messages, temperature, max_tokens
-            ):
-                yield chunk
-        else:
-            async for chunk in self._generate_openai_stream(
-                model, system_prompt, messages, temperature, max_tokens
-            ):
-                yield chunk
+            if self.rate_limiter:
+                requests = 1 if self.registry.provider(candidate).native_n else n
+                for _ in range(requests):
+                    await self.rate_limiter.acquire()
+
+            started = time.monotonic()
+            outcome = None
+            try:
+                result = await self._provider_sample(
+                    candidate, system_prompt, messages, temperature, max_tokens, n
+                )
+                outcome = True
+                self.token_usage.record(result[1]["input_tokens"] + result[1]["output_tokens"])
+                return result
+            except Exception as e:
+                if not self._is_provider_fault(e):
+                    raise
+                outcome = False
+                last_error = e
+            finally:
+                breaker.release(outcome, time.monotonic() - started)
 
-    async def _generate_anthropic(
+        raise last_error
+
+    async def generate_response_stream(
         self,
         model: str,
         system_prompt: str,
         messages: List[Dict[str, str]],
-        temperature: float,
-        max_tokens: int
-    ) -> tuple[str, Optional[str]]:
-        """Generate response using Anthropic API"""
-        response = await self.anthropic_client.messages.create(
-            model=model,
-            system=system_prompt,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens
-        )
+        temperature: float = 1.0,
+        max_tokens: int = 4096,
+        hedge_after_seconds: Optional[float] = None,
+        hedge_adaptive: bool = False,
+        hedge_model: Optional[str] = None,
+        failover: Optional[Dict[str, str]] = None
+    ) -> AsyncIterator[Dict[str, str]]:
+        """
+        Generate a streaming response from the LLM.
+        Yields: {"type": "content"|"reasoning", "delta": str}
+        followed by a final {"type": "usage", "input_tokens": int, "output_tokens": int}
+
+        With hedging enabled, a duplicate request (optionally to hedge_model) is
+        sent if no first token arrives within hedge_after_seconds, or within the
+        learned p95 time-to-first-token when hedge_adaptive is set. The first
+        stream to produce a chunk wins and the other is cancelled.
+
+        If the model's circuit is open or the stream fails before producing
+        anything, the request is retried on failover[model] (and so on).
+        """
+        if self.rate_limiter:
+            await self.rate_limiter.acquire()
+
+        args = (system_prompt, messages, temperature, max_tokens)
+        last_error = None
 
-        content = ""
-        reasoning = None
+        for candidate in self._failover_chain(model, failover):
+            threshold = self._hedge_threshold(candidate, hedge_after_seconds, hedge_adaptive)
+            if threshold is None:
+                stream = self._timed_stream(candidate, *args)
+            else:
+                stream = self._hedged_stream(candidate, hedge_model or candidate, threshold, *args)
 
-        for block in response.content:
-            if block.type == "text":
-                content += block.text
-            elif hasattr(block, "thinking") and block.type == "thinking":
-                reasoning = block.text
+            produced = False
+            try:
+                async for chunk in stream:
+                    produced = True
+                    if chunk["type"] == "usage":
+                        self.token_usage.record(chunk["input_tokens"] + chunk["output_tokens"])
+                    yield chunk
+                return
+            except Exception as e:
+                # Once output has been streamed, a failover would duplicate it
+                if produced or not self._is_provider_fault(e):
+                    raise
+                last_error = e
 
-        return content, reasoning
+        raise last_error
 
-    async def _generate_anthropic_stream(
+    def _provider_stream(
         self,
         model: str,
         system_prompt: str,
@@ -109,64 +216,223 @@ class LLMService:
         temperature: float,
         max_tokens: int
     ) -> AsyncIterator[Dict[str, str]]:
-        """Stream response using Anthropic API"""
-        async with self.anthropic_client.messages.stream(
-            model=model,
-            system=system_prompt,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens
-        ) as stream:
-            async for event in stream:
-                if hasattr(event, "type"):
-                    if event.type == "content_block_delta":
-                        if hasattr(event.delta, "text"):
-                            yield {"type": "content", "delta": event.delta.text}
-                        elif hasattr(event.delta, "thinking"):
-                            yield {"type": "reasoning", "delta": event.delta.thinking}
-
-    async def _generate_openai(
+        """Stream from the provider adapter registered for a model (or the cassette)"""
+        if self.cassette is None:
+            return self.registry.provider(model).stream(
+                model, system_prompt, messages, temperature, max_tokens
+            )
+
+        key = Cassette.fingerprint("stream", model, system_prompt, messages, temperature, max_tokens)
+        if not self.cassette.recording:
+            return self.cassette.replay_stream(key, model)
+        return self.cassette.record_stream(
+            key,
+            model,
+            self.registry.provider(model).stream(
+                model, system_prompt, messages, temperature, max_tokens
+            )
+        )
+
+    async def _provider_sample(
         self,
         model: str,
         system_prompt: str,
         messages: List[Dict[str, str]],
         temperature: float,
-        max_tokens: int
-    ) -> tuple[str, Optional[str]]:
-        """Generate response using OpenAI API"""
-        # Prepend system message
-        full_messages = [{"role": "system", "content": system_prompt}] + messages
-
-        response = await self.openai_client.chat.completions.create(
-            model=model,
-            messages=full_messages,
-            temperature=temperature,
-            max_tokens=max_tokens
+        max_tokens: int,
+        n: int
+    ) -> Tuple[List[Tuple[str, Optional[str]]], Dict[str, int]]:
+        """n samples from the provider adapter registered for a model (or the cassette)"""
+        if self.cassette is None:
+            return await self.registry.provider(model).sample(
+                model, system_prompt, messages, temperature, max_tokens, n
+            )
+
+        key = Cassette.fingerprint(f"sample:{n}", model, system_prompt, messages, temperature, max_tokens)
+        if not self.cassette.recording:
+            samples, usage = await self.cassette.replay_call(key, model)
+            return [tuple(sample) for sample in samples], usage
+
+        started = time.monotonic()
+        result = await self.registry.provider(model).sample(
+            model, system_prompt, messages, temperature, max_tokens, n
         )
+        self.cassette.record_call(key, model, result, time.monotonic() - started)
+        return result
+
+    async def _guarded_stream(self, model: str, *args) -> AsyncIterator[Dict[str, str]]:
+        """Provider stream gated by, and reporting to, the model's circuit breaker"""
+        stream = self._provider_stream(model, *args)
+        breaker = self._breaker(model)
+        breaker.acquire()
+
+        started = time.monotonic()
+        first_token_latency = None
+        outcome = None
+        try:
+            async for chunk in stream:
+                if first_token_latency is None:
+                    first_token_latency = time.monotonic() - started
+                yield chunk
+            outcome = True
+        except Exception as e:
+            outcome = False if self._is_provider_fault(e) else None
+            raise
+        finally:
+            # Cancelled streams (e.g. hedge losers) report no outcome
+            breaker.release(
+                outcome,
+                first_token_latency if first_token_latency is not None else time.monotonic() - started
+            )
+
+    def _breaker(self, model: str) -> CircuitBreaker:
+        breaker = self.breakers.get(model)
+        if breaker is None:
+            breaker = self.breakers[model] = CircuitBreaker(model, **self._circuit_settings)
+        return breaker
+
+    def _failover_chain(self, model: str, failover: Optional[Dict[str, str]]) -> List[str]:
+        """The model followed by its failover targets, without cycles"""
+        chain = [model]
+        while failover and failover.get(chain[-1]) and failover[chain[-1]] not in chain:
+            chain.append(failover[chain[-1]])
+        return chain
+
+    def _is_provider_fault(self, error: Exception) -> bool:
+        """
+        Whether an error says something about provider health. Bad requests
+        and errors from our own code (KeyError, TypeError, ...) don't, so
+        they never open a circuit or trigger a failover.
+        """
+        if isinstance(error, CircuitOpenError):
+            return True
+        if isinstance(error, (UnknownModelError, CassetteMissError)):
+            return False
+        status = getattr(error, "status_code", None)
+        if status is not None:
+            return status >= 500 or status in (408, 429)
+        # Timeouts, dropped connections and broken streams
+        return isinstance(error, (asyncio.TimeoutError, ConnectionError) + self.registry.transport_errors())
 
-        content = response.choices[0].message.content or ""
-        # OpenAI doesn't have built-in reasoning traces like Anthropic
-        return content, None
+    async def _timed_stream(self, model: str, *args) -> AsyncIterator[Dict[str, str]]:
+        """Provider stream that records its time to first token"""
+        started = time.monotonic()
+        first = True
+        async for chunk in self._guarded_stream(model, *args):
+            if first:
+                self._record_first_token(model, time.monotonic() - started)
+                first = False
+            yield chunk
 
-    async def _generate_openai_stream(
+    async def _hedged_stream(
         self,
         model: str,
-        system_prompt: str,
-        messages: List[Dict[str, str]],
-        temperature: float,
-        max_tokens: int
+        hedge_model: str,
+        threshold: float,
+        *args
     ) -> AsyncIterator[Dict[str, str]]:
-        """Stream response using OpenAI API"""
-        full_messages = [{"role": "system", "content": system_prompt}] + messages
-
-        stream = await self.openai_client.chat.completions.create(
-            model=model,
-            messages=full_messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            stream=True
-        )
+        """
+        Race a backup request against a primary that is slow to start.
+        Each attempt's time to first token is measured from its own start;
+        a loser that is cancelled before its first token is recorded as
+        censored (it would have taken at least that long).
+        """
+        primary = self._guarded_stream(model, *args)
+        contenders = {
+            asyncio.ensure_future(primary.__anext__()): (primary, model, time.monotonic())
+        }
+        hedged = False
+        winner = None
+
+        try:
+            done, _ = await asyncio.wait(set(contenders), timeout=threshold)
+            if not done:
+                if self.rate_limiter:
+                    await self.rate_limiter.acquire()
+                backup = self._guarded_stream(hedge_model, *args)
+                contenders[asyncio.ensure_future(backup.__anext__())] = (backup, hedge_model, time.monotonic())
+                hedged = True
+                self.hedges_fired += 1
+
+            # The first stream to produce a chunk wins; a failed start
+            # leaves the race to the other one
+            while contenders and winner is None:
+                done, _ = await asyncio.wait(set(contenders), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    stream, stream_model, started = contenders.pop(task)
+                    error = task.exception()
+                    if error is None or isinstance(error, StopAsyncIteration):
+                        winner = (task, stream, stream_model)
+                        self._record_first_token(stream_model, time.monotonic() - started)
+                        break
+                    if not contenders:
+                        raise error
+        finally:
+            # Cancel the losers (closes their provider connections)
+            now = time.monotonic()
+            for task, (stream, stream_model, started) in contenders.items():
+                if task.done() and not task.cancelled() and task.exception() is None:
+                    # Produced a chunk in the same instant as the winner
+                    self._record_first_token(stream_model, now - started)
+                elif not task.done():
+                    self._record_first_token(stream_model, now - started, censored=True)
+                task.cancel()
+            for task, (stream, _, _) in contenders.items():
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+                await stream.aclose()
 
+        task, stream, stream_model = winner
+        if hedged and stream is not primary:
+            self.hedges_won += 1
+
+        if isinstance(task.exception(), StopAsyncIteration):
+            return
+
+        yield task.result()
         async for chunk in stream:
-            if chunk.choices[0].delta.content:
-                yield {"type": "content", "delta": chunk.choices[0].delta.content}
+            yield chunk
+
+    def _hedge_threshold(
+        self,
+        model: str,
+        hedge_after_seconds: Optional[float],
+        hedge_adaptive: bool
+    ) -> Optional[float]:
+        """Seconds to wait for a first token before hedging (None = don't hedge)"""
+        if hedge_adaptive:
+            samples = self._first_token_latencies.get(model)
+            if samples and len(samples) >= HEDGE_MIN_SAMPLES:
+                return self._latency_p95(samples)
+        return hedge_after_seconds
+
+    @staticmethod
+    def _latency_p95(samples: Deque[Tuple[float, bool]]) -> float:
+        """
+        p95 time to first token, by Kaplan-Meier so censored samples (cut
+        off at a lower bound) count as "slower than this" rather than as
+        observed latencies. Without censoring this is the smallest sample
+        with at least 95% of samples at or below it. Falls back to the
+        largest sample if the tail is all censored.
+        """
+        # Observed before censored at equal times, as is conventional
+        ordered = sorted(samples, key=lambda sample: (sample[0], sample[1]))
+        survival = 1.0
+        at_risk = len(ordered)
+        for seconds, censored in ordered:
+            if not censored:
+                survival *= 1 - 1 / at_risk
+                # Tolerance so rounding doesn't skip the exact 5% step
+                if survival <= 0.05 + 1e-9:
+                    return seconds
+            at_risk -= 1
+        return ordered[-1][0]
+
+    def _record_first_token(self, model: str, seconds: float, censored: bool = False):
+        """Record a time to first token; censored means it took at least `seconds`"""
+        samples = self._first_token_latencies.get(model)
+        if samples is None:
+            samples = self._first_token_latencies[model] = deque(maxlen=HEDGE_LATENCY_WINDOW)
+        samples.append((seconds, censored))
@@ -0,0 +1,139 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+
+
+class LoopLagMonitor:
+    """
+    Measures how late the event loop runs its callbacks.
+
+    A sampler task sleeps for `interval` and records how much longer than
+    that it actually took. It also stamps a heartbeat, which a watchdog
+    thread checks: if the loop stays blocked for longer than
+    `stall_seconds`, the watchdog captures the loop thread's stack while
+    it is still stuck, so the blocking code shows up in the report. Both
+    loops are cheap enough to leave running in production.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        stall_seconds: float = 0.25,
+        history: int = 600,
+        max_stalls: int = 20
+    ):
+        self.interval = interval
+        self.stall_seconds = stall_seconds
+        self._lags: Deque[float] = deque(maxlen=history)
+        self.stalls: Deque[Dict] = deque(maxlen=max_stalls)
+        self.stall_count = 0
+        self.max_lag = 0.0
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start sampling the running loop (call from inside it)"""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def snapshot(self) -> Dict:
+        """Lag percentiles (ms) over the recent window, plus recent stalls"""
+        lags = sorted(self._lags)
+
+        def percentile(q: float) -> Optional[float]:
+            return round(lags[int(q * (len(lags) - 1))] * 1000, 2) if lags else None
+
+        return {
+            "interval_ms": self.interval * 1000,
+            "samples": len(lags),
+            "lag_ms": {
+                "last": round(self._lags[-1] * 1000, 2) if self._lags else None,
+                "p50": percentile(0.5),
+                "p99": percentile(0.99),
+                "max": round(self.max_lag * 1000, 2),
+            },
+            "stall_count": self.stall_count,
+            "recent_stalls": list(self.stalls),
+        }
+
+    async def _sample(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - started - self.interval)
+            self._heartbeat = now
+            self._lags.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+            # The watchdog saw this stall begin; record how long it lasted
+            if self.stalls and self.stalls[-1]["duration_ms"] is None:
+                self.stalls[-1]["duration_ms"] = round(lag * 1000, 2)
+
+    def _watch(self):
+        reported_heartbeat = None
+        while not self._stop.wait(self.interval):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - self.interval
+            if blocked < self.stall_seconds or heartbeat == reported_heartbeat:
+                continue
+
+            # One report per stall, taken while the loop is still blocked
+            reported_heartbeat = heartbeat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = traceback.format_stack(frame) if frame is not None else []
+            self.stall_count += 1
+            self.stalls.append({
+                "detected_at": datetime.now().isoformat(),
+                "blocked_ms_at_detection": round(blocked * 1000, 2),
+                "duration_ms": None,
+                "stack": [line.rstrip() for line in stack[-15:]],
+            })
+            location = stack[-1].strip().splitlines()[0] if stack else "unknown location"
+            print(
+                f"Event loop blocked for {blocked * 1000:.0f}ms at {location}",
+                file=sys.stderr
+            )
+
+
+def module_name(filename: str, paths: Optional[List[str]] = None) -> str:
+    """Best-effort dotted module name for a source file (for grouping profiles)"""
+    if filename == "~":
+        # cProfile's marker for C functions (incl. the selector wait when idle)
+        return "<built-in>"
+    if filename.startswith("<"):
+        return filename
+    best = ""
+    for path in paths if paths is not None else sys.path:
+        if path and filename.startswith(path.rstrip("/") + "/") and len(path) > len(best):
+            best = path.rstrip("/")
+    relative = filename[len(best) + 1:] if best else filename
+    if relative.endswith(".py"):
+        relative = relative[:-3]
+    if relative.endswith("/__init__"):
+        relative = relative[:-len("/__init__")]
+    return relative.replace("/", ".")
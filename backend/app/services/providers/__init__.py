@@ -0,0 +1,4 @@
+from .base import Provider
+from .registry import ModelInfo, ModelRegistry, UnknownModelError, PROVIDERS, model_registry
+
+__all__ = ["Provider", "ModelInfo", "ModelRegistry", "UnknownModelError", "PROVIDERS", "model_registry"]
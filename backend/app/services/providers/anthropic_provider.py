@@ -0,0 +1,108 @@
+import asyncio
+import os
+from typing import List, Dict, AsyncIterator, Optional, Tuple
+import httpx
+from anthropic import AsyncAnthropic, APIConnectionError
+
+from app.services.providers.base import Provider
+
+
+class AnthropicProvider(Provider):
+    """Anthropic Messages API"""
+
+    name = "anthropic"
+    # APITimeoutError is an APIConnectionError; httpx errors can escape mid-stream
+    transport_errors = (APIConnectionError, httpx.TransportError)
+
+    def __init__(self):
+        self.client = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+
+    async def generate(
+        self,
+        model: str,
+        system_prompt: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> tuple[str, Optional[str]]:
+        """Generate response using Anthropic API"""
+        response = await self.client.messages.create(
+            model=model,
+            system=system_prompt,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+
+        return self._parse(response)
+
+    async def sample(
+        self,
+        model: str,
+        system_prompt: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        n: int
+    ) -> Tuple[List[Tuple[str, Optional[str]]], Dict[str, int]]:
+        """The Messages API has no n parameter, so n concurrent requests"""
+        responses = await asyncio.gather(*[
+            self.client.messages.create(
+                model=model,
+                system=system_prompt,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+            for _ in range(n)
+        ])
+        return [self._parse(response) for response in responses], {
+            "input_tokens": sum(response.usage.input_tokens for response in responses),
+            "output_tokens": sum(response.usage.output_tokens for response in responses)
+        }
+
+    @staticmethod
+    def _parse(response) -> Tuple[str, Optional[str]]:
+        content = ""
+        reasoning = None
+
+        for block in response.content:
+            if block.type == "text":
+                content += block.text
+            elif hasattr(block, "thinking") and block.type == "thinking":
+                reasoning = block.text
+
+        return content, reasoning
+
+    async def stream(
+        self,
+        model: str,
+        system_prompt: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> AsyncIterator[Dict[str, str]]:
+        """Stream response using Anthropic API"""
+        async with self.client.messages.stream(
+            model=model,
+            system=system_prompt,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        ) as stream:
+            input_tokens = 0
+            output_tokens = 0
+            async for event in stream:
+                if hasattr(event, "type"):
+                    if event.type == "content_block_delta":
+                        if hasattr(event.delta, "text"):
+                            yield {"type": "content", "delta": event.delta.text}
+                        elif hasattr(event.delta, "thinking"):
+                            yield {"type": "reasoning", "delta": event.delta.thinking}
+                    elif event.type == "message_start":
+                        input_tokens = event.message.usage.input_tokens
+                    elif event.type == "message_delta":
+                        # Output token count is cumulative on each delta
+                        output_tokens = event.usage.output_tokens
+
+            yield {"type": "usage", "input_tokens": input_tokens, "output_tokens": output_tokens}
@@ -0,0 +1,72 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import List, Dict, AsyncIterator, Optional, Tuple, Type
+
+
+class Provider(ABC):
+    """
+    Adapter for one LLM provider.
+
+    Subclasses live in their own modules and import their SDK at module
+    level; the registry only imports a provider module the first time one
+    of its models is used. generate() and stream() are abstract, so an
+    incomplete adapter fails when the registry constructs it.
+    """
+
+    name: str = ""
+    # Whether sample() serves n responses from a single request
+    native_n: bool = False
+    # SDK errors meaning the provider couldn't be reached or didn't answer in time
+    transport_errors: Tuple[Type[BaseException], ...] = ()
+
+    @abstractmethod
+    async def generate(
+        self,
+        model: str,
+        system_prompt: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> tuple[str, Optional[str]]:
+        """Returns: (content, reasoning) tuple"""
+
+    @abstractmethod
+    def stream(
+        self,
+        model: str,
+        system_prompt: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> AsyncIterator[Dict[str, str]]:
+        """
+        Yields: {"type": "content"|"reasoning", "delta": str}
+        followed by a final {"type": "usage", "input_tokens": int, "output_tokens": int}
+        """
+
+    async def sample(
+        self,
+        model: str,
+        system_prompt: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        n: int
+    ) -> Tuple[List[Tuple[str, Optional[str]]], Dict[str, int]]:
+        """
+        n independent responses to the same prompt.
+        Returns: ([(content, reasoning), ...], {"input_tokens": int, "output_tokens": int})
+
+        The default makes n concurrent generate() calls and estimates usage
+        at ~4 characters per token; adapters override it where the API can
+        do better.
+        """
+        samples = await asyncio.gather(*[
+            self.generate(model, system_prompt, messages, temperature, max_tokens)
+            for _ in range(n)
+        ])
+        prompt_chars = len(system_prompt) + sum(len(m["content"]) for m in messages)
+        return list(samples), {
+            "input_tokens": n * prompt_chars // 4,
+            "output_tokens": sum(len(content) + len(reasoning or "") for content, reasoning in samples) // 4,
+        }
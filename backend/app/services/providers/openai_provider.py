@@ -0,0 +1,104 @@
+import os
+from typing import List, Dict, AsyncIterator, Optional, Tuple
+import httpx
+from openai import AsyncOpenAI, APIConnectionError
+
+from app.services.providers.base import Provider
+
+
+class OpenAIProvider(Provider):
+    """OpenAI Chat Completions API"""
+
+    name = "openai"
+    native_n = True
+    # APITimeoutError is an APIConnectionError; httpx errors can escape mid-stream
+    transport_errors = (APIConnectionError, httpx.TransportError)
+
+    def __init__(self):
+        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+    async def generate(
+        self,
+        model: str,
+        system_prompt: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> tuple[str, Optional[str]]:
+        """Generate response using OpenAI API"""
+        # Prepend system message
+        full_messages = [{"role": "system", "content": system_prompt}] + messages
+
+        response = await self.client.chat.completions.create(
+            model=model,
+            messages=full_messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+
+        content = response.choices[0].message.content or ""
+        # OpenAI doesn't have built-in reasoning traces like Anthropic
+        return content, None
+
+    async def sample(
+        self,
+        model: str,
+        system_prompt: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        n: int
+    ) -> Tuple[List[Tuple[str, Optional[str]]], Dict[str, int]]:
+        """n choices from one request, so the prompt is only processed once"""
+        full_messages = [{"role": "system", "content": system_prompt}] + messages
+
+        response = await self.client.chat.completions.create(
+            model=model,
+            messages=full_messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            n=n
+        )
+
+        samples = [(choice.message.content or "", None) for choice in response.choices]
+        usage = {"input_tokens": 0, "output_tokens": 0}
+        if response.usage is not None:
+            usage = {
+                "input_tokens": response.usage.prompt_tokens,
+                "output_tokens": response.usage.completion_tokens
+            }
+        return samples, usage
+
+    async def stream(
+        self,
+        model: str,
+        system_prompt: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> AsyncIterator[Dict[str, str]]:
+        """Stream response using OpenAI API"""
+        full_messages = [{"role": "system", "content": system_prompt}] + messages
+
+        stream = await self.client.chat.completions.create(
+            model=model,
+            messages=full_messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+
+        # The streaming API doesn't report usage, so estimate it:
+        # roughly one token per content chunk and ~4 characters per prompt token
+        output_tokens = 0
+        try:
+            async for chunk in stream:
+                if chunk.choices[0].delta.content:
+                    output_tokens += 1
+                    yield {"type": "content", "delta": chunk.choices[0].delta.content}
+        finally:
+            # Release the connection right away on cancellation or early exit
+            await stream.close()
+
+        prompt_chars = sum(len(m["content"]) for m in full_messages)
+        yield {"type": "usage", "input_tokens": prompt_chars // 4, "output_tokens": output_tokens}
@@ -0,0 +1,141 @@
+import importlib
+import json
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from app.services.providers.base import Provider
+
+
+class UnknownModelError(ValueError):
+    """Raised for a model registered with a provider that doesn't exist"""
+
+
+class ModelInfo(BaseModel):
+    """What the platform knows about a model"""
+    name: str
+    provider: str
+    streaming: bool = True
+    thinking: bool = False  # Extended thinking / reasoning traces
+    caching: bool = False  # Prompt caching
+    context_window: int = 8192
+
+
+class ProviderSpec(NamedTuple):
+    """Where to find a provider adapter, and how to recognise its models"""
+    module: str
+    class_name: str
+    api_key_env: str
+    model_prefixes: Tuple[str, ...]
+
+
+PROVIDERS: Dict[str, ProviderSpec] = {
+    "anthropic": ProviderSpec(
+        "app.services.providers.anthropic_provider",
+        "AnthropicProvider",
+        "ANTHROPIC_API_KEY",
+        ("claude",)
+    ),
+    "openai": ProviderSpec(
+        "app.services.providers.openai_provider",
+        "OpenAIProvider",
+        "OPENAI_API_KEY",
+        ("gpt-", "o1", "o3", "o4")
+    ),
+}
+
+# Serves unregistered models no prefix claims (e.g. ft:gpt-4o-mini:org::id, chatgpt-4o-latest)
+DEFAULT_PROVIDER = "openai"
+
+DEFAULT_MODELS: List[ModelInfo] = [
+    ModelInfo(name="claude-sonnet-4-5-20250929", provider="anthropic", thinking=True, caching=True, context_window=200000),
+    ModelInfo(name="claude-opus-4-5-20251101", provider="anthropic", thinking=True, caching=True, context_window=200000),
+    ModelInfo(name="claude-3-5-haiku-20241022", provider="anthropic", caching=True, context_window=200000),
+    ModelInfo(name="claude-3-haiku-20240307", provider="anthropic", caching=True, context_window=200000),
+    ModelInfo(name="gpt-4-turbo", provider="openai", context_window=128000),
+    ModelInfo(name="gpt-4", provider="openai", context_window=8192),
+    ModelInfo(name="gpt-3.5-turbo", provider="openai", context_window=16385),
+]
+
+
+class ModelRegistry:
+    """
+    Maps model names to providers and capabilities.
+
+    Provider adapters (and their SDKs) are imported and constructed the first
+    time one of their models is used, so processes only pay for the providers
+    they actually call. Extra models can be registered at runtime or listed
+    in the JSON file named by MODELS_FILE.
+    """
+
+    def __init__(self, models: Optional[List[ModelInfo]] = None):
+        self._models: Dict[str, ModelInfo] = {}
+        self._providers: Dict[str, Provider] = {}
+
+        for info in models if models is not None else DEFAULT_MODELS:
+            self.register(info)
+
+        models_file = os.getenv("MODELS_FILE")
+        if models_file:
+            self.load_file(models_file)
+
+    def register(self, info: ModelInfo):
+        """Add or replace a model"""
+        if info.provider not in PROVIDERS:
+            raise UnknownModelError(f"Unknown provider {info.provider}")
+        self._models[info.name] = info
+
+    def load_file(self, path: str):
+        """Register models from a JSON list of ModelInfo objects"""
+        with open(path, "r", encoding="utf-8") as f:
+            for entry in json.load(f):
+                self.register(ModelInfo(**entry))
+
+    def get(self, model: str) -> ModelInfo:
+        """
+        Look up a model, inferring the provider from its name if unregistered.
+        Names no provider's prefixes match go to DEFAULT_PROVIDER.
+        """
+        info = self._models.get(model)
+        if info is not None:
+            return info
+
+        for provider, spec in PROVIDERS.items():
+            if model.startswith(spec.model_prefixes):
+                return ModelInfo(name=model, provider=provider)
+
+        return ModelInfo(name=model, provider=DEFAULT_PROVIDER)
+
+    def provider(self, model: str) -> Provider:
+        """The adapter serving a model, imported on first use"""
+        name = self.get(model).provider
+        adapter = self._providers.get(name)
+        if adapter is None:
+            spec = PROVIDERS[name]
+            module = importlib.import_module(spec.module)
+            adapter = self._providers[name] = getattr(module, spec.class_name)()
+        return adapter
+
+    def transport_errors(self) -> Tuple[Type[BaseException], ...]:
+        """Connection and timeout errors of the adapters loaded so far"""
+        return tuple(error for adapter in self._providers.values() for error in adapter.transport_errors)
+
+    def is_configured(self, provider: str) -> bool:
+        """Whether the provider's API key is set"""
+        return bool(os.getenv(PROVIDERS[provider].api_key_env))
+
+    def available_models(self, details: bool = False) -> Dict[str, list]:
+        """Registered models grouped by provider, for providers with an API key"""
+        result: Dict[str, list] = {}
+        for info in self._models.values():
+            if not self.is_configured(info.provider):
+                continue
+            result.setdefault(info.provider, []).append(
+                info.model_dump() if details else info.name
+            )
+        return result
+
+
+# Shared default registry
+model_registry = ModelRegistry()
@@ -0,0 +1,87 @@
+import asyncio
+import multiprocessing
+import time
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+
+class SharedRateLimiter:
+    """
+    Token-bucket limit on LLM requests per minute, shared between processes.
+
+    State lives in shared memory, so passing the limiter to worker processes
+    at start-up makes all of them draw from the same budget. The lock is only
+    held for the arithmetic; waiting happens with asyncio.sleep so the event
+    loop of each worker keeps running.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        burst: Optional[float] = None,
+        context: Optional[multiprocessing.context.BaseContext] = None
+    ):
+        ctx = context or multiprocessing.get_context("spawn")
+        self.rate = requests_per_minute / 60.0
+        self.capacity = burst if burst is not None else max(1.0, self.rate)
+        self._tokens = ctx.Value("d", self.capacity, lock=False)
+        self._updated_at = ctx.Value("d", time.time(), lock=False)
+        self._lock = ctx.Lock()
+
+    def _try_acquire(self) -> float:
+        """Take a token if available; otherwise return seconds until one is"""
+        with self._lock:
+            now = time.time()
+            elapsed = max(0.0, now - self._updated_at.value)
+            tokens = min(self.capacity, self._tokens.value + elapsed * self.rate)
+            self._updated_at.value = now
+
+            if tokens >= 1.0:
+                self._tokens.value = tokens - 1.0
+                return 0.0
+
+            self._tokens.value = tokens
+            return (1.0 - tokens) / self.rate
+
+    async def acquire(self):
+        """Wait until a request may be sent"""
+        while True:
+            wait = self._try_acquire()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+
+class TokenWindow:
+    """Provider tokens used over a sliding window (one process)"""
+
+    def __init__(self, window_seconds: float = 60.0):
+        self.window_seconds = window_seconds
+        self._entries: Deque[Tuple[float, int]] = deque()
+        self._total = 0
+
+    def record(self, tokens: int):
+        if tokens > 0:
+            self._entries.append((time.monotonic(), tokens))
+            self._total += tokens
+
+    def total(self) -> int:
+        self._expire()
+        return self._total
+
+    def seconds_until_below(self, limit: float) -> float:
+        """How long until usage in the window drops below limit, with no new usage"""
+        self._expire()
+        total = self._total
+        for recorded_at, tokens in self._entries:
+            if total < limit:
+                break
+            total -= tokens
+            if total < limit:
+                return max(0.0, recorded_at + self.window_seconds - time.monotonic())
+        return 0.0
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.window_seconds
+        while self._entries and self._entries[0][0] < cutoff:
+            self._total -= self._entries.popleft()[1]
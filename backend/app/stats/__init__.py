@@ -0,0 +1,23 @@
+from .estimators import (
+    pass_at_k,
+    wilson_interval,
+    pass_at_k_from_rate,
+    wilson_pass_at_k_interval,
+    bootstrap_pass_at_k_interval,
+    paired_comparison,
+    grouped_mean_interval
+)
+from .reports import pass_at_k_report, comparison_report, grouped_pass_at_k_report
+
+__all__ = [
+    "pass_at_k",
+    "wilson_interval",
+    "pass_at_k_from_rate",
+    "wilson_pass_at_k_interval",
+    "bootstrap_pass_at_k_interval",
+    "paired_comparison",
+    "grouped_mean_interval",
+    "pass_at_k_report",
+    "comparison_report",
+    "grouped_pass_at_k_report",
+]
@@ -0,0 +1,275 @@
+import warnings
+from statistics import NormalDist
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Upper bound on the cells of the (rows x columns) blocks the interval routines hold at once
+BLOCK_CELLS = 2_000_000
+
+
+def _z(confidence: float) -> float:
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def _percentiles(replicates: np.ndarray, confidence: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Row-wise percentile interval, ignoring NaN replicates (NaN rows stay NaN)"""
+    alpha = (1 - confidence) / 2
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        low, high = np.nanquantile(replicates, [alpha, 1 - alpha], axis=1)
+    return low, high
+
+
+def pass_at_k(samples, successes, ks: Optional[Sequence[int]] = None) -> np.ndarray:
+    """
+    Unbiased pass@k (Chen et al., 2021) for many configs at once.
+
+    samples and successes are arrays of shape (m,): n runs and c passes per
+    config. Returns an (m, len(ks)) array, by default for every k from 1 to
+    max(n); entries with k > n are NaN. Uses the product form
+    1 - prod_{i<k} (n - c - i) / (n - i), which stays exact for large n
+    where the binomial coefficients would overflow.
+    """
+    n = np.asarray(samples, dtype=np.float64).reshape(-1)
+    c = np.asarray(successes, dtype=np.float64).reshape(-1)
+    if n.shape != c.shape:
+        raise ValueError("samples and successes must have the same length")
+    if np.any(c > n) or np.any(c < 0):
+        raise ValueError("successes must be between 0 and samples")
+
+    max_k = int(n.max()) if n.size else 0
+    if ks is not None:
+        ks = np.asarray(ks, dtype=np.int64)
+        if ks.size and ks.min() < 1:
+            raise ValueError("k must be at least 1")
+        max_k = max(max_k, int(ks.max()) if ks.size else 0)
+    if max_k == 0:
+        return np.full((n.size, 0 if ks is None else ks.size), np.nan)
+
+    # Column i holds the i-th factor; the running product gives every k at once
+    i = np.arange(max_k, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factors = np.clip((n[:, None] - c[:, None] - i) / (n[:, None] - i), 0.0, 1.0)
+    all_k = 1.0 - np.cumprod(factors, axis=1)
+    all_k[i[None, :] >= n[:, None]] = np.nan
+
+    if ks is None:
+        return all_k
+    return all_k[:, ks - 1]
+
+
+def wilson_interval(successes, samples, confidence: float = 0.95) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Wilson score interval for binomial pass rates; (0, 1) where there are no samples.
+    Takes scalars or arrays, and returns arrays of the same shape.
+    """
+    c = np.asarray(successes, dtype=np.float64)
+    n = np.asarray(samples, dtype=np.float64)
+    z = _z(confidence)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = c / n
+        denominator = 1 + z * z / n
+        centre = (p + z * z / (2 * n)) / denominator
+        half_width = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    low = np.where(n > 0, np.maximum(0.0, centre - half_width), 0.0)
+    high = np.where(n > 0, np.minimum(1.0, centre + half_width), 1.0)
+    return low, high
+
+
+def pass_at_k_from_rate(rate, k):
+    """
+    1 - (1 - p)^k: pass@k for independent runs that each pass with
+    probability p. Monotone in p, so it maps interval bounds too.
+    """
+    return 1 - (1 - np.asarray(rate, dtype=np.float64)) ** k
+
+
+def wilson_pass_at_k_interval(
+    samples,
+    successes,
+    ks: Sequence[int],
+    confidence: float = 0.95
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    pass@k intervals from the Wilson interval on the per-run pass rate, which
+    1 - (1 - p)^k maps over monotonically. Returns two (m, len(ks)) arrays;
+    NaN where k > n.
+    """
+    n = np.asarray(samples, dtype=np.float64).reshape(-1)
+    ks = np.asarray(ks, dtype=np.float64)
+    low, high = wilson_interval(successes, n, confidence)
+    invalid = ks[None, :] > n[:, None]
+    low = np.where(invalid, np.nan, pass_at_k_from_rate(low.reshape(-1, 1), ks))
+    high = np.where(invalid, np.nan, pass_at_k_from_rate(high.reshape(-1, 1), ks))
+    return low, high
+
+
+def bootstrap_pass_at_k_interval(
+    samples,
+    successes,
+    ks: Sequence[int],
+    confidence: float = 0.95
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Percentile bootstrap intervals for pass@k, per config and k.
+
+    Resampling n runs with replacement only changes the success count, whose
+    bootstrap distribution is exactly Binomial(n, c/n), and pass@k is
+    monotone in it. So the interval is pass@k at that distribution's
+    percentiles, computed exactly rather than by drawing replicates.
+    Returns two (m, len(ks)) arrays; NaN where k > n.
+    """
+    n = np.asarray(samples, dtype=np.int64).reshape(-1)
+    c = np.asarray(successes, dtype=np.int64).reshape(-1)
+    alpha = (1 - confidence) / 2
+    c_low = np.zeros_like(n)
+    c_high = np.zeros_like(n)
+
+    max_n = int(n.max()) if n.size else 0
+    log_factorial = np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, max_n + 1)))])
+    x = np.arange(max_n + 1)
+    block = max(1, BLOCK_CELLS // (max_n + 1))
+    for start in range(0, n.size, block):
+        nb = n[start:start + block, None]
+        p = c[start:start + block, None] / np.maximum(nb, 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_pmf = (
+                log_factorial[nb] - log_factorial[x] - log_factorial[np.maximum(nb - x, 0)]
+                + np.where(x > 0, x * np.log(p), 0.0)
+                + np.where(nb - x > 0, (nb - x) * np.log1p(-p), 0.0)
+            )
+        cdf = np.cumsum(np.where(x <= nb, np.exp(log_pmf), 0.0), axis=1)
+        c_low[start:start + block] = np.argmax(cdf >= alpha - 1e-12, axis=1)
+        c_high[start:start + block] = np.argmax(cdf >= 1 - alpha - 1e-12, axis=1)
+
+    return pass_at_k(n, c_low, ks), pass_at_k(n, c_high, ks)
+
+
+def paired_comparison(
+    samples_a,
+    successes_a,
+    samples_b,
+    successes_b,
+    k: int = 1,
+    confidence: float = 0.95,
+    resamples: int = 2000,
+    seed: Optional[int] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Paired comparisons of pass@k between config pairs over shared units.
+
+    Inputs are (P, T) arrays: P comparisons, each over T units (e.g. tasks
+    or seeds) run by both configs; pad with zero samples where a unit is
+    missing. Per unit the difference of pass@k estimates (A - B) is taken
+    over units where both sides have at least k runs. Returns, per
+    comparison: the mean difference, a bootstrap CI over units, a two-sided
+    sign-flip permutation p-value, and unit win counts.
+
+    Bootstrap and permutation replicates are applied as weight matrices
+    built a block of units at a time, so memory stays at about
+    (P + block) x resamples however many units.
+    """
+    shapes = {np.shape(x) for x in (samples_a, successes_a, samples_b, successes_b)}
+    if len(shapes) != 1:
+        raise ValueError("All inputs must have the same shape")
+    na, ca, nb, cb = (
+        np.atleast_2d(np.asarray(x, dtype=np.float64))
+        for x in (samples_a, successes_a, samples_b, successes_b)
+    )
+    pairs, units = na.shape
+
+    a = pass_at_k(na.reshape(-1), ca.reshape(-1), [k]).reshape(pairs, units)
+    b = pass_at_k(nb.reshape(-1), cb.reshape(-1), [k]).reshape(pairs, units)
+    valid = ~(np.isnan(a) | np.isnan(b))
+    diff = np.where(valid, a - b, 0.0)
+    counted = valid.sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = diff.sum(axis=1) / counted
+
+        rng = np.random.default_rng(seed)
+        boot_sums = np.zeros((pairs, resamples))
+        boot_counts = np.zeros((pairs, resamples))
+        permuted = np.zeros((pairs, resamples))
+        # Draws still to place per replicate, among the units not yet reached
+        remaining = np.full(resamples, units, dtype=np.int64)
+        block = max(1, BLOCK_CELLS // resamples)
+        for start in range(0, units, block):
+            end = min(units, start + block)
+            left = units - start
+            # Bootstrap: multinomial unit counts per replicate, drawn block by block
+            # (this block's units, plus one bucket for the units after it)
+            pvals = np.append(np.full(end - start, 1 / left), (units - end) / left)
+            drawn = rng.multinomial(remaining, pvals)
+            remaining = drawn[:, -1]
+            weights = drawn[:, :-1].T.astype(np.float64)
+            boot_sums += diff[:, start:end] @ weights
+            boot_counts += valid[:, start:end].astype(np.float64) @ weights
+
+            # Permutation: under H0 each unit's difference is equally likely to have either sign
+            signs = rng.choice(np.array([-1.0, 1.0]), size=(end - start, resamples))
+            permuted += diff[:, start:end] @ signs
+
+        low, high = _percentiles(boot_sums / boot_counts, confidence)
+        permuted /= counted[:, None]
+        p_value = (np.sum(np.abs(permuted) >= np.abs(mean)[:, None] - 1e-12, axis=1) + 1) / (resamples + 1)
+
+    none = counted == 0
+    return {
+        "mean_difference": np.where(none, np.nan, mean),
+        "ci_low": np.where(none, np.nan, low),
+        "ci_high": np.where(none, np.nan, high),
+        "p_value": np.where(none, np.nan, p_value),
+        "units": counted,
+        "wins_a": np.sum(valid & (diff > 0), axis=1),
+        "wins_b": np.sum(valid & (diff < 0), axis=1),
+        "ties": np.sum(valid & (diff == 0), axis=1),
+    }
+
+
+def grouped_mean_interval(
+    values,
+    groups,
+    group_count: int,
+    confidence: float = 0.95,
+    resamples: int = 2000,
+    seed: Optional[int] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Mean of per-unit values within each group, with a bootstrap CI over units.
+
+    values: (m,) per-unit estimates (NaN = not counted); groups: (m,) group
+    index of each unit. Every group is resampled in one pass by drawing
+    Poisson(1) weights per unit and replicate, which approximates
+    resampling each group's units with replacement.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    groups = np.asarray(groups, dtype=np.int64)
+    valid = ~np.isnan(values)
+    x = np.where(valid, values, 0.0)
+
+    counts = np.bincount(groups, weights=valid, minlength=group_count)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.bincount(groups, weights=x, minlength=group_count) / counts
+
+    # Sorted by group, each block's per-group sums are contiguous runs for reduceat
+    order = np.argsort(groups, kind="stable")
+    groups, x, valid = groups[order], x[order], valid[order]
+
+    rng = np.random.default_rng(seed)
+    totals = np.zeros((group_count, resamples))
+    sizes = np.zeros((group_count, resamples))
+    block = max(1, BLOCK_CELLS // resamples)
+    for start in range(0, values.size, block):
+        chunk = slice(start, start + block)
+        present, starts = np.unique(groups[chunk], return_index=True)
+        weights = rng.poisson(1.0, size=(len(x[chunk]), resamples)) * valid[chunk, None]
+        totals[present] += np.add.reduceat(weights * x[chunk, None], starts, axis=0)
+        sizes[present] += np.add.reduceat(weights, starts, axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        low, high = _percentiles(totals / sizes, confidence)
+
+    return {"mean": mean, "ci_low": low, "ci_high": high, "units": counts.astype(np.int64)}
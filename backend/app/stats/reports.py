@@ -0,0 +1,162 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.stats.estimators import (
+    pass_at_k,
+    wilson_pass_at_k_interval,
+    bootstrap_pass_at_k_interval,
+    paired_comparison,
+    grouped_mean_interval
+)
+
+
+def _floats(values) -> List[Optional[float]]:
+    """JSON-safe list: NaN (k > n, nothing to compare) becomes None"""
+    return [None if np.isnan(value) else float(value) for value in np.asarray(values, dtype=np.float64)]
+
+
+def pass_at_k_report(
+    keys: Sequence[str],
+    samples: Sequence[int],
+    successes: Sequence[int],
+    ks: Optional[Sequence[int]] = None,
+    interval: str = "wilson",
+    confidence: float = 0.95
+) -> Dict[str, Any]:
+    """pass@k and its interval for every config and k, as one (configs x ks) batch"""
+    samples = np.asarray(samples, dtype=np.int64)
+    successes = np.asarray(successes, dtype=np.int64)
+    if ks is None:
+        ks = list(range(1, max(1, int(samples.max())) + 1))
+
+    estimates = pass_at_k(samples, successes, ks)
+    if interval == "bootstrap":
+        low, high = bootstrap_pass_at_k_interval(samples, successes, ks, confidence)
+    else:
+        low, high = wilson_pass_at_k_interval(samples, successes, ks, confidence)
+
+    return {
+        "ks": list(ks),
+        "interval": interval,
+        "confidence": confidence,
+        "results": [
+            {
+                "key": key,
+                "samples": int(samples[i]),
+                "successes": int(successes[i]),
+                "pass_at_k": _floats(estimates[i]),
+                "ci_low": _floats(low[i]),
+                "ci_high": _floats(high[i]),
+            }
+            for i, key in enumerate(keys)
+        ]
+    }
+
+
+def comparison_report(
+    keys: Sequence[str],
+    units_a: Sequence[Sequence[Sequence[int]]],
+    units_b: Sequence[Sequence[Sequence[int]]],
+    k: int = 1,
+    confidence: float = 0.95,
+    resamples: int = 2000,
+    seed: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Paired comparisons, one per key; units_a[i] and units_b[i] are lists of
+    (samples, successes) per unit, in the same unit order on both sides.
+    """
+    width = max(len(units) for units in units_a)
+    arrays = np.zeros((4, len(keys), width), dtype=np.int64)
+    for i, (a, b) in enumerate(zip(units_a, units_b)):
+        if len(a) != len(b):
+            raise ValueError(f"Comparison {keys[i]!r} has {len(a)} units for a but {len(b)} for b")
+        arrays[0:2, i, :len(a)] = np.asarray(a, dtype=np.int64).T
+        arrays[2:4, i, :len(b)] = np.asarray(b, dtype=np.int64).T
+
+    result = paired_comparison(*arrays, k=k, confidence=confidence, resamples=resamples, seed=seed)
+    mean, low, high, p_value = (
+        _floats(result[name]) for name in ("mean_difference", "ci_low", "ci_high", "p_value")
+    )
+    return {
+        "k": k,
+        "confidence": confidence,
+        "comparisons": [
+            {
+                "key": key,
+                "mean_difference": mean[i],
+                "ci_low": low[i],
+                "ci_high": high[i],
+                "p_value": p_value[i],
+                "units": int(result["units"][i]),
+                "wins_a": int(result["wins_a"][i]),
+                "wins_b": int(result["wins_b"][i]),
+                "ties": int(result["ties"][i]),
+            }
+            for i, key in enumerate(keys)
+        ]
+    }
+
+
+def grouped_pass_at_k_report(
+    rows: List[Dict[str, Any]],
+    group_by: List[str],
+    ks: Sequence[int],
+    confidence: float = 0.95,
+    resamples: int = 2000,
+    seed: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    pass@k per group, largest first, from per-config rows (group keys,
+    config_hash, samples, successes). A group's estimate is the mean over its configs with at least
+    k runs, with a bootstrap interval over those configs. When grouping by
+    config_hash each group is one config, and the interval is over its runs.
+    """
+    group_index: Dict[tuple, int] = {}
+    groups = np.array(
+        [group_index.setdefault(tuple(row[name] for name in group_by), len(group_index)) for row in rows],
+        dtype=np.int64
+    )
+    samples = np.array([row["samples"] for row in rows], dtype=np.int64)
+    successes = np.array([row["successes"] or 0 for row in rows], dtype=np.int64)
+    estimates = pass_at_k(samples, successes, ks)
+
+    group_count = len(group_index)
+    mean = np.full((group_count, len(ks)), np.nan)
+    low = np.full((group_count, len(ks)), np.nan)
+    high = np.full((group_count, len(ks)), np.nan)
+    counted = np.zeros((group_count, len(ks)), dtype=np.int64)
+    if "config_hash" in group_by:
+        mean = estimates
+        low, high = bootstrap_pass_at_k_interval(samples, successes, ks, confidence)
+        counted = (~np.isnan(estimates)).astype(np.int64)
+    elif rows:
+        for j in range(len(ks)):
+            summary = grouped_mean_interval(
+                estimates[:, j], groups, group_count, confidence=confidence, resamples=resamples, seed=seed
+            )
+            mean[:, j], low[:, j], high[:, j] = summary["mean"], summary["ci_low"], summary["ci_high"]
+            counted[:, j] = summary["units"]
+
+    configs = np.bincount(groups, minlength=group_count)
+    runs = np.bincount(groups, weights=samples, minlength=group_count)
+    passes = np.bincount(groups, weights=successes, minlength=group_count)
+    return {
+        "group_by": group_by,
+        "ks": list(ks),
+        "confidence": confidence,
+        "groups": [
+            {
+                **dict(zip(group_by, key)),
+                "configs": int(configs[g]),
+                "runs": int(runs[g]),
+                "successes": int(passes[g]),
+                "pass_at_k": _floats(mean[g]),
+                "ci_low": _floats(low[g]),
+                "ci_high": _floats(high[g]),
+                "configs_counted": [int(value) for value in counted[g]],
+            }
+            for key, g in sorted(group_index.items(), key=lambda item: -runs[item[1]])
+        ]
+    }
@@ -0,0 +1,5 @@
+from .archive import SimulationArchive
+from .results_store import ResultsStore
+from .search_index import SearchQueryError, TranscriptIndex
+
+__all__ = ["ResultsStore", "SearchQueryError", "SimulationArchive", "TranscriptIndex"]
@@ -0,0 +1,229 @@
+import json
+import mmap
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.models import SimulationConfig, SimulationState
+
+_SCHEMA = """
+-- Where each archived simulation lives: a compressed block in a segment,
+-- and the byte range of its JSON line within the decompressed block
+CREATE TABLE IF NOT EXISTS archived (
+    simulation_id TEXT PRIMARY KEY,
+    segment INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL,
+    config_hash TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_archived_block ON archived (segment, offset);
+-- Each distinct config is stored once; archived lines refer to it by hash
+CREATE TABLE IF NOT EXISTS configs (
+    config_hash TEXT PRIMARY KEY,
+    config TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+SEGMENT_NAME = "segment-{:06d}.zst"
+
+
+class SimulationArchive:
+    """
+    Cold storage for old simulations: append-only segment files of
+    zstd-compressed blocks, plus a SQLite offset index.
+
+    Each block holds up to `block_size` bytes of JSON lines (states
+    without their config, which is stored once per hash in the index) and
+    is written as one zstd frame. A new segment is started once the
+    current one reaches `segment_size`. Reads look the simulation up in
+    the index and decompress just its block from a memory-mapped segment,
+    so a lookup costs one index probe and one block decompression.
+
+    Re-archiving a simulation points the index at the new copy; the old
+    bytes stay in their segment.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        block_size: int = 256 * 1024,
+        segment_size: int = 64 * 1024 * 1024,
+        level: int = 9
+    ):
+        self.directory = directory
+        self.block_size = block_size
+        self.segment_size = segment_size
+        self.level = level
+        # Imported here so servers without an archive never load it
+        import zstandard
+        self._zstd = zstandard
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(os.path.join(directory, "index.db"), check_same_thread=False)
+        self._lock = threading.Lock()
+        # Read-only maps of segments, remapped when the segment has grown
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._configs: Dict[str, SimulationConfig] = {}
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+        segments = self._segments()
+        self._segment = segments[-1] if segments else 1
+
+    def append(self, states: Iterable[SimulationState]) -> List[str]:
+        """Archive simulations; returns their IDs once they are durably written"""
+        blocks: List[List[Tuple[str, str, bytes]]] = [[]]
+        block_bytes = 0
+        configs: Dict[str, str] = {}
+        for state in states:
+            config_hash = state.config_hash or state.config.content_hash()
+            if config_hash not in configs:
+                configs[config_hash] = state.config.model_dump_json()
+            line = state.model_dump_json(exclude={"config"}).encode("utf-8") + b"\n"
+            if block_bytes and block_bytes + len(line) > self.block_size:
+                blocks.append([])
+                block_bytes = 0
+            blocks[-1].append((state.simulation_id, config_hash, line))
+            block_bytes += len(line)
+        if not blocks[0]:
+            return []
+
+        compressor = self._zstd.ZstdCompressor(level=self.level, write_content_size=True)
+        rows = []
+        with self._lock:
+            path = self._path(self._segment)
+            if os.path.exists(path) and os.path.getsize(path) >= self.segment_size:
+                self._segment += 1
+                path = self._path(self._segment)
+
+            with open(path, "ab") as handle:
+                offset = handle.tell()
+                for block in blocks:
+                    frame = compressor.compress(b"".join(line for _, _, line in block))
+                    handle.write(frame)
+                    start = 0
+                    for simulation_id, config_hash, line in block:
+                        rows.append((
+                            simulation_id, self._segment, offset, len(frame),
+                            start, start + len(line) - 1, config_hash
+                        ))
+                        start += len(line)
+                    offset += len(frame)
+                handle.flush()
+                os.fsync(handle.fileno())
+
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO configs VALUES (?, ?)", list(configs.items())
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO archived VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+                )
+        return [row[0] for row in rows]
+
+    def load(self, simulation_id: str) -> Optional[SimulationState]:
+        """An archived simulation, or None if it was never archived"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT segment, offset, length, start, end, config_hash FROM archived WHERE simulation_id = ?",
+                (simulation_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            segment, offset, length, start, end, config_hash = row
+            frame = self._map(segment, offset + length)[offset:offset + length]
+            config = self._config(config_hash)
+
+        block = self._zstd.ZstdDecompressor().decompress(frame)
+        return self._state(block[start:end], config)
+
+    def contains(self, simulation_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM archived WHERE simulation_id = ?", (simulation_id,)
+            ).fetchone() is not None
+
+    def iter_states(self, exclude: Optional[Set[str]] = None) -> Iterator[SimulationState]:
+        """Every archived simulation, block by block in file order"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT simulation_id, segment, offset, length, start, end, config_hash FROM archived"
+                " ORDER BY segment, offset, start"
+            ).fetchall()
+
+        current, block = None, b""
+        for simulation_id, segment, offset, length, start, end, config_hash in rows:
+            if exclude and simulation_id in exclude:
+                continue
+            with self._lock:
+                if (segment, offset) != current:
+                    frame = self._map(segment, offset + length)[offset:offset + length]
+                    block = self._zstd.ZstdDecompressor().decompress(frame)
+                    current = (segment, offset)
+                config = self._config(config_hash)
+            yield self._state(block[start:end], config)
+
+    def stats(self) -> Dict:
+        """Archived count, and stored (compressed) vs. original JSON bytes"""
+        with self._lock:
+            count, raw_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(end - start), 0) FROM archived"
+            ).fetchone()
+        segments = self._segments()
+        stored_bytes = sum(os.path.getsize(self._path(segment)) for segment in segments)
+        return {
+            "simulations": count,
+            "segments": len(segments),
+            "stored_bytes": stored_bytes,
+            "raw_bytes": raw_bytes,
+            "compression_ratio": round(raw_bytes / stored_bytes, 2) if stored_bytes else None,
+        }
+
+    def close(self):
+        with self._lock:
+            for mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+            self._conn.close()
+
+    def _map(self, segment: int, needed: int) -> mmap.mmap:
+        """Map of a segment covering at least `needed` bytes (caller holds the lock)"""
+        mapped = self._maps.get(segment)
+        if mapped is None or len(mapped) < needed:
+            if mapped is not None:
+                mapped.close()
+            with open(self._path(segment), "rb") as handle:
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = mapped
+        return mapped
+
+    def _config(self, config_hash: str) -> SimulationConfig:
+        """A stored config by hash, parsed once (caller holds the lock)"""
+        config = self._configs.get(config_hash)
+        if config is None:
+            row = self._conn.execute(
+                "SELECT config FROM configs WHERE config_hash = ?", (config_hash,)
+            ).fetchone()
+            config = self._configs[config_hash] = SimulationConfig.model_validate_json(row[0])
+        return config
+
+    @staticmethod
+    def _state(line: bytes, config: SimulationConfig) -> SimulationState:
+        data = json.loads(line)
+        data["config"] = config
+        return SimulationState.model_validate(data)
+
+    def _path(self, segment: int) -> str:
+        return os.path.join(self.directory, SEGMENT_NAME.format(segment))
+
+    def _segments(self) -> List[int]:
+        return sorted(
+            int(name[len("segment-"):-len(".zst")])
+            for name in os.listdir(self.directory)
+            if name.startswith("segment-") and name.endswith(".zst")
+        )
@@ -0,0 +1,331 @@
+import asyncio
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.models import SimulationState, SimulationStatus
+
+# Statuses a run can end in; anything else isn't a result yet
+FINISHED_STATUSES = {SimulationStatus.COMPLETED, SimulationStatus.FAILED, SimulationStatus.CANCELLED}
+
+# group_by name -> SQL expression
+GROUP_COLUMNS = {
+    "candidate_model": "candidate_model",
+    "sim_model": "sim_model",
+    "config_hash": "config_hash",
+    "status": "status",
+    "termination_reason": "termination_reason",
+    "day": "date(created_at, 'unixepoch')",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    simulation_id TEXT PRIMARY KEY,
+    config_hash TEXT NOT NULL,
+    candidate_model TEXT NOT NULL,
+    sim_model TEXT NOT NULL,
+    status TEXT NOT NULL,
+    termination_reason TEXT,
+    success INTEGER,
+    turns INTEGER NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    duration_seconds REAL NOT NULL,
+    created_at REAL NOT NULL
+);
+-- Covering indexes for the common filters, so aggregates never touch the table
+CREATE INDEX IF NOT EXISTS idx_results_candidate ON results
+    (candidate_model, created_at, success, turns, input_tokens, output_tokens, duration_seconds);
+CREATE INDEX IF NOT EXISTS idx_results_sim ON results
+    (sim_model, created_at, success, turns, input_tokens, output_tokens, duration_seconds);
+CREATE INDEX IF NOT EXISTS idx_results_config ON results
+    (config_hash, created_at, success, turns, input_tokens, output_tokens, duration_seconds);
+CREATE INDEX IF NOT EXISTS idx_results_created ON results (created_at, simulation_id);
+CREATE INDEX IF NOT EXISTS idx_results_status ON results (status, created_at);
+
+-- Daily rollup kept in step by triggers; answers coarse aggregations without scanning runs
+CREATE TABLE IF NOT EXISTS results_daily (
+    day TEXT NOT NULL,
+    candidate_model TEXT NOT NULL,
+    sim_model TEXT NOT NULL,
+    status TEXT NOT NULL,
+    termination_reason TEXT NOT NULL,
+    runs INTEGER NOT NULL,
+    verified INTEGER NOT NULL,
+    successes INTEGER NOT NULL,
+    turns INTEGER NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    duration_seconds REAL NOT NULL,
+    PRIMARY KEY (day, candidate_model, sim_model, status, termination_reason)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS results_daily_add AFTER INSERT ON results BEGIN
+    INSERT INTO results_daily VALUES (
+        date(NEW.created_at, 'unixepoch'), NEW.candidate_model, NEW.sim_model, NEW.status,
+        COALESCE(NEW.termination_reason, ''), 1, NEW.success IS NOT NULL, COALESCE(NEW.success, 0),
+        NEW.turns, NEW.input_tokens, NEW.output_tokens, NEW.duration_seconds
+    )
+    ON CONFLICT DO UPDATE SET
+        runs = runs + 1,
+        verified = verified + excluded.verified,
+        successes = successes + excluded.successes,
+        turns = turns + excluded.turns,
+        input_tokens = input_tokens + excluded.input_tokens,
+        output_tokens = output_tokens + excluded.output_tokens,
+        duration_seconds = duration_seconds + excluded.duration_seconds;
+END;
+CREATE TRIGGER IF NOT EXISTS results_daily_remove AFTER DELETE ON results BEGIN
+    UPDATE results_daily SET
+        runs = runs - 1,
+        verified = verified - (OLD.success IS NOT NULL),
+        successes = successes - COALESCE(OLD.success, 0),
+        turns = turns - OLD.turns,
+        input_tokens = input_tokens - OLD.input_tokens,
+        output_tokens = output_tokens - OLD.output_tokens,
+        duration_seconds = duration_seconds - OLD.duration_seconds
+    WHERE day = date(OLD.created_at, 'unixepoch')
+        AND candidate_model = OLD.candidate_model
+        AND sim_model = OLD.sim_model
+        AND status = OLD.status
+        AND termination_reason = COALESCE(OLD.termination_reason, '');
+END;
+"""
+
+# Dimensions the daily rollup can group and filter by
+_ROLLUP_COLUMNS = {
+    "candidate_model": "candidate_model",
+    "sim_model": "sim_model",
+    "status": "status",
+    "termination_reason": "NULLIF(termination_reason, '')",
+    "day": "day",
+}
+
+
+class ResultsStore:
+    """
+    SQLite table with one row of summary fields per finished simulation.
+
+    Rows are upserted as runs finish, so re-running or re-importing a
+    simulation replaces its row. Listing uses keyset pagination on
+    (created_at, simulation_id), which stays fast however deep the page.
+    Aggregations over model/status/day with whole-day time bounds are served
+    from a trigger-maintained daily rollup; anything finer scans the
+    covering indexes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            # Lets INSERT OR REPLACE fire the rollup's delete trigger for the old row
+            self._conn.execute("PRAGMA recursive_triggers=ON")
+            self._conn.executescript(_SCHEMA)
+
+    def record(self, state: SimulationState):
+        """Upsert the summary row for a finished simulation"""
+        self.record_many([state])
+
+    def record_many(self, states: Iterable[SimulationState]):
+        rows = [self._row(state) for state in states if state.status in FINISHED_STATUSES]
+        if rows:
+            self._write(rows)
+
+    def record_in_background(self, state: SimulationState) -> Optional[asyncio.Future]:
+        """
+        Upsert a finished simulation's row from a worker thread (call from the
+        event loop). The row is taken now, so later changes to the state
+        can't race the write.
+        """
+        if state.status not in FINISHED_STATUSES:
+            return None
+        row = self._row(state)
+        return asyncio.get_running_loop().run_in_executor(None, self._write, [row])
+
+    def _write(self, rows: List[Tuple]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def query(
+        self,
+        filters: Dict[str, Any],
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Dict:
+        """Matching rows, newest first; pass next_cursor back to get the next page"""
+        where, params = self._where(filters)
+        if cursor:
+            created_at, simulation_id = cursor.split("|", 1)
+            where.append("(created_at, simulation_id) < (?, ?)")
+            params.extend([float(created_at), simulation_id])
+
+        sql = "SELECT * FROM results"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC, simulation_id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        with self._lock:
+            rows = [self._result(row) for row in self._conn.execute(sql, params)]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = f"{last['created_at_ts']!r}|{last['simulation_id']}"
+        for row in rows:
+            del row["created_at_ts"]
+        return {"results": rows, "next_cursor": next_cursor}
+
+    def aggregate(
+        self,
+        filters: Dict[str, Any],
+        group_by: List[str],
+        limit: int = 100,
+        offset: int = 0
+    ) -> Dict:
+        """Per-group counts, pass rates and averages"""
+        unknown = [name for name in group_by if name not in GROUP_COLUMNS]
+        if unknown:
+            raise ValueError(f"Cannot group by {', '.join(unknown)}; choose from {', '.join(GROUP_COLUMNS)}")
+
+        if self._rollup_covers(filters, group_by):
+            where, params = self._where(filters, rollup=True)
+            keys = [f"{_ROLLUP_COLUMNS[name]} AS {name}" for name in group_by]
+            table = "results_daily"
+            aggregates = [
+                "SUM(runs) AS runs",
+                "SUM(verified) AS verified",
+                "SUM(successes) AS successes",
+                "CAST(SUM(successes) AS REAL) / NULLIF(SUM(verified), 0) AS pass_rate",
+                "CAST(SUM(turns) AS REAL) / SUM(runs) AS avg_turns",
+                "SUM(input_tokens) AS input_tokens",
+                "SUM(output_tokens) AS output_tokens",
+                "SUM(duration_seconds) / SUM(runs) AS avg_duration_seconds",
+            ]
+        else:
+            where, params = self._where(filters)
+            keys = [f"{GROUP_COLUMNS[name]} AS {name}" for name in group_by]
+            table = "results"
+            aggregates = [
+                "COUNT(*) AS runs",
+                "COUNT(success) AS verified",
+                "SUM(success) AS successes",
+                "AVG(success) AS pass_rate",
+                "AVG(turns) AS avg_turns",
+                "SUM(input_tokens) AS input_tokens",
+                "SUM(output_tokens) AS output_tokens",
+                "AVG(duration_seconds) AS avg_duration_seconds",
+            ]
+
+        sql = "SELECT " + ", ".join(keys + aggregates) + f" FROM {table}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if group_by:
+            sql += " GROUP BY " + ", ".join(group_by)
+        sql += " HAVING runs > 0 ORDER BY runs DESC LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+
+        with self._lock:
+            groups = [dict(row) for row in self._conn.execute(sql, params)]
+        return {"group_by": group_by, "groups": groups, "source": table}
+
+    def config_counts(self, filters: Dict[str, Any], group_by: List[str]) -> List[Dict]:
+        """Verified runs and successes per config (and group), the inputs to pass@k"""
+        unknown = [name for name in group_by if name not in GROUP_COLUMNS]
+        if unknown:
+            raise ValueError(f"Cannot group by {', '.join(unknown)}; choose from {', '.join(GROUP_COLUMNS)}")
+
+        where, params = self._where(filters)
+        where.append("success IS NOT NULL")
+        keys = [f"{GROUP_COLUMNS[name]} AS {name}" for name in group_by if name != "config_hash"]
+        sql = (
+            "SELECT " + ", ".join(keys + ["config_hash", "COUNT(*) AS samples", "SUM(success) AS successes"])
+            + " FROM results WHERE " + " AND ".join(where)
+            + " GROUP BY " + ", ".join([name for name in group_by if name != "config_hash"] + ["config_hash"])
+        )
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _rollup_covers(filters: Dict[str, Any], group_by: List[str]) -> bool:
+        """Whether the daily rollup gives the same answer as scanning runs"""
+        if any(name not in _ROLLUP_COLUMNS for name in group_by):
+            return False
+        if any(filters.get(column) is not None for column in ("config_hash", "success")):
+            return False
+        return all(
+            filters.get(bound) is None or filters[bound].timestamp() % 86400 == 0
+            for bound in ("created_after", "created_before")
+        )
+
+    @staticmethod
+    def _where(filters: Dict[str, Any], rollup: bool = False) -> Tuple[List[str], List[Any]]:
+        where, params = [], []
+        for column in ("config_hash", "candidate_model", "sim_model", "status", "termination_reason"):
+            value = filters.get(column)
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(getattr(value, "value", value))
+        if filters.get("success") is not None:
+            where.append("success = ?")
+            params.append(int(filters["success"]))
+        # The rollup is keyed by UTC day, which whole-day bounds map onto exactly
+        after, before = filters.get("created_after"), filters.get("created_before")
+        if after is not None:
+            where.append("day >= date(?, 'unixepoch')" if rollup else "created_at >= ?")
+            params.append(after.timestamp())
+        if before is not None:
+            where.append("day < date(?, 'unixepoch')" if rollup else "created_at < ?")
+            params.append(before.timestamp())
+        return where, params
+
+    @staticmethod
+    def _row(state: SimulationState) -> Tuple:
+        verification = state.verification_result
+        return (
+            state.simulation_id,
+            state.config_hash or state.config.content_hash(),
+            state.config.candidate_config.model,
+            state.config.sim_config.model,
+            state.status.value,
+            state.termination_reason.value if state.termination_reason else None,
+            None if verification is None else int(verification.success),
+            len(state.messages),
+            state.usage.input_tokens,
+            state.usage.output_tokens,
+            ResultsStore._duration(state),
+            state.created_at.timestamp(),
+        )
+
+    @staticmethod
+    def _duration(state: SimulationState) -> float:
+        """
+        Seconds the latest run took; 0 if its times weren't recorded
+        (e.g. imported from an export that predates them)
+        """
+        if state.started_at is None or state.finished_at is None:
+            return 0.0
+        return max(0.0, (state.finished_at - state.started_at).total_seconds())
+
+    @staticmethod
+    def _result(row: sqlite3.Row) -> Dict:
+        result = dict(row)
+        result["success"] = None if row["success"] is None else bool(row["success"])
+        result["created_at_ts"] = row["created_at"]
+        result["created_at"] = datetime.fromtimestamp(row["created_at"]).isoformat()
+        return result
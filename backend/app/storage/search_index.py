@@ -0,0 +1,210 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.models import Message, SimulationState
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    simulation_id TEXT NOT NULL,
+    turn_number INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    reasoning TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_messages_simulation ON messages (simulation_id, turn_number);
+-- External-content FTS5 index: text is stored once, in messages
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    content, reasoning, content='messages', content_rowid='id',
+    tokenize='porter unicode61', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, content, reasoning) VALUES (NEW.id, NEW.content, NEW.reasoning);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, content, reasoning)
+    VALUES ('delete', OLD.id, OLD.content, OLD.reasoning);
+END;
+"""
+
+# Searchable fields -> FTS5 column filter
+FIELDS = {
+    "all": "{content reasoning}",
+    "content": "{content}",
+    "reasoning": "{reasoning}",
+}
+
+# sort name -> ORDER BY; "recent" walks the index newest-first and stops at
+# the limit, so it stays fast for terms that match a large share of messages
+SORTS = {
+    "relevance": "rank",
+    "recent": "messages_fts.rowid DESC",
+}
+
+
+class SearchQueryError(ValueError):
+    """Raised for a query FTS5 can't parse"""
+
+
+class TranscriptIndex:
+    """
+    Full-text index over message content and reasoning (SQLite FTS5).
+
+    Messages are added as they complete. Inserts are buffered and written
+    in one transaction every `flush_every` messages or `flush_seconds`,
+    whichever comes first, so the event loop pays one small write per
+    batch rather than per message. Flushing is left to the loop thread:
+    call flush() before handing a search to a worker thread. Searches read
+    through their own read-only connection (WAL lets it run alongside
+    writes), so a slow query never holds up a flush on the loop.
+
+    Queries use FTS5 syntax: words, "quoted phrases", prefix*, AND/OR/NOT
+    and NEAR(...). Relevance ranking scores every match; sort="recent"
+    avoids that for very broad queries.
+    """
+
+    def __init__(self, path: str, flush_every: int = 200, flush_seconds: float = 1.0):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # _lock guards the writer, _read_lock the reader and _pending_lock
+        # the insert buffer; none of them is held across another
+        self._lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._pending: List[Tuple[str, int, str, str, Optional[str]]] = []
+        self._last_flush = time.monotonic()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+        # Opened after the schema exists; sees each flush once it commits
+        self._reader = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._reader.row_factory = sqlite3.Row
+
+    def add_message(self, simulation_id: str, message: Message):
+        with self._pending_lock:
+            self._pending.append((
+                simulation_id, message.turn_number, message.role.value, message.content, message.reasoning
+            ))
+            buffered = len(self._pending)
+        if (
+            buffered >= self.flush_every
+            or time.monotonic() - self._last_flush >= self.flush_seconds
+        ):
+            self.flush()
+
+    def index_simulations(self, states: Iterable[SimulationState]):
+        """(Re)index whole transcripts, e.g. after an import"""
+        states = list(states)
+        self.flush()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM messages WHERE simulation_id = ?",
+                [(state.simulation_id,) for state in states]
+            )
+            self._conn.executemany(
+                "INSERT INTO messages (simulation_id, turn_number, role, content, reasoning) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (state.simulation_id, message.turn_number, message.role.value, message.content, message.reasoning)
+                    for state in states
+                    for message in state.messages
+                ]
+            )
+
+    def delete_messages_from(self, simulation_id: str, turn_number: int):
+        """Drop a simulation's messages from a turn onwards (edits and reruns)"""
+        self.flush()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM messages WHERE simulation_id = ? AND turn_number >= ?",
+                (simulation_id, turn_number)
+            )
+
+    def replace_message(self, simulation_id: str, message: Message):
+        self.flush()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM messages WHERE simulation_id = ? AND turn_number = ?",
+                (simulation_id, message.turn_number)
+            )
+            self._conn.execute(
+                "INSERT INTO messages (simulation_id, turn_number, role, content, reasoning) VALUES (?, ?, ?, ?, ?)",
+                (simulation_id, message.turn_number, message.role.value, message.content, message.reasoning)
+            )
+
+    def flush(self):
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO messages (simulation_id, turn_number, role, content, reasoning) VALUES (?, ?, ?, ?, ?)",
+                pending
+            )
+
+    def search(
+        self,
+        query: str,
+        field: str = "all",
+        sort: str = "relevance",
+        role: Optional[str] = None,
+        simulation_id: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[Dict]:
+        """Matching messages with <mark>-highlighted snippets (buffered messages need a flush() first)"""
+        if field not in FIELDS:
+            raise SearchQueryError(f"field must be one of {', '.join(FIELDS)}")
+        if sort not in SORTS:
+            raise SearchQueryError(f"sort must be one of {', '.join(SORTS)}")
+
+        sql = """
+            SELECT m.simulation_id, m.turn_number, m.role,
+                   snippet(messages_fts, 0, '<mark>', '</mark>', '…', 24) AS content_snippet,
+                   snippet(messages_fts, 1, '<mark>', '</mark>', '…', 24) AS reasoning_snippet,
+                   bm25(messages_fts) AS score
+            FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid
+            WHERE messages_fts MATCH ?
+        """
+        params: List = [f"{FIELDS[field]} : ({query})"]
+        if role is not None:
+            sql += " AND m.role = ?"
+            params.append(role)
+        if simulation_id is not None:
+            sql += " AND m.simulation_id = ?"
+            params.append(simulation_id)
+        sql += f" ORDER BY {SORTS[sort]} LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+
+        try:
+            with self._read_lock:
+                rows = self._reader.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            raise SearchQueryError(f"Invalid search query: {e}")
+
+        results = []
+        for row in rows:
+            result = dict(row)
+            # Only show the reasoning snippet if the match is in the reasoning
+            if not result["reasoning_snippet"] or "<mark>" not in result["reasoning_snippet"]:
+                result["reasoning_snippet"] = None
+            if "<mark>" not in result["content_snippet"] and result["reasoning_snippet"]:
+                result["content_snippet"] = None
+            results.append(result)
+        return results
+
+    def close(self):
+        self.flush()
+        with self._read_lock:
+            self._reader.close()
+        with self._lock:
+            self._conn.close()
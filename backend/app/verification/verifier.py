@@ -1,9 +1,27 @@
-from typing import List
+import asyncio
+import re
+from typing import AsyncIterator, List, Optional, Dict, Tuple
 from datetime import datetime
 
-from app.models import Message, VerificationResult
+from app.models import Message, VerificationResult, JudgeConfig, JudgeVote, VoteMethod
 from app.services import LLMService
 
+DEFAULT_JUDGE_MODEL = "claude-sonnet-4-5-20250929"  # Use a capable model for verification
+
+_VERDICT_RE = re.compile(r"SUCCESS:\s*(YES|NO)\b", re.IGNORECASE)
+
+
+def _parse_verdict(response: str, complete: bool = True) -> Optional[bool]:
+    """
+    The "SUCCESS: YES/NO" verdict in a judge response, if there is one.
+    For a response still streaming, a match at the very end doesn't count
+    yet ("SUCCESS: NO" may be the start of "SUCCESS: NOT ...").
+    """
+    match = _VERDICT_RE.search(response)
+    if match is None or (not complete and match.end() == len(response)):
+        return None
+    return match.group(1).upper() == "YES"
+
 
 class Verifier:
     """
@@ -18,7 +36,10 @@ class Verifier:
         self,
         candidate_objective: str,
         verification_prompt: str,
-        conversation_history: List[Message]
+        conversation_history: List[Message],
+        judges: Optional[List[JudgeConfig]] = None,
+        vote_method: VoteMethod = VoteMethod.MAJORITY,
+        model: Optional[str] = None
     ) -> VerificationResult:
         """
         Verify if the candidate achieved its objective.
@@ -27,10 +48,107 @@ class Verifier:
             candidate_objective: The objective the candidate was trying to achieve
             verification_prompt: Custom verification instructions
             conversation_history: Full conversation between agents
+            judges: Optional ensemble of judges, run concurrently and combined by vote
+            vote_method: How the ensemble's votes are counted
+            model: Judge model when no ensemble is given (default DEFAULT_JUDGE_MODEL)
 
         Returns:
             VerificationResult with success status and explanation
         """
+        system_prompt, messages = self._build_request(
+            candidate_objective, verification_prompt, conversation_history
+        )
+
+        if judges:
+            result, _ = await self._verify_ensemble(system_prompt, messages, judges, vote_method)
+            return result
+
+        response, _, _ = await self.llm_service.generate_response(
+            model=model or DEFAULT_JUDGE_MODEL,
+            system_prompt=system_prompt,
+            messages=messages,
+            temperature=0.0,  # Deterministic verification
+            max_tokens=2048
+        )
+
+        # Parse response
+        success = self._parse_success(response)
+        explanation = self._parse_explanation(response)
+
+        return VerificationResult(
+            success=success,
+            explanation=explanation,
+            timestamp=datetime.now()
+        )
+
+    async def verify_stream(
+        self,
+        candidate_objective: str,
+        verification_prompt: str,
+        conversation_history: List[Message],
+        judges: Optional[List[JudgeConfig]] = None,
+        vote_method: VoteMethod = VoteMethod.MAJORITY,
+        model: Optional[str] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Like verify(), but streams the judge's output.
+        Yields: {"type": "delta", "delta": str} as the judge writes,
+        {"type": "verdict", "success": bool} as soon as "SUCCESS:" is parsed,
+        {"type": "usage", ...} and finally {"type": "result", "result": VerificationResult}
+
+        An ensemble is not streamed; its judges run as in verify(), and their
+        summed usage is reported before the verdict.
+        """
+        system_prompt, messages = self._build_request(
+            candidate_objective, verification_prompt, conversation_history
+        )
+
+        if judges:
+            result, usage = await self._verify_ensemble(system_prompt, messages, judges, vote_method)
+            yield {"type": "usage", **usage}
+            yield {"type": "verdict", "success": result.success}
+            yield {"type": "result", "result": result}
+            return
+
+        response = ""
+        success = None
+        async for chunk in self.llm_service.generate_response_stream(
+            model=model or DEFAULT_JUDGE_MODEL,
+            system_prompt=system_prompt,
+            messages=messages,
+            temperature=0.0,
+            max_tokens=2048
+        ):
+            if chunk["type"] == "usage":
+                yield chunk
+            elif chunk["type"] == "content":
+                response += chunk["delta"]
+                yield {"type": "delta", "delta": chunk["delta"]}
+                if success is None:
+                    success = _parse_verdict(response, complete=False)
+                    if success is not None:
+                        yield {"type": "verdict", "success": success}
+
+        if success is None:
+            success = self._parse_success(response)
+            yield {"type": "verdict", "success": success}
+
+        yield {
+            "type": "result",
+            "result": VerificationResult(
+                success=success,
+                explanation=self._parse_explanation(response),
+                timestamp=datetime.now()
+            )
+        }
+
+    def _build_request(
+        self,
+        candidate_objective: str,
+        verification_prompt: str,
+        conversation_history: List[Message]
+    ):
+        """System prompt and messages for a verification call"""
         # Build verification prompt
         system_prompt = f"""You are a verification system. Your job is to determine whether the candidate agent successfully achieved its objective based on the conversation history.
 
@@ -52,28 +170,91 @@ EXPLANATION: [Your detailed explanation]
         # Format conversation history
         conversation_text = self._format_conversation(conversation_history)
 
-        # Call LLM to verify
         messages = [
             {"role": "user", "content": f"Here is the conversation to verify:\n\n{conversation_text}"}
         ]
+        return system_prompt, messages
 
-        response, _ = await self.llm_service.generate_response(
-            model="claude-sonnet-4-5-20250929",  # Use a capable model for verification
-            system_prompt=system_prompt,
-            messages=messages,
-            temperature=0.0,  # Deterministic verification
-            max_tokens=2048
-        )
+    async def _verify_ensemble(
+        self,
+        system_prompt: str,
+        messages: List[Dict[str, str]],
+        judges: List[JudgeConfig],
+        vote_method: VoteMethod
+    ) -> Tuple[VerificationResult, Dict[str, int]]:
+        """
+        Run all judges concurrently and stop waiting as soon as the outcome
+        can no longer change. Ties count as failure; judges that error abstain.
+        Returns the result and the usage summed over the judges that answered.
+        """
+        weights = [
+            judge.weight if vote_method == VoteMethod.WEIGHTED else 1.0
+            for judge in judges
+        ]
+        votes = [
+            JudgeVote(model=judge.model, temperature=judge.temperature, weight=weight)
+            for judge, weight in zip(judges, weights)
+        ]
+        pending = {
+            asyncio.ensure_future(self.llm_service.generate_response(
+                model=judge.model,
+                system_prompt=system_prompt,
+                messages=messages,
+                temperature=judge.temperature,
+                max_tokens=2048
+            )): index
+            for index, judge in enumerate(judges)
+        }
 
-        # Parse response
-        success = self._parse_success(response)
-        explanation = self._parse_explanation(response)
+        yes = no = 0.0
+        remaining = sum(weights)
+        usage = {"input_tokens": 0, "output_tokens": 0}
+        last_error = None
+        try:
+            while pending:
+                done, _ = await asyncio.wait(set(pending), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    vote = votes[pending.pop(task)]
+                    remaining -= vote.weight
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        vote.error = str(last_error)
+                        continue
+
+                    response, _, judge_usage = task.result()
+                    usage["input_tokens"] += judge_usage["input_tokens"]
+                    usage["output_tokens"] += judge_usage["output_tokens"]
+                    vote.success = self._parse_success(response)
+                    vote.explanation = self._parse_explanation(response)
+                    if vote.success:
+                        yes += vote.weight
+                    else:
+                        no += vote.weight
+
+                # Decided once the outstanding judges can't change the outcome
+                if yes > no + remaining or no >= yes + remaining:
+                    break
+        finally:
+            for task, index in pending.items():
+                task.cancel()
+                votes[index].cancelled = True
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
 
+        if yes == 0 and no == 0:
+            raise last_error
+
+        success = yes > no
+        agreeing = [vote for vote in votes if vote.success == success]
+        spokesperson = max(agreeing, key=lambda vote: vote.weight)
         return VerificationResult(
             success=success,
-            explanation=explanation,
+            explanation=(
+                f"Judges voted {yes:g} YES / {no:g} NO. {spokesperson.explanation}"
+            ),
+            votes=votes,
             timestamp=datetime.now()
-        )
+        ), usage
 
     def _format_conversation(self, messages: List[Message]) -> str:
         """Format conversation history for verification"""
@@ -90,16 +271,12 @@ EXPLANATION: [Your detailed explanation]
 
     def _parse_success(self, response: str) -> bool:
         """Parse success status from verification response"""
+        verdict = _parse_verdict(response)
+        if verdict is not None:
+            return verdict
+        # Default to checking for "YES" or "NO" in the response
         response_upper = response.upper()
-        if "SUCCESS: YES" in response_upper or "SUCCESS:YES" in response_upper:
-            return True
-        elif "SUCCESS: NO" in response_upper or "SUCCESS:NO" in response_upper:
-            return False
-        else:
-            # Default to checking for "YES" or "NO" in the response
-            if "YES" in response_upper and "NO" not in response_upper:
-                return True
-            return False
+        return "YES" in response_upper and "NO" not in response_upper
 
     def _parse_explanation(self, response: str) -> str:
         """Parse explanation from verification response"""
@@ -0,0 +1,110 @@
+"""
+Cold-start benchmark.
+
+Measures, in fresh interpreters, how long it takes to import the app and
+construct an orchestrator (what every batch worker and distributed worker
+pays on start-up), and which imports dominate:
+
+    python bench_startup.py --runs 5
+    python bench_startup.py --record bench_history.jsonl   # track over time
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+SCENARIOS = {
+    "import_app": "import main",
+    "orchestrator": (
+        "from app.agents import SimulationOrchestrator\n"
+        "SimulationOrchestrator()"
+    ),
+    "first_anthropic_provider": (
+        "from app.services import model_registry\n"
+        "model_registry.provider('claude-sonnet-4-5-20250929')"
+    ),
+}
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def time_scenario(code: str) -> float:
+    """Wall-clock seconds for a fresh interpreter to run `code`"""
+    timed = (
+        "import time\n"
+        "_start = time.perf_counter()\n"
+        f"{code}\n"
+        "print(time.perf_counter() - _start)\n"
+    )
+    env = dict(os.environ, ANTHROPIC_API_KEY=os.getenv("ANTHROPIC_API_KEY", "bench"),
+               OPENAI_API_KEY=os.getenv("OPENAI_API_KEY", "bench"))
+    output = subprocess.run(
+        [sys.executable, "-c", timed],
+        cwd=HERE, env=env, check=True, capture_output=True, text=True
+    )
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def top_imports(code: str, limit: int):
+    """Slowest packages pulled in by `code`, by cumulative import time (-X importtime)"""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=HERE, check=True, capture_output=True, text=True
+    )
+    # package -> (shallowest nesting depth seen, cumulative time at that depth);
+    # summing only the shallowest entries avoids counting submodules twice
+    totals = {}
+    for line in output.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        depth = len(name) - len(name.lstrip())
+        package = name.strip().split(".")[0]
+        if package == "app":
+            continue
+        best_depth, total = totals.get(package, (depth, 0))
+        if depth < best_depth:
+            totals[package] = (depth, int(cumulative_us))
+        elif depth == best_depth:
+            totals[package] = (depth, total + int(cumulative_us))
+    ranked = sorted(totals.items(), key=lambda item: item[1][1], reverse=True)
+    return [(package, total) for package, (_, total) in ranked[:limit]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure backend cold-start time")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per scenario")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    parser.add_argument("--record", help="Append results as a JSON line to this file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, code in SCENARIOS.items():
+        samples = [time_scenario(code) for _ in range(args.runs)]
+        results[name] = {
+            "median_ms": round(statistics.median(samples) * 1000, 1),
+            "min_ms": round(min(samples) * 1000, 1),
+        }
+        print(f"{name:28s} median {results[name]['median_ms']:8.1f} ms   min {results[name]['min_ms']:8.1f} ms")
+
+    print(f"\nSlowest imports for '{SCENARIOS['orchestrator'].splitlines()[0]}':")
+    for package, cumulative_us in top_imports(SCENARIOS["orchestrator"], args.top):
+        print(f"  {package:28s} {cumulative_us / 1000:8.1f} ms")
+
+    if args.record:
+        with open(args.record, "a", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "timestamp": datetime.now().isoformat(),
+                "python": sys.version.split()[0],
+                "results": results,
+            }) + "\n")
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    main()
+    print(f"\n(benchmark took {time.perf_counter() - start:.1f}s)")
@@ -4,10 +4,15 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+import math
 import os
 
 from app.api import router
+from app.api.routes import orchestrator, archiver, admission
+from app.services import Priority
+from app.api.websocket import router as websocket_router
 
 # Create FastAPI app
 app = FastAPI(
@@ -28,6 +33,45 @@ app.add_middleware(
 
 # Include API routes
 app.include_router(router, prefix="/api", tags=["simulations"])
+app.include_router(websocket_router, prefix="/api", tags=["streaming"])
+
+# Coordinator mode: also own a job queue that distributed workers lease from
+APP_MODE = os.getenv("APP_MODE", "standalone")
+if APP_MODE == "coordinator":
+    from app.api.jobs import router as jobs_router
+    app.include_router(jobs_router, prefix="/api", tags=["jobs"])
+
+# Diagnostics: event-loop lag sampling, and on-demand profiling endpoints
+from app.api.debug import router as debug_router, loop_monitor
+
+LOOP_MONITOR = os.getenv("LOOP_MONITOR", "false").lower() == "true"
+if os.getenv("DEBUG_ENDPOINTS", "false").lower() == "true":
+    app.include_router(debug_router, prefix="/api", tags=["debug"])
+
+
+@app.on_event("startup")
+async def start_loop_monitor():
+    if LOOP_MONITOR:
+        loop_monitor.interval = float(os.getenv("LOOP_MONITOR_INTERVAL", 0.1))
+        loop_monitor.stall_seconds = float(os.getenv("LOOP_STALL_SECONDS", 0.25))
+        loop_monitor.start()
+
+
+@app.on_event("shutdown")
+async def stop_loop_monitor():
+    loop_monitor.stop()
+
+
+@app.on_event("startup")
+async def start_archiver():
+    if archiver is not None:
+        archiver.start()
+
+
+@app.on_event("shutdown")
+async def stop_archiver():
+    if archiver is not None:
+        archiver.stop()
 
 
 @app.get("/")
@@ -42,14 +86,39 @@ async def root():
 
 @app.get("/health")
 async def health():
-    """Detailed health check"""
+    """Detailed health check; "degraded" while interactive runs are being turned away"""
+    ready = admission.ready(Priority.INTERACTIVE)
     return {
-        "status": "healthy",
+        "status": "healthy" if ready else "degraded",
+        "ready": ready,
         "anthropic_api_key": "set" if os.getenv("ANTHROPIC_API_KEY") else "missing",
         "openai_api_key": "set" if os.getenv("OPENAI_API_KEY") else "missing",
+        "mode": APP_MODE,
+        "event_loop": {
+            "lag_ms": loop_monitor.snapshot()["lag_ms"],
+            "stall_count": loop_monitor.stall_count,
+        } if loop_monitor.running else None,
+        "circuits": {
+            model: breaker.snapshot()
+            for model, breaker in orchestrator.llm_service.breakers.items()
+        },
+        "admission": admission.snapshot(),
     }
 
 
+@app.get("/health/ready")
+async def health_ready():
+    """Readiness probe: 503 with Retry-After while interactive runs would be turned away"""
+    if admission.ready(Priority.INTERACTIVE):
+        return {"ready": True}
+    retry_after = math.ceil(admission.retry_after(Priority.INTERACTIVE))
+    return JSONResponse(
+        status_code=503,
+        content={"ready": False, "retry_after": retry_after},
+        headers={"Retry-After": str(retry_after)}
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
@@ -57,5 +126,7 @@ if __name__ == "__main__":
         "main:app",
         host="0.0.0.0",
         port=port,
-        reload=True
+        reload=True,
+        # Compress WebSocket frames (batched events are mostly repetitive JSON)
+        ws_per_message_deflate=os.getenv("WS_PER_MESSAGE_DEFLATE", "true").lower() == "true"
     )
@@ -0,0 +1,350 @@
+import asyncio
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
+
+from fastapi.testclient import TestClient
+
+from app.services import AdmissionController, AdmissionRejected, Priority, TokenWindow
+
+
+def controller(running=None, **kwargs):
+    options = dict(
+        max_running=4,
+        batch_share=0.5,
+        max_queued={Priority.INTERACTIVE: 2, Priority.BATCH: 2},
+        max_wait={Priority.INTERACTIVE: 1.0, Priority.BATCH: 1.0},
+        running=(lambda: running) if running is not None else None
+    )
+    options.update(kwargs)
+    return AdmissionController(**options)
+
+
+def test_batch_limited_to_its_share():
+    async def scenario():
+        admission = controller(max_queued={Priority.INTERACTIVE: 2, Priority.BATCH: 0})
+        await admission.admit(Priority.BATCH)
+        await admission.admit(Priority.BATCH)
+        try:
+            await admission.admit(Priority.BATCH)
+            assert False, "batch admitted past its share"
+        except AdmissionRejected as e:
+            assert e.reason == "runs"
+            assert e.retry_after >= 1
+            assert e.queue_position == 1
+        # Interactive still has the slots batch can't use
+        await admission.admit(Priority.INTERACTIVE)
+        await admission.admit(Priority.INTERACTIVE)
+        assert admission.in_flight() == 4
+
+    asyncio.run(scenario())
+
+
+def test_queued_request_is_granted_on_release():
+    async def scenario():
+        admission = controller(max_running=1)
+        ticket = await admission.admit(Priority.INTERACTIVE)
+        waiting = asyncio.create_task(admission.admit(Priority.INTERACTIVE, "next"))
+        await asyncio.sleep(0.01)
+        assert admission.snapshot()["priorities"]["interactive"]["queued"] == 1
+        ticket.release()
+        granted = await asyncio.wait_for(waiting, 1)
+        assert granted.simulation_id == "next"
+
+    asyncio.run(scenario())
+
+
+def test_queue_wait_times_out():
+    async def scenario():
+        admission = controller(max_running=1, max_wait={Priority.INTERACTIVE: 0.05, Priority.BATCH: 0.05})
+        await admission.admit(Priority.INTERACTIVE)
+        try:
+            await admission.admit(Priority.INTERACTIVE)
+            assert False, "admitted while full"
+        except AdmissionRejected as e:
+            assert e.queue_position == 1
+        assert admission.snapshot()["priorities"]["interactive"]["queued"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_pump_serves_interactive_before_batch():
+    async def scenario():
+        admission = controller(max_running=2, batch_share=1.0)
+        first = await admission.admit(Priority.INTERACTIVE)
+        second = await admission.admit(Priority.INTERACTIVE)
+        order = []
+
+        async def wait(priority, name):
+            await admission.admit(priority, name)
+            order.append(name)
+
+        batch = asyncio.create_task(wait(Priority.BATCH, "batch"))
+        await asyncio.sleep(0.01)
+        interactive = asyncio.create_task(wait(Priority.INTERACTIVE, "interactive"))
+        await asyncio.sleep(0.01)
+        first.release()
+        await asyncio.sleep(0.01)
+        assert order == ["interactive"]
+        second.release()
+        await asyncio.gather(batch, interactive)
+        assert order == ["interactive", "batch"]
+
+    asyncio.run(scenario())
+
+
+def test_try_admit_never_queues():
+    async def scenario():
+        admission = controller(max_running=1)
+        ticket = admission.try_admit(Priority.INTERACTIVE)
+        try:
+            admission.try_admit(Priority.INTERACTIVE)
+            assert False, "admitted while full"
+        except AdmissionRejected as e:
+            assert e.reason == "runs"
+        ticket.release()
+        admission.try_admit(Priority.INTERACTIVE)
+
+    asyncio.run(scenario())
+
+
+def test_try_admit_does_not_jump_the_queue():
+    async def scenario():
+        admission = controller(max_running=1)
+        ticket = await admission.admit(Priority.INTERACTIVE)
+        waiting = asyncio.create_task(admission.admit(Priority.INTERACTIVE))
+        await asyncio.sleep(0.01)
+        # The slot frees up, but the waiter is granted it before anyone else
+        ticket.release()
+        try:
+            admission.try_admit(Priority.INTERACTIVE)
+            assert False, "try_admit took a queued request's slot"
+        except AdmissionRejected:
+            pass
+        await waiting
+
+    asyncio.run(scenario())
+
+
+def test_running_simulations_count_once():
+    async def scenario():
+        running = set()
+        admission = controller(running=running)
+        ticket = await admission.admit(Priority.INTERACTIVE, "a")
+        assert admission.in_flight() == 1
+        running.add("a")
+        assert admission.in_flight() == 1
+        running.add("started-elsewhere")
+        assert admission.in_flight() == 2
+        ticket.release()
+        assert admission.in_flight() == 2
+
+    asyncio.run(scenario())
+
+
+def test_acquire_waits_past_queue_limits():
+    async def scenario():
+        admission = controller(max_running=2, max_queued={Priority.INTERACTIVE: 0, Priority.BATCH: 0})
+        ticket = await admission.acquire(Priority.BATCH)
+        waiting = asyncio.create_task(admission.acquire(Priority.BATCH))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        ticket.release()
+        await asyncio.wait_for(waiting, 1)
+
+    asyncio.run(scenario())
+
+
+def test_bound_ticket_released_with_its_task():
+    async def scenario():
+        admission = controller()
+        ticket = await admission.admit(Priority.INTERACTIVE)
+        task = asyncio.create_task(asyncio.sleep(0.01))
+        ticket.bind(task)
+        assert admission.in_flight() == 1
+        await task
+        await asyncio.sleep(0)
+        assert admission.in_flight() == 0
+
+    asyncio.run(scenario())
+
+
+def test_token_budget_holds_back_batch_first():
+    usage = TokenWindow(60.0)
+    admission = controller(tokens_per_minute=1000, batch_token_share=0.8, token_usage=usage)
+    usage.record(850)
+    try:
+        admission.try_admit(Priority.BATCH)
+        assert False, "batch admitted over its token share"
+    except AdmissionRejected as e:
+        assert e.reason == "tokens"
+        assert e.retry_after > 1
+    admission.try_admit(Priority.INTERACTIVE)
+
+
+def test_rescore_traffic_counts_against_token_budget():
+    from test_verifier import JudgeProvider
+    from app.agents import RescoreJob, SimulationOrchestrator
+    from app.models import Message, MessageRole, RescoreRequest, SimulationConfig, SimulationStatus, VerifierConfig
+    from app.services import LLMService
+    from app.services.providers import ModelRegistry
+
+    registry = ModelRegistry()
+    registry._providers["anthropic"] = JudgeProvider()
+    orchestrator = SimulationOrchestrator(LLMService(registry=registry, cassette=None))
+    # Batch share is 480 tokens: four verdicts fit under it, the fifth crosses it
+    admission = controller(tokens_per_minute=600, token_usage=orchestrator.llm_service.token_usage)
+
+    config = SimulationConfig(
+        candidate_config={"system_prompt": "s", "objective": "o"},
+        sim_config={"system_prompt": "s", "objective": "o"},
+        verification_prompt="v"
+    )
+    simulation_ids = []
+    for _ in range(5):
+        simulation_id = orchestrator.create_simulation(config)
+        state = orchestrator.get_simulation(simulation_id)
+        state.messages.append(Message(role=MessageRole.CANDIDATE, content="done", turn_number=1))
+        state.status = SimulationStatus.COMPLETED
+        simulation_ids.append(simulation_id)
+
+    request = RescoreRequest(verifier=VerifierConfig(model="claude-3-haiku-20240307"), simulation_ids=simulation_ids)
+    job = RescoreJob(orchestrator, request, admission=admission)
+    state = asyncio.run(job.run())
+
+    assert state.scored == 5
+    assert admission.token_usage.total() == 5 * 110
+    try:
+        admission.try_admit(Priority.BATCH)
+        assert False, "batch admitted after re-scoring used the token budget"
+    except AdmissionRejected as e:
+        assert e.reason == "tokens"
+
+
+def test_overloaded_run_returns_429_with_retry_after():
+    from main import app
+    from app.api import routes
+
+    client = TestClient(app)
+    admission = routes.admission
+    saved = admission.max_running, admission.max_queued, admission._running
+    admission.max_running = 1
+    admission.max_queued = {Priority.INTERACTIVE: 0, Priority.BATCH: 0}
+    admission._running = lambda: {"busy"}
+    try:
+        simulation_id = "missing"
+        response = client.post(f"/api/simulations/{simulation_id}/run")
+        assert response.status_code == 404
+
+        from app.models import AgentConfig, SimulationConfig
+        config = SimulationConfig(
+            candidate_config=AgentConfig(system_prompt="s", objective="o", model="gpt-4"),
+            sim_config=AgentConfig(system_prompt="s", objective="o", model="gpt-4"),
+            verification_prompt="v"
+        )
+        simulation_id = routes.orchestrator.create_simulation(config)
+        response = client.post(f"/api/simulations/{simulation_id}/run", headers={"X-Priority": "batch"})
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+        detail = response.json()["detail"]
+        assert detail["priority"] == "batch"
+        assert detail["reason"] == "runs"
+
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+    finally:
+        admission.max_running, admission.max_queued, admission._running = saved
+
+
+def test_rescore_releases_its_slot_while_backing_off(monkeypatch):
+    from test_verifier import JudgeProvider
+    from app.agents import RescoreJob, SimulationOrchestrator, rescore
+    from app.models import Message, MessageRole, RescoreRequest, SimulationConfig, SimulationStatus, VerifierConfig
+    from app.services import LLMService
+    from app.services.providers import ModelRegistry
+
+    class FlakyJudge(JudgeProvider):
+        """Drops the connection on the first call"""
+
+        def __init__(self):
+            super().__init__()
+            self.calls = 0
+
+        async def sample(self, model, system_prompt, messages, temperature, max_tokens, n):
+            self.calls += 1
+            if self.calls == 1:
+                raise ConnectionError("reset")
+            return await super().sample(model, system_prompt, messages, temperature, max_tokens, n)
+
+    monkeypatch.setattr(rescore, "BACKOFF_SECONDS", 0.2)
+    registry = ModelRegistry()
+    registry._providers["anthropic"] = FlakyJudge()
+    orchestrator = SimulationOrchestrator(LLMService(registry=registry, cassette=None))
+    admission = controller(running=set())
+
+    config = SimulationConfig(
+        candidate_config={"system_prompt": "s", "objective": "o"},
+        sim_config={"system_prompt": "s", "objective": "o"},
+        verification_prompt="v"
+    )
+    simulation_id = orchestrator.create_simulation(config)
+    state = orchestrator.get_simulation(simulation_id)
+    state.messages.append(Message(role=MessageRole.CANDIDATE, content="done", turn_number=1))
+    state.status = SimulationStatus.COMPLETED
+
+    async def scenario():
+        request = RescoreRequest(verifier=VerifierConfig(model="claude-3-haiku-20240307"), simulation_ids=[simulation_id])
+        task = asyncio.create_task(RescoreJob(orchestrator, request, admission=admission).run())
+        await asyncio.sleep(0.1)
+        backing_off = admission.in_flight()
+        return backing_off, await task
+
+    backing_off, result = asyncio.run(scenario())
+    assert backing_off == 0
+    assert result.scored == 1
+    assert admission.in_flight() == 0
+
+
+def test_websocket_subscribe_waits_in_the_admission_queue(monkeypatch):
+    import time
+    from main import app
+    from app.api import routes
+    from app.models import SimulationConfig, SimulationStatus
+
+    async def instant_run(simulation_id, headless=False):
+        routes.orchestrator.get_simulation(simulation_id).status = SimulationStatus.COMPLETED
+        yield {"type": "simulation_complete"}
+
+    admission = routes.admission
+    monkeypatch.setattr(routes.orchestrator, "run_simulation", instant_run)
+    monkeypatch.setattr(admission, "max_running", 1)
+    monkeypatch.setattr(admission, "max_queued", {Priority.INTERACTIVE: 1, Priority.BATCH: 0})
+    monkeypatch.setattr(admission, "max_wait", {Priority.INTERACTIVE: 0.5, Priority.BATCH: 0.5})
+    # Busy with another run for the first 0.2s
+    free_at = time.monotonic() + 0.2
+    monkeypatch.setattr(admission, "_running", lambda: {"busy"} if time.monotonic() < free_at else ())
+
+    config = SimulationConfig(
+        candidate_config={"system_prompt": "s", "objective": "o"},
+        sim_config={"system_prompt": "s", "objective": "o"},
+        verification_prompt="v"
+    )
+    queued, rejected = routes.orchestrator.create_simulation(config), routes.orchestrator.create_simulation(config)
+    try:
+        with TestClient(app).websocket_connect("/api/ws") as websocket:
+            websocket.send_json({"action": "subscribe", "simulation_ids": [queued, rejected]})
+            assert websocket.receive_json() == {"type": "subscribed", "simulation_ids": [queued, rejected]}
+
+            # The queue holds one: the second is turned away, the first starts once the slot frees
+            frame = websocket.receive_json()
+            assert frame["type"] == "error" and frame["simulation_id"] == rejected
+            assert frame["status"] == 429
+            frame = websocket.receive_json()
+            assert frame["type"] == "events"
+            assert frame["events"][-1] == {"type": "simulation_complete", "simulation_id": queued}
+            assert time.monotonic() >= free_at
+    finally:
+        for simulation_id in (queued, rejected):
+            routes.orchestrator.active_simulations.pop(simulation_id, None)
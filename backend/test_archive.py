@@ -0,0 +1,118 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+from app.models import (
+    AgentConfig,
+    Message,
+    MessageRole,
+    SimulationConfig,
+    SimulationState,
+    SimulationStatus,
+    VerificationResult
+)
+from app.storage.archive import SimulationArchive
+
+
+def config(objective: str = "o") -> SimulationConfig:
+    return SimulationConfig(
+        candidate_config=AgentConfig(system_prompt="candidate", objective=objective, model="gpt-4"),
+        sim_config=AgentConfig(system_prompt="sim", objective="o", model="gpt-4"),
+        verification_prompt="v"
+    )
+
+
+def state(simulation_id: str, content: str = "hello", objective: str = "o") -> SimulationState:
+    return SimulationState(
+        simulation_id=simulation_id,
+        config=config(objective),
+        status=SimulationStatus.COMPLETED,
+        messages=[
+            Message(role=MessageRole.CANDIDATE, content=content, turn_number=1),
+            Message(role=MessageRole.SIM, content=content * 2, turn_number=2)
+        ],
+        verification_result=VerificationResult(success=True, explanation="ok")
+    )
+
+
+def test_append_load_round_trip(tmp_path):
+    archive = SimulationArchive(str(tmp_path), block_size=256)
+    states = [state(f"s{i}", content=f"message {i}", objective=f"o{i % 2}") for i in range(20)]
+    assert archive.append(states) == [s.simulation_id for s in states]
+
+    for original in states:
+        loaded = archive.load(original.simulation_id)
+        assert loaded.model_dump() == original.model_dump()
+    assert archive.load("missing") is None
+    assert archive.contains("s3") and not archive.contains("missing")
+
+    stats = archive.stats()
+    assert stats["simulations"] == 20
+    assert stats["segments"] == 1
+    archive.close()
+
+
+def test_reopen_keeps_index(tmp_path):
+    archive = SimulationArchive(str(tmp_path))
+    archive.append([state("a")])
+    archive.close()
+
+    reopened = SimulationArchive(str(tmp_path))
+    assert reopened.load("a").messages[0].content == "hello"
+    reopened.close()
+
+
+def test_segment_rollover(tmp_path):
+    archive = SimulationArchive(str(tmp_path), block_size=128, segment_size=1)
+    for i in range(3):
+        archive.append([state(f"s{i}", content=f"message {i}")])
+    assert os.path.exists(tmp_path / "segment-000003.zst")
+    assert archive.stats()["segments"] == 3
+    for i in range(3):
+        assert archive.load(f"s{i}").messages[0].content == f"message {i}"
+    archive.close()
+
+
+def test_rearchiving_points_at_new_copy(tmp_path):
+    archive = SimulationArchive(str(tmp_path))
+    archive.append([state("a", content="old")])
+    archive.append([state("a", content="new")])
+    assert archive.load("a").messages[0].content == "new"
+    assert archive.stats()["simulations"] == 1
+    assert [s.messages[0].content for s in archive.iter_states()] == ["new"]
+    archive.close()
+
+
+def test_iter_states_excludes(tmp_path):
+    archive = SimulationArchive(str(tmp_path), block_size=200)
+    archive.append([state(f"s{i}", content=f"message {i}") for i in range(10)])
+    seen = [s.simulation_id for s in archive.iter_states(exclude={"s2", "s7"})]
+    assert seen == [f"s{i}" for i in range(10) if i not in (2, 7)]
+    assert all(s.config.sim_config.system_prompt == "sim" for s in archive.iter_states())
+    archive.close()
+
+
+def test_rescore_filter_covers_archived_simulations(tmp_path):
+    from test_verifier import JudgeProvider
+    from app.agents import RescoreJob, SimulationOrchestrator
+    from app.models import RescoreRequest, VerifierConfig
+    from app.services import LLMService
+    from app.services.providers import ModelRegistry
+
+    registry = ModelRegistry()
+    registry._providers["anthropic"] = JudgeProvider(verdict="NO")
+    archive = SimulationArchive(str(tmp_path))
+    orchestrator = SimulationOrchestrator(LLMService(registry=registry, cassette=None), archive=archive)
+    for simulation_id in ("a", "b", "c"):
+        orchestrator.import_simulation(state(simulation_id))
+    orchestrator.active_simulations["c"].updated_at = datetime.now() + timedelta(hours=1)
+    assert asyncio.run(orchestrator.archive_simulations(datetime.now())) == 2
+
+    request = RescoreRequest(verifier=VerifierConfig(model="claude-3-haiku-20240307"), status=SimulationStatus.COMPLETED)
+    result = asyncio.run(RescoreJob(orchestrator, request).run())
+    assert result.scored == 3 and result.skipped == 0
+    assert result.flipped_to_failure == 3
+    # Archived matches were moved back into memory with their new verdict
+    for simulation_id in ("a", "b", "c"):
+        assert orchestrator.active_simulations[simulation_id].rescores[result.version].success is False
+    archive.close()
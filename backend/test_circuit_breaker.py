@@ -0,0 +1,159 @@
+import asyncio
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
+
+from app.services import CircuitBreaker, CircuitOpenError, CircuitState, LLMService
+from app.services.providers import ModelRegistry, Provider
+
+
+def test_opens_on_error_rate_then_probes_and_closes():
+    breaker = CircuitBreaker("m", error_rate_threshold=0.5, min_requests=4, open_seconds=0.05)
+    for success in (True, False, True):
+        breaker.acquire()
+        breaker.release(success)
+    assert breaker.state == CircuitState.CLOSED
+
+    breaker.acquire()
+    breaker.release(False)
+    assert breaker.state == CircuitState.OPEN
+    try:
+        breaker.acquire()
+        assert False, "open circuit let a call through"
+    except CircuitOpenError as e:
+        assert 0 < e.retry_after <= 0.05
+
+    time.sleep(0.06)
+    breaker.acquire()
+    assert breaker.state == CircuitState.HALF_OPEN
+    # One probe at a time
+    try:
+        breaker.acquire()
+        assert False, "half-open circuit let a second probe through"
+    except CircuitOpenError:
+        pass
+
+    breaker.release(True)
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.snapshot()["requests"] == 0
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker("m", min_requests=1, open_seconds=0.05)
+    breaker.acquire()
+    breaker.release(False)
+    time.sleep(0.06)
+
+    breaker.acquire()
+    breaker.release(False)
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_slow_calls_count_as_failures_and_unknown_outcomes_are_ignored():
+    breaker = CircuitBreaker("m", min_requests=2, slow_call_seconds=1.0)
+    breaker.acquire()
+    breaker.release(None)
+    breaker.acquire()
+    breaker.release(True, latency=0.1)
+    assert breaker.snapshot()["requests"] == 1
+
+    breaker.acquire()
+    breaker.release(True, latency=2.0)
+    assert breaker.state == CircuitState.OPEN
+
+
+class FailingProvider(Provider):
+    """Answers with the model name, or raises the error configured for a model"""
+    name = "anthropic"
+
+    def __init__(self, errors):
+        self.errors = errors
+        self.calls = []
+
+    async def generate(self, model, system_prompt, messages, temperature, max_tokens):
+        self.calls.append(model)
+        if model in self.errors:
+            raise self.errors[model]
+        return model, None
+
+    async def stream(self, model, system_prompt, messages, temperature, max_tokens):
+        self.calls.append(model)
+        if model in self.errors:
+            raise self.errors[model]
+        yield {"type": "content", "delta": model}
+        yield {"type": "usage", "input_tokens": 1, "output_tokens": 1}
+
+
+def service(provider):
+    registry = ModelRegistry()
+    registry._providers["anthropic"] = provider
+    return LLMService(registry=registry, cassette=None)
+
+
+FAILOVER = {"claude-a": "claude-b", "claude-b": "claude-a"}
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+def generate(llm_service):
+    return asyncio.run(llm_service.generate_response(
+        model="claude-a", system_prompt="s", messages=MESSAGES, failover=FAILOVER
+    ))
+
+
+def test_failover_skips_open_circuit():
+    provider = FailingProvider({})
+    llm_service = service(provider)
+    llm_service._breaker("claude-a")._open()
+
+    content, _, _ = generate(llm_service)
+    assert content == "claude-b"
+    assert provider.calls == ["claude-b"]
+
+
+def test_failover_on_provider_fault():
+    provider = FailingProvider({"claude-a": ConnectionError("reset")})
+    llm_service = service(provider)
+
+    content, _, _ = generate(llm_service)
+    assert content == "claude-b"
+    assert provider.calls == ["claude-a", "claude-b"]
+    assert llm_service.breakers["claude-a"].snapshot()["error_rate"] == 1.0
+
+
+def test_no_failover_on_bad_request():
+    provider = FailingProvider({"claude-a": ValueError("bad request")})
+    llm_service = service(provider)
+    try:
+        generate(llm_service)
+        assert False, "ValueError was failed over"
+    except ValueError:
+        pass
+    assert provider.calls == ["claude-a"]
+    assert llm_service.breakers["claude-a"].snapshot()["requests"] == 0
+
+
+def test_stream_fails_over_before_output():
+    provider = FailingProvider({"claude-a": ConnectionError("reset")})
+    llm_service = service(provider)
+
+    async def collect():
+        return [
+            chunk async for chunk in llm_service.generate_response_stream(
+                model="claude-a", system_prompt="s", messages=MESSAGES, failover=FAILOVER
+            )
+        ]
+
+    chunks = asyncio.run(collect())
+    assert chunks[0]["delta"] == "claude-b"
+
+
+def test_every_model_failing_raises_the_last_error():
+    provider = FailingProvider({"claude-a": ConnectionError("a"), "claude-b": ConnectionError("b")})
+    try:
+        generate(service(provider))
+        assert False, "no error raised"
+    except ConnectionError as e:
+        assert str(e) == "b"
+    assert provider.calls == ["claude-a", "claude-b"]
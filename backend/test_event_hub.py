@@ -0,0 +1,168 @@
+import asyncio
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
+
+from app.services import EventHub, SlowConsumerPolicy
+
+
+class FakeState:
+    def model_dump(self, mode=None):
+        return {"simulation_id": "sim"}
+
+
+class FakeOrchestrator:
+    """run_simulation replays `events`, then waits for `release` before completing"""
+
+    def __init__(self, events):
+        self.events = events
+        self.release = asyncio.Event()
+        self.cancelled = False
+        self.completed = False
+
+    def get_simulation(self, simulation_id):
+        return FakeState()
+
+    async def run_simulation(self, simulation_id):
+        try:
+            for event in self.events:
+                yield event
+            await self.release.wait()
+            yield {"type": "simulation_complete"}
+            self.completed = True
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+def deltas(count, turn=1):
+    return [{"type": "content_delta", "turn": turn, "speaker": "candidate", "delta": str(i % 10)} for i in range(count)]
+
+
+def turns(count):
+    return [{"type": "turn_start", "turn": turn, "speaker": "candidate"} for turn in range(count)]
+
+
+async def settle():
+    # Let the producer task publish everything it can
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+async def drain(subscription):
+    return [event async for event in subscription.events()]
+
+
+def test_coalesce_merges_deltas_for_a_slow_reader():
+    async def scenario():
+        events = [{"type": "turn_start", "turn": 1, "speaker": "candidate"}] + deltas(50)
+        orchestrator = FakeOrchestrator(events)
+        hub = EventHub(orchestrator, queue_size=4)
+        subscription = hub.subscribe("sim", SlowConsumerPolicy.COALESCE)
+        await settle()
+        orchestrator.release.set()
+        return await drain(subscription)
+
+    received = asyncio.run(scenario())
+    assert [event["type"] for event in received] == ["turn_start", "content_delta", "simulation_complete"]
+    assert received[1]["delta"] == "".join(str(i % 10) for i in range(50))
+
+
+def test_coalesce_falls_back_to_snapshot_when_merging_is_not_enough():
+    async def scenario():
+        orchestrator = FakeOrchestrator(turns(10))
+        hub = EventHub(orchestrator, queue_size=4)
+        subscription = hub.subscribe("sim", SlowConsumerPolicy.COALESCE)
+        await settle()
+        orchestrator.release.set()
+        return subscription, await drain(subscription)
+
+    subscription, received = asyncio.run(scenario())
+    assert subscription.overflows >= 1
+    assert received[0]["type"] == "snapshot"
+    assert received[0]["streaming"] == {"turn": 9, "speaker": "candidate", "content": "", "reasoning": ""}
+    assert received[-1]["type"] == "simulation_complete"
+
+
+def test_snapshot_policy_replaces_the_backlog():
+    async def scenario():
+        orchestrator = FakeOrchestrator([{"type": "turn_start", "turn": 1, "speaker": "candidate"}] + deltas(20))
+        hub = EventHub(orchestrator, queue_size=4)
+        subscription = hub.subscribe("sim", SlowConsumerPolicy.SNAPSHOT)
+        await settle()
+        orchestrator.release.set()
+        return await drain(subscription)
+
+    received = asyncio.run(scenario())
+    assert [event["type"] for event in received] == ["snapshot", "simulation_complete"]
+    # The snapshot carries the text streamed so far, built when it was read
+    assert received[0]["streaming"]["content"] == "".join(str(i % 10) for i in range(20))
+
+
+def test_disconnect_drops_only_the_slow_subscriber():
+    async def scenario():
+        orchestrator = FakeOrchestrator(turns(10))
+        hub = EventHub(orchestrator, queue_size=4)
+        slow = hub.subscribe("sim", SlowConsumerPolicy.DISCONNECT)
+        fast = hub.subscribe("sim", SlowConsumerPolicy.COALESCE)
+        fast_events = asyncio.create_task(drain(fast))
+        await settle()
+        slow_events = await drain(slow)
+        orchestrator.release.set()
+        return orchestrator, slow_events, await fast_events
+
+    orchestrator, slow_events, fast_events = asyncio.run(scenario())
+    assert [event["type"] for event in slow_events] == ["error"]
+    assert fast_events[-1]["type"] == "simulation_complete"
+    assert orchestrator.completed and not orchestrator.cancelled
+
+
+def test_last_subscriber_closing_cancels_the_run():
+    async def scenario():
+        orchestrator = FakeOrchestrator(turns(2))
+        hub = EventHub(orchestrator)
+        subscription = hub.subscribe("sim")
+        task = hub.run_task("sim")
+        await settle()
+        subscription.close()
+        await asyncio.wait_for(task, timeout=1)
+        return orchestrator, hub
+
+    orchestrator, hub = asyncio.run(scenario())
+    assert orchestrator.cancelled and not orchestrator.completed
+    assert not hub.is_streaming("sim")
+
+
+def test_run_survives_its_only_subscriber_being_disconnected():
+    async def scenario():
+        orchestrator = FakeOrchestrator(turns(10))
+        hub = EventHub(orchestrator, queue_size=4)
+        subscription = hub.subscribe("sim", SlowConsumerPolicy.DISCONNECT)
+        task = hub.run_task("sim")
+        await settle()
+        received = await drain(subscription)
+        orchestrator.release.set()
+        await asyncio.wait_for(task, timeout=1)
+        return orchestrator, received
+
+    orchestrator, received = asyncio.run(scenario())
+    assert [event["type"] for event in received] == ["error"]
+    assert orchestrator.completed and not orchestrator.cancelled
+
+
+def test_late_subscriber_starts_from_a_snapshot():
+    async def scenario():
+        orchestrator = FakeOrchestrator([{"type": "turn_start", "turn": 1, "speaker": "candidate"}] + deltas(3))
+        hub = EventHub(orchestrator)
+        first = hub.subscribe("sim")
+        first_events = asyncio.create_task(drain(first))
+        await settle()
+        late = hub.subscribe("sim")
+        orchestrator.release.set()
+        return await drain(late), await first_events
+
+    late_events, first_events = asyncio.run(scenario())
+    assert [event["type"] for event in late_events] == ["status", "snapshot", "simulation_complete"]
+    assert late_events[1]["streaming"]["content"] == "012"
+    assert first_events[-1]["type"] == "simulation_complete"
@@ -0,0 +1,82 @@
+import gzip
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
+
+from fastapi.testclient import TestClient
+
+from app.models import Message, MessageRole, SimulationConfig, SimulationStatus, TerminationReason
+
+
+def config(objective):
+    return SimulationConfig(
+        candidate_config={"system_prompt": "s", "objective": objective},
+        sim_config={"system_prompt": "s", "objective": objective},
+        verification_prompt="v"
+    )
+
+
+def create_finished(orchestrator, simulation_config, count):
+    simulation_ids = []
+    for index in range(count):
+        simulation_id = orchestrator.create_simulation(simulation_config)
+        state = orchestrator.get_simulation(simulation_id)
+        state.messages = [Message(role=MessageRole.CANDIDATE, content=f"reply {index}", turn_number=1)]
+        state.status = SimulationStatus.COMPLETED
+        state.termination_reason = TerminationReason.MAX_TURNS
+        simulation_ids.append(simulation_id)
+    return simulation_ids
+
+
+def export(client, **params):
+    response = client.get("/api/simulations/export", params=params)
+    assert response.status_code == 200
+    return response.content
+
+
+def test_export_import_round_trip():
+    from main import app
+    from app.api import routes
+
+    client = TestClient(app)
+    orchestrator = routes.orchestrator
+    first, second = config("round trip a"), config("round trip b")
+    simulation_ids = create_finished(orchestrator, first, 3) + create_finished(orchestrator, second, 2)
+    originals = {simulation_id: orchestrator.get_simulation(simulation_id) for simulation_id in simulation_ids}
+    try:
+        bodies = [
+            export(client, config_hash=simulation_config.content_hash(), gzip="true", shared_configs="true")
+            for simulation_config in (first, second)
+        ]
+        # Each config is written once, ahead of the states that refer to it
+        lines = gzip.decompress(bodies[0]).splitlines()
+        assert len(lines) == 4 and lines[0].startswith(b'{"config_hash"')
+
+        for simulation_id in simulation_ids:
+            orchestrator.active_simulations.pop(simulation_id)
+
+        # Two exports concatenated (cat a.jsonl.gz b.jsonl.gz) import as one stream
+        response = client.post("/api/simulations/import", content=bodies[0] + bodies[1])
+        assert response.status_code == 200
+        assert response.json() == {"imported": 5, "skipped": 0, "failed": 0, "errors": []}
+        for simulation_id, original in originals.items():
+            assert orchestrator.get_simulation(simulation_id).model_dump() == original.model_dump()
+
+        response = client.post("/api/simulations/import", content=bodies[0])
+        assert response.json()["skipped"] == 3
+    finally:
+        for simulation_id in simulation_ids:
+            orchestrator.active_simulations.pop(simulation_id, None)
+
+
+def test_import_rejects_bad_gzip():
+    from main import app
+
+    client = TestClient(app)
+    body = gzip.compress(b"")
+    response = client.post("/api/simulations/import", content=body[:-4])
+    assert response.status_code == 400
+
+    response = client.post("/api/simulations/import", content=body + b"trailing")
+    assert response.status_code == 400
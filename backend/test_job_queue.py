@@ -0,0 +1,149 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.agents import SimulationOrchestrator
+from app.distributed import JobQueue, LeaseError
+from app.distributed.worker import SimulationWorker
+from app.models import JobStatus, SimulationConfig, SimulationStatus, TerminationReason
+
+CONFIG = SimulationConfig(
+    candidate_config={"system_prompt": "s", "objective": "o"},
+    sim_config={"system_prompt": "s", "objective": "o"},
+    verification_prompt="v"
+)
+
+
+def test_expired_lease_is_requeued():
+    queue = JobQueue(lease_seconds=0.05)
+    job_id, = queue.submit([CONFIG])
+    first_lease = queue.lease("worker-1", 1)[0].lease_id
+
+    time.sleep(0.06)
+    job, = queue.lease("worker-2", 1)
+    assert job.job_id == job_id
+    assert job.worker_id == "worker-2" and job.attempts == 2
+    assert job.lease_id != first_lease
+
+    # The first worker's lease is gone
+    try:
+        queue.complete(job_id, first_lease, "sim")
+        assert False, "stale lease accepted"
+    except LeaseError:
+        pass
+
+
+def test_heartbeat_extends_the_lease():
+    queue = JobQueue(lease_seconds=0.2)
+    queue.submit([CONFIG])
+    job, = queue.lease("worker-1", 1)
+    first_expiry = job.lease_expires_at
+
+    for _ in range(3):
+        time.sleep(0.1)
+        queue.heartbeat(job.job_id, job.lease_id)
+    assert job.lease_expires_at > first_expiry + timedelta(seconds=0.2)
+
+    queue.requeue_expired()
+    assert job.status == JobStatus.LEASED
+    queue.complete(job.job_id, job.lease_id, "sim")
+    assert job.status == JobStatus.COMPLETED
+
+
+def test_job_fails_after_max_attempts():
+    queue = JobQueue(max_attempts=2)
+    job_id, = queue.submit([CONFIG])
+
+    job, = queue.lease("worker-1", 1)
+    queue.fail(job_id, job.lease_id, "boom")
+    assert job.status == JobStatus.QUEUED
+
+    job, = queue.lease("worker-1", 1)
+    job.lease_expires_at = datetime.now() - timedelta(seconds=1)
+    assert queue.lease("worker-1", 1) == []
+    assert job.status == JobStatus.FAILED
+    assert job.error == "Lease expired on worker worker-1"
+    assert queue.stats()["failed"] == 1
+
+
+def coordinator():
+    from app.api import jobs
+
+    jobs.job_queue = JobQueue(lease_seconds=5, max_attempts=2)
+    app = FastAPI()
+    app.include_router(jobs.router, prefix="/api")
+    return app, jobs
+
+
+def test_result_for_a_running_simulation_is_a_failed_attempt():
+    app, jobs = coordinator()
+    client = TestClient(app)
+    job_id = client.post("/api/jobs", json={"configs": [CONFIG.model_dump(mode="json")]}).json()["job_ids"][0]
+    lease = client.post("/api/jobs/lease", json={"worker_id": "w", "max_jobs": 1}).json()["jobs"][0]
+
+    # The coordinator is running a simulation with the same ID
+    simulation_id = jobs.orchestrator.create_simulation(CONFIG)
+    running = jobs.orchestrator.get_simulation(simulation_id)
+    running.status = SimulationStatus.RUNNING
+    state = running.model_copy(update={"status": SimulationStatus.COMPLETED})
+    try:
+        response = client.post(f"/api/jobs/{job_id}/result", json={
+            "lease_id": lease["lease_id"],
+            "state": state.model_dump(mode="json")
+        })
+    finally:
+        jobs.orchestrator.active_simulations.pop(simulation_id, None)
+
+    assert response.status_code == 409
+    job = jobs.job_queue.get(job_id)
+    assert job.status == JobStatus.QUEUED
+    assert "is running" in job.error
+
+
+class InstantOrchestrator(SimulationOrchestrator):
+    """Finishes every simulation immediately, without calling a provider"""
+
+    async def run_simulation(self, simulation_id, headless=False):
+        state = self.get_simulation(simulation_id)
+        state.status = SimulationStatus.COMPLETED
+        state.termination_reason = TerminationReason.MAX_TURNS
+        return
+        yield
+
+
+def test_several_workers_drain_the_queue():
+    app, jobs = coordinator()
+    job_ids = jobs.job_queue.submit([CONFIG] * 12)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        workers = [
+            SimulationWorker(
+                "http://coordinator",
+                concurrency=2,
+                poll_interval=0.01,
+                worker_id=f"worker-{i}",
+                orchestrator=InstantOrchestrator(),
+                transport=transport
+            )
+            for i in range(3)
+        ]
+        await asyncio.gather(*[worker.run(exit_when_idle=True) for worker in workers])
+        return workers
+
+    workers = asyncio.run(scenario())
+    assert sum(worker.completed for worker in workers) == 12
+    assert jobs.job_queue.stats()["completed"] == 12
+    for job_id in job_ids:
+        job = jobs.job_queue.get(job_id)
+        stored = jobs.orchestrator.get_simulation(job.simulation_id)
+        assert stored.status == SimulationStatus.COMPLETED
+        jobs.orchestrator.active_simulations.pop(job.simulation_id, None)
@@ -0,0 +1,128 @@
+import asyncio
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
+
+from app.services import LLMService
+from app.services.providers import ModelInfo, ModelRegistry, Provider
+
+
+class FakeProvider(Provider):
+    """Streams one content chunk per call after a per-model delay (a list gives one per call)"""
+    name = "anthropic"
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.calls = []
+        self.closed = []
+
+    async def generate(self, model, system_prompt, messages, temperature, max_tokens):
+        self.calls.append(model)
+        return model, None
+
+    async def stream(self, model, system_prompt, messages, temperature, max_tokens):
+        self.calls.append(model)
+        try:
+            delay = self.delays[model]
+            await asyncio.sleep(delay.pop(0) if isinstance(delay, list) else delay)
+            yield {"type": "content", "delta": model}
+            yield {"type": "usage", "input_tokens": 1, "output_tokens": 1}
+        finally:
+            self.closed.append(model)
+
+
+def service(provider):
+    registry = ModelRegistry()
+    registry._providers["anthropic"] = provider
+    return LLMService(registry=registry, cassette=None)
+
+
+def stream(llm_service, model, **kwargs):
+    async def collect():
+        return [
+            chunk async for chunk in llm_service.generate_response_stream(
+                model=model, system_prompt="s", messages=[{"role": "user", "content": "hi"}], **kwargs
+            )
+        ]
+    return asyncio.run(collect())
+
+
+def test_primary_wins_before_hedge_fires():
+    provider = FakeProvider({"claude-primary": 0.01})
+    llm_service = service(provider)
+    chunks = stream(llm_service, "claude-primary", hedge_after_seconds=0.5)
+
+    assert chunks[0]["delta"] == "claude-primary"
+    assert provider.calls == ["claude-primary"]
+    assert llm_service.hedges_fired == 0
+    (seconds, censored), = llm_service._first_token_latencies["claude-primary"]
+    assert not censored and seconds < 0.5
+
+
+def test_hedge_wins_and_primary_is_cancelled():
+    # Same model for the hedge; the second call is fast
+    provider = FakeProvider({"claude-primary": [5.0, 0.01]})
+    llm_service = service(provider)
+    chunks = stream(llm_service, "claude-primary", hedge_after_seconds=0.05)
+
+    assert [chunk["type"] for chunk in chunks] == ["content", "usage"]
+    assert llm_service.hedges_fired == 1
+    assert llm_service.hedges_won == 1
+    # Both streams were closed: the loser by cancellation, the winner at its end
+    assert provider.closed.count("claude-primary") == 2
+    samples = sorted(llm_service._first_token_latencies["claude-primary"], key=lambda sample: sample[1])
+    (winner_seconds, winner_censored), (loser_seconds, loser_censored) = samples
+    # The winner is timed from its own start, not the primary's
+    assert not winner_censored and winner_seconds < 0.05
+    assert loser_censored and loser_seconds >= 0.05
+
+
+def test_hedge_is_sent_to_hedge_model():
+    provider = FakeProvider({"claude-primary": 5.0, "claude-backup": 0.01})
+    llm_service = service(provider)
+    chunks = stream(llm_service, "claude-primary", hedge_after_seconds=0.05, hedge_model="claude-backup")
+
+    assert chunks[0]["delta"] == "claude-backup"
+    assert provider.calls == ["claude-primary", "claude-backup"]
+    assert "claude-primary" in provider.closed
+    assert [censored for _, censored in llm_service._first_token_latencies["claude-primary"]] == [True]
+    assert [censored for _, censored in llm_service._first_token_latencies["claude-backup"]] == [False]
+
+
+def test_adaptive_threshold_uses_learned_p95():
+    llm_service = service(FakeProvider({}))
+    for seconds in range(1, 21):
+        llm_service._record_first_token("claude-primary", float(seconds))
+
+    assert llm_service._hedge_threshold("claude-primary", 99.0, hedge_adaptive=True) == 19.0
+    assert llm_service._hedge_threshold("claude-primary", 99.0, hedge_adaptive=False) == 99.0
+    assert llm_service._hedge_threshold("claude-other", 99.0, hedge_adaptive=True) == 99.0
+
+
+def test_p95_with_censored_samples():
+    p95 = LLMService._latency_p95
+    observed = [(float(seconds), False) for seconds in range(1, 21)]
+    assert p95(observed) == 19.0
+
+    # Losers cut off early push the estimate up instead of pulling it down
+    censored = observed[:18] + [(2.0, True), (3.0, True)]
+    assert p95(censored) > p95(observed[:18] + [(2.0, False), (3.0, False)])
+
+    # Kaplan-Meier: survival is 3/5 after 1 and 2; the censored 3 and 4 leave
+    # the risk set without a drop, so 5 takes survival to 0
+    samples = [(1.0, False), (2.0, False), (3.0, True), (4.0, True), (5.0, False)]
+    assert p95(samples) == 5.0
+
+    # All-censored tail: the largest sample is the best available bound
+    assert p95([(1.0, False), (8.0, True), (9.0, True)]) == 9.0
+
+
+def test_registry_infers_provider_from_name():
+    registry = ModelRegistry(models=[ModelInfo(name="house-model", provider="anthropic")])
+    assert registry.get("house-model").provider == "anthropic"
+    assert registry.get("claude-3-haiku-20240307").provider == "anthropic"
+    assert registry.get("gpt-4o").provider == "openai"
+    # Any other name goes to OpenAI, as fine-tuned and alias names don't share a prefix
+    for model in ("ft:gpt-4o-mini:org::abc123", "chatgpt-4o-latest"):
+        assert registry.get(model).provider == "openai"
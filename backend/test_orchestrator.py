@@ -0,0 +1,178 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
+
+from app.agents import Agent, AgentRole, SimulationOrchestrator
+from app.agents.orchestrator import SimulationNotRunningError
+from app.models import AgentConfig, SimulationConfig, SimulationStatus, TerminationReason
+from app.services import LLMService
+from app.services.providers import ModelRegistry, Provider
+from app.storage import ResultsStore
+
+
+class SlowProvider(Provider):
+    """Streams a reply after `delay` seconds; records streams closed before finishing"""
+    name = "anthropic"
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.started = asyncio.Event()
+        self.interrupted = 0
+
+    async def generate(self, model, system_prompt, messages, temperature, max_tokens):
+        await asyncio.sleep(self.delay)
+        return "SUCCESS: YES\nEXPLANATION: ok", None
+
+    async def stream(self, model, system_prompt, messages, temperature, max_tokens):
+        self.started.set()
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.interrupted += 1
+            raise
+        yield {"type": "content", "delta": "SUCCESS: YES\nEXPLANATION: ok"}
+        yield {"type": "usage", "input_tokens": 1, "output_tokens": 1}
+
+
+def orchestrator(delay):
+    provider = SlowProvider(delay)
+    registry = ModelRegistry()
+    registry._providers["anthropic"] = provider
+    return SimulationOrchestrator(LLMService(registry=registry, cassette=None)), provider
+
+
+def config(**kwargs):
+    return SimulationConfig(
+        candidate_config={"system_prompt": "s", "objective": "o", "model": "claude-3-haiku-20240307"},
+        sim_config={"system_prompt": "s", "objective": "o", "model": "claude-3-haiku-20240307"},
+        verification_prompt="v",
+        **kwargs
+    )
+
+
+def run(simulations, simulation_id, headless=False):
+    async def collect():
+        return [event async for event in simulations.run_simulation(simulation_id, headless=headless)]
+    return asyncio.run(asyncio.wait_for(collect(), timeout=5))
+
+
+def test_completes_within_deadlines():
+    simulations, _ = orchestrator(delay=0)
+    simulation_id = simulations.create_simulation(config(max_turns=2, timeout_seconds=5, turn_timeout_seconds=5))
+    events = run(simulations, simulation_id)
+
+    state = simulations.get_simulation(simulation_id)
+    assert events[-1]["type"] == "simulation_complete"
+    assert state.status == SimulationStatus.COMPLETED
+    assert state.termination_reason == TerminationReason.MAX_TURNS
+
+
+def test_wall_clock_deadline_fails_the_run():
+    for headless in (False, True):
+        simulations, provider = orchestrator(delay=30)
+        simulation_id = simulations.create_simulation(config(timeout_seconds=0.1))
+        events = run(simulations, simulation_id, headless=headless)
+
+        state = simulations.get_simulation(simulation_id)
+        assert events[-1]["type"] == "error"
+        assert state.status == SimulationStatus.FAILED
+        assert state.termination_reason == TerminationReason.SIMULATION_DEADLINE
+        assert provider.interrupted == 1
+
+
+def test_turn_timeout_fails_the_run():
+    for headless in (False, True):
+        simulations, provider = orchestrator(delay=30)
+        simulation_id = simulations.create_simulation(config(turn_timeout_seconds=0.1))
+        events = run(simulations, simulation_id, headless=headless)
+
+        state = simulations.get_simulation(simulation_id)
+        assert events[-1]["type"] == "error"
+        assert state.status == SimulationStatus.FAILED
+        assert state.termination_reason == TerminationReason.TURN_DEADLINE
+        assert provider.interrupted == 1
+
+
+def test_cancel_ends_the_run_as_cancelled():
+    async def scenario():
+        # Built on the running loop: the provider's Event binds to it on Python 3.9
+        simulations, provider = orchestrator(delay=30)
+        simulation_id = simulations.create_simulation(config())
+
+        async def collect():
+            return [event async for event in simulations.run_simulation(simulation_id)]
+
+        task = asyncio.create_task(collect())
+        await asyncio.wait_for(provider.started.wait(), timeout=5)
+        simulations.cancel_simulation(simulation_id)
+        return simulations, provider, simulation_id, await asyncio.wait_for(task, timeout=5)
+
+    simulations, provider, simulation_id, events = asyncio.run(scenario())
+    state = simulations.get_simulation(simulation_id)
+    assert events[-1]["type"] == "simulation_cancelled"
+    assert state.status == SimulationStatus.CANCELLED
+    assert state.termination_reason == TerminationReason.CANCELLED
+    assert provider.interrupted == 1
+
+    try:
+        simulations.cancel_simulation(simulation_id)
+        assert False, "cancelled a simulation that isn't running"
+    except SimulationNotRunningError:
+        pass
+
+
+class ChunkedProvider(Provider):
+    """Streams a reply in the given chunks, asking for verification across a chunk boundary"""
+    name = "anthropic"
+
+    async def generate(self, model, system_prompt, messages, temperature, max_tokens):
+        return "Done. REQUEST_VERIFICATION", None
+
+    async def stream(self, model, system_prompt, messages, temperature, max_tokens):
+        yield {"type": "reasoning", "delta": "thinking"}
+        for delta in ("Done. REQUEST_VER", "IFICATION", " now"):
+            yield {"type": "content", "delta": delta}
+        yield {"type": "usage", "input_tokens": 3, "output_tokens": 4}
+
+
+def test_headless_turn_matches_the_streamed_turn():
+    registry = ModelRegistry()
+    registry._providers["anthropic"] = ChunkedProvider()
+    llm_service = LLMService(registry=registry, cassette=None)
+    agent_config = AgentConfig(system_prompt="s", objective="o", model="claude-3-haiku-20240307")
+
+    async def streamed():
+        agent = Agent(AgentRole.CANDIDATE, agent_config, llm_service)
+        chunks = [chunk async for chunk in agent.generate_response_stream("hi")]
+        return agent, chunks
+
+    agent, chunks = asyncio.run(streamed())
+    assert [chunk["should_verify"] for chunk in chunks if "delta" in chunk] == [False, False, True, True]
+
+    headless = Agent(AgentRole.CANDIDATE, agent_config, llm_service)
+    content, reasoning, should_verify, usage = asyncio.run(headless.complete_turn("hi"))
+    assert (content, reasoning, should_verify) == ("Done. REQUEST_VERIFICATION now", "thinking", True)
+    assert usage == {"input_tokens": 3, "output_tokens": 4}
+    assert headless.get_conversation_history() == agent.get_conversation_history()
+    assert headless.get_reasoning_traces() == agent.get_reasoning_traces() == ["thinking"]
+
+
+def test_run_duration_excludes_time_before_the_run(tmp_path):
+    simulations, _ = orchestrator(delay=0)
+    simulation_id = simulations.create_simulation(config(max_turns=2))
+    # Created an hour before anyone ran it
+    state = simulations.get_simulation(simulation_id)
+    state.created_at -= timedelta(hours=1)
+
+    run(simulations, simulation_id, headless=True)
+    assert state.created_at < state.started_at <= state.finished_at <= datetime.now()
+
+    store = ResultsStore(str(tmp_path / "results.db"))
+    store.record(state)
+    group, = store.aggregate({}, [])["groups"]
+    assert group["runs"] == 1
+    assert 0 <= group["avg_duration_seconds"] < 60
+    store.close()
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
+
+from app.agents import SimulationOrchestrator
+from app.models import SimulationConfig, SimulationStatus, TerminationReason
+from app.run_batch import BatchRunner, load_checkpoint, truncate_partial_line
+
+
+class ScriptedOrchestrator(SimulationOrchestrator):
+    """Completes every simulation at once, except objectives listed in `failing`"""
+
+    def __init__(self, failing=()):
+        super().__init__()
+        self.failing = set(failing)
+        self.ran = []
+
+    async def run_simulation(self, simulation_id, headless=False):
+        state = self.get_simulation(simulation_id)
+        objective = state.config.candidate_config.objective
+        self.ran.append(objective)
+        if objective in self.failing:
+            raise RuntimeError(f"{objective} failed")
+        state.status = SimulationStatus.COMPLETED
+        state.termination_reason = TerminationReason.MAX_TURNS
+        return
+        yield
+
+
+def write_configs(path, count):
+    with open(path, "w", encoding="utf-8") as f:
+        for line in range(1, count + 1):
+            config = SimulationConfig(
+                candidate_config={"system_prompt": "s", "objective": f"line {line}"},
+                sim_config={"system_prompt": "s", "objective": "o"},
+                verification_prompt="v"
+            )
+            f.write(config.model_dump_json() + "\n")
+
+
+def run(tmp_path, orchestrator, retry_failed=False):
+    runner = BatchRunner(
+        str(tmp_path / "configs.jsonl"),
+        str(tmp_path / "results.jsonl"),
+        orchestrator=orchestrator,
+        retry_failed=retry_failed
+    )
+    asyncio.run(runner.run())
+    return runner
+
+
+def results(tmp_path):
+    with open(tmp_path / "results.jsonl", "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_truncate_partial_line(tmp_path):
+    path = tmp_path / "out"
+    path.write_bytes(b"one\ntwo\nthr")
+    truncate_partial_line(str(path))
+    assert path.read_bytes() == b"one\ntwo\n"
+
+    # A partial line longer than one read block, with no complete line before it
+    path.write_bytes(b"x" * (200 * 1024))
+    truncate_partial_line(str(path))
+    assert path.read_bytes() == b""
+
+    truncate_partial_line(str(tmp_path / "missing"))
+
+
+def test_resume_after_interrupted_write(tmp_path):
+    write_configs(tmp_path / "configs.jsonl", 4)
+    run(tmp_path, ScriptedOrchestrator())
+    checkpoint_path = tmp_path / "results.jsonl.checkpoint"
+    output_path = tmp_path / "results.jsonl"
+
+    # Crash while writing: line 3's result reached the output but only part of
+    # its checkpoint entry did, and line 4's result was cut off mid-line
+    checkpoint = checkpoint_path.read_text().splitlines(keepends=True)
+    by_line = {int(entry.split("\t")[0]): entry for entry in checkpoint}
+    checkpoint_path.write_text(by_line[1] + by_line[2] + by_line[3][:3])
+    output = output_path.read_text().splitlines(keepends=True)
+    by_id = {json.loads(line)["simulation_id"]: line for line in output}
+    kept = [by_id[by_line[line].split("\t")[1]] for line in (1, 2, 3)]
+    output_path.write_text("".join(kept) + by_id[by_line[4].split("\t")[1]][:40])
+
+    orchestrator = ScriptedOrchestrator()
+    runner = run(tmp_path, orchestrator)
+    assert sorted(orchestrator.ran) == ["line 3", "line 4"]
+    assert runner.skipped == 2 and runner.completed == 2
+
+    # One result per line: line 3's orphaned result was replaced, not duplicated
+    checkpointed = load_checkpoint(str(checkpoint_path))
+    assert sorted(checkpointed) == [1, 2, 3, 4]
+    assert sorted(state["simulation_id"] for state in results(tmp_path)) == sorted(
+        simulation_id for simulation_id, _ in checkpointed.values()
+    )
+
+
+def test_retry_failed_reruns_only_failed_lines(tmp_path):
+    write_configs(tmp_path / "configs.jsonl", 3)
+    run(tmp_path, ScriptedOrchestrator(failing={"line 2"}))
+    checkpoint_path = str(tmp_path / "results.jsonl.checkpoint")
+    first = load_checkpoint(checkpoint_path)
+    assert first[2][1] == SimulationStatus.FAILED.value
+
+    # A plain resume leaves the failed line alone
+    orchestrator = ScriptedOrchestrator()
+    run(tmp_path, orchestrator)
+    assert orchestrator.ran == []
+
+    orchestrator = ScriptedOrchestrator()
+    runner = run(tmp_path, orchestrator, retry_failed=True)
+    assert orchestrator.ran == ["line 2"]
+    assert runner.skipped == 2 and runner.completed == 1
+
+    # The checkpoint keeps the latest attempt and the failed result is replaced
+    checkpointed = load_checkpoint(checkpoint_path)
+    assert checkpointed[2][1] == SimulationStatus.COMPLETED.value
+    assert checkpointed[2][0] != first[2][0]
+    states = {state["simulation_id"]: state for state in results(tmp_path)}
+    assert sorted(states) == sorted(simulation_id for simulation_id, _ in checkpointed.values())
+    assert all(state["status"] == SimulationStatus.COMPLETED.value for state in states.values())
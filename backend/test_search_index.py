@@ -0,0 +1,47 @@
+import os
+import threading
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
+
+from app.models import Message, MessageRole
+from app.storage import TranscriptIndex
+
+
+def message(turn_number, content):
+    return Message(role=MessageRole.CANDIDATE, content=content, turn_number=turn_number)
+
+
+def test_search_sees_flushed_messages(tmp_path):
+    index = TranscriptIndex(str(tmp_path / "search.db"), flush_every=100)
+    index.add_message("sim-1", message(1, "the quick brown fox"))
+    assert index.search("fox") == []
+
+    index.flush()
+    results = index.search("fox")
+    assert [(result["simulation_id"], result["turn_number"]) for result in results] == [("sim-1", 1)]
+    assert "<mark>fox</mark>" in results[0]["content_snippet"]
+    index.close()
+
+
+def test_flush_does_not_wait_for_a_running_search(tmp_path):
+    index = TranscriptIndex(str(tmp_path / "search.db"), flush_every=100)
+    index.add_message("sim-1", message(1, "first"))
+    index.flush()
+
+    # A search in progress in a worker thread holds the reader
+    with index._read_lock:
+        flushed = threading.Event()
+
+        def write():
+            index.add_message("sim-1", message(2, "second"))
+            index.flush()
+            flushed.set()
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        assert flushed.wait(timeout=5), "flush blocked on the search"
+        writer.join()
+
+    assert len(index.search("second")) == 1
+    index.close()
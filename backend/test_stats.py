@@ -0,0 +1,106 @@
+import math
+
+import numpy as np
+
+from app.stats import pass_at_k, paired_comparison, wilson_interval
+
+
+def comb_pass_at_k(n: int, c: int, k: int) -> float:
+    return 1.0 - math.comb(n - c, k) / math.comb(n, k)
+
+
+def test_pass_at_k_matches_binomial_formula():
+    cases = [(n, c) for n in range(1, 13) for c in range(0, n + 1)]
+    samples = [n for n, _ in cases]
+    successes = [c for _, c in cases]
+    estimates = pass_at_k(samples, successes)
+    for row, (n, c) in enumerate(cases):
+        for k in range(1, n + 1):
+            assert math.isclose(estimates[row, k - 1], comb_pass_at_k(n, c, k), abs_tol=1e-12)
+
+
+def test_pass_at_k_large_n_stays_exact():
+    estimate = pass_at_k([2000], [3], [100])[0, 0]
+    assert math.isclose(estimate, comb_pass_at_k(2000, 3, 100), rel_tol=1e-9)
+
+
+def test_pass_at_k_edge_cases():
+    # No runs: nothing to estimate
+    assert np.isnan(pass_at_k([0], [0], [1])[0, 0])
+    # Every run passed
+    assert np.all(pass_at_k([5], [5], [1, 3, 5]) == 1.0)
+    # No run passed
+    assert np.all(pass_at_k([5], [0], [1, 3, 5]) == 0.0)
+    # k > n is undefined
+    estimates = pass_at_k([3, 10], [1, 1], [5])
+    assert np.isnan(estimates[0, 0])
+    assert math.isclose(estimates[1, 0], comb_pass_at_k(10, 1, 5))
+
+
+def test_pass_at_k_rejects_bad_counts():
+    for samples, successes, ks in (([3], [4], None), ([3], [-1], None), ([3], [1], [0])):
+        try:
+            pass_at_k(samples, successes, ks)
+            assert False, "accepted invalid input"
+        except ValueError:
+            pass
+
+
+def test_wilson_scalar_bounds():
+    z2 = 1.959963984540054 ** 2
+    low, high = wilson_interval(0, 10, 0.95)
+    assert math.isclose(float(low), 0.0, abs_tol=1e-12) and math.isclose(float(high), z2 / (10 + z2))
+    low, high = wilson_interval(10, 10, 0.95)
+    assert math.isclose(float(low), 10 / (10 + z2)) and math.isclose(float(high), 1.0)
+    assert tuple(map(float, wilson_interval(0, 0, 0.95))) == (0.0, 1.0)
+
+
+def test_sweep_records_the_stats_module_interval():
+    import asyncio
+    from app.agents import AdaptiveSweep
+    from app.models import SimulationConfig, SimulationState, SimulationStatus, SweepRequest, VerificationResult
+    from app.stats import wilson_pass_at_k_interval
+
+    config = SimulationConfig(
+        candidate_config={"system_prompt": "s", "objective": "o"},
+        sim_config={"system_prompt": "s", "objective": "o"},
+        verification_prompt="v"
+    )
+    sweep = AdaptiveSweep(None, SweepRequest(configs=[config], k=3, confidence=0.9))
+    result = sweep.state.results[0]
+
+    async def finished(success):
+        return SimulationState(
+            simulation_id="s", config=config, status=SimulationStatus.COMPLETED,
+            verification_result=VerificationResult(success=success, explanation="")
+        )
+
+    async def record_all():
+        for success in (True, False, False, True, False):
+            task = asyncio.create_task(finished(success))
+            await task
+            sweep._record(result, task)
+
+    asyncio.run(record_all())
+    low, high = wilson_interval(2, 5, 0.9)
+    assert (result.ci_low, result.ci_high) == (float(low), float(high))
+    k_low, k_high = wilson_pass_at_k_interval([5], [2], [3], 0.9)
+    assert math.isclose(result.pass_at_k_low, k_low[0, 0]) and math.isclose(result.pass_at_k_high, k_high[0, 0])
+
+
+def test_paired_comparison_blocks_units(monkeypatch):
+    rng = np.random.default_rng(0)
+    samples = np.full((2, 300), 8)
+    successes_a = rng.integers(0, 9, (2, 300))
+    successes_b = np.clip(successes_a - rng.integers(0, 3, (2, 300)), 0, 8)
+
+    whole = paired_comparison(samples, successes_a, samples, successes_b, resamples=500, seed=1)
+    import app.stats.estimators as estimators
+    monkeypatch.setattr(estimators, "BLOCK_CELLS", 500 * 7)
+    blocked = paired_comparison(samples, successes_a, samples, successes_b, resamples=500, seed=1)
+
+    assert np.allclose(whole["mean_difference"], blocked["mean_difference"])
+    assert np.all(blocked["ci_low"] <= blocked["mean_difference"])
+    assert np.all(blocked["mean_difference"] <= blocked["ci_high"])
+    assert np.allclose(whole["ci_low"], blocked["ci_low"], atol=0.01)
+    assert np.all(blocked["p_value"] < 0.01)
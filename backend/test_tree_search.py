@@ -0,0 +1,158 @@
+import asyncio
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
+
+from app.agents.tree_search import TreeSearch
+from app.models import (
+    ExplorationRequest,
+    ExplorationStatus,
+    ExplorationStrategy,
+    SimulationConfig,
+    VerificationResult
+)
+
+TOKENS_PER_CALL = 10
+
+
+class FakeAgent:
+    def __init__(self, search, contents, verify):
+        self.search = search
+        self.contents = contents
+        self.verify = verify
+
+    async def sample_responses(self, n, last_message):
+        await self.search.enter()
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.search.leave()
+        usage = {"input_tokens": TOKENS_PER_CALL, "output_tokens": 0}
+        return [(self.contents[i % len(self.contents)], None, self.verify) for i in range(n)], usage
+
+
+class FakeVerifier:
+    def __init__(self, search, judge):
+        self.search = search
+        self.judge = judge
+        self.calls = 0
+
+    async def verify_stream(self, conversation_history, **kwargs):
+        self.calls += 1
+        await self.search.enter()
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.search.leave()
+        yield {"type": "usage", "input_tokens": TOKENS_PER_CALL, "output_tokens": 0}
+        success = self.judge(conversation_history)
+        if success is not None:
+            yield {"type": "result", "result": VerificationResult(success=success, explanation="")}
+
+
+class FakeOrchestrator:
+    """Candidate and sim agents with canned responses, and a scripted judge"""
+
+    def __init__(self, candidate_contents=("a", "b"), candidate_verifies=False, judge=None):
+        self.candidate_contents = candidate_contents
+        self.candidate_verifies = candidate_verifies
+        self.verifier = FakeVerifier(self, judge or (lambda history: False))
+        self.expanded_depths = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def enter(self):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def leave(self):
+        self.in_flight -= 1
+
+    def replay_agents(self, config, messages):
+        self.expanded_depths.append(len(messages))
+        return (
+            FakeAgent(self, self.candidate_contents, self.candidate_verifies),
+            FakeAgent(self, ("reply",), False)
+        )
+
+
+def exploration(**kwargs):
+    config = SimulationConfig(
+        candidate_config={"system_prompt": "s", "objective": "o"},
+        sim_config={"system_prompt": "s", "objective": "o"},
+        verification_prompt="v",
+        max_turns=kwargs.pop("max_turns", 5)
+    )
+    options = dict(config=config, branching=2, concurrency=1, token_budget=100_000)
+    options.update(kwargs)
+    return ExplorationRequest(**options)
+
+
+def test_breadth_expands_shallowest_first():
+    orchestrator = FakeOrchestrator()
+    search = TreeSearch(orchestrator, exploration(strategy=ExplorationStrategy.BREADTH, max_turns=3))
+    state = asyncio.run(search.run())
+
+    assert state.status == ExplorationStatus.COMPLETED
+    assert orchestrator.expanded_depths == sorted(orchestrator.expanded_depths)
+    # Full tree: 2 + 2 + 4 nodes below the root, 4 leaves at max_turns
+    assert len(state.nodes) == 9
+    assert state.leaves == 4
+
+
+def test_mcts_focuses_on_the_target_outcome():
+    # Every conversation that opened with "a" fails; the target is failure
+    judge = lambda history: history[0].content == "b"
+    request = exploration(strategy=ExplorationStrategy.MCTS, max_turns=7, max_leaves=12, exploration_weight=0.1)
+    search = TreeSearch(FakeOrchestrator(judge=judge), request)
+    state = asyncio.run(search.run())
+
+    first_a, first_b = (state.nodes[child_id] for child_id in state.nodes[0].children)
+    assert (first_a.message.content, first_b.message.content) == ("a", "b")
+    assert first_a.hits == first_a.visits
+    assert first_b.hits == 0
+    assert first_a.visits > first_b.visits
+    assert state.hits == first_a.hits
+
+
+def test_max_leaves_counts_verifications_in_flight():
+    # One expansion yields four leaves at once; only three may be verified
+    orchestrator = FakeOrchestrator(candidate_contents=("a", "b", "c", "d"), candidate_verifies=True)
+    search = TreeSearch(orchestrator, exploration(branching=4, concurrency=4, max_leaves=3))
+    state = asyncio.run(search.run())
+
+    assert state.status == ExplorationStatus.COMPLETED
+    assert state.leaves == 3
+    assert orchestrator.verifier.calls == 3
+    assert all(node.verification_result is None for node in state.nodes[4:])
+
+
+def test_concurrency_bounds_expansions_and_verifications():
+    orchestrator = FakeOrchestrator(candidate_contents=("a", "b", "c", "d"), candidate_verifies=True)
+    search = TreeSearch(orchestrator, exploration(branching=4, concurrency=2))
+    state = asyncio.run(search.run())
+
+    assert state.leaves == 4
+    assert orchestrator.max_in_flight == 2
+
+
+def test_token_budget_stops_new_expansions():
+    orchestrator = FakeOrchestrator()
+    request = exploration(strategy=ExplorationStrategy.BREADTH, token_budget=3 * TOKENS_PER_CALL)
+    state = asyncio.run(TreeSearch(orchestrator, request).run())
+
+    assert state.status == ExplorationStatus.COMPLETED
+    assert len(orchestrator.expanded_depths) == 3
+    assert state.usage.input_tokens == 3 * TOKENS_PER_CALL
+
+
+def test_verification_without_result_fails_only_the_leaf():
+    orchestrator = FakeOrchestrator(candidate_verifies=True, judge=lambda history: None)
+    search = TreeSearch(orchestrator, exploration(strategy=ExplorationStrategy.BREADTH))
+    state = asyncio.run(search.run())
+
+    assert state.status == ExplorationStatus.COMPLETED
+    assert state.leaves == 0
+    assert state.nodes[0].error is None
+    assert [node.error for node in state.nodes[1:]] == ["Verification ended without a result"] * 2
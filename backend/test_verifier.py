@@ -0,0 +1,75 @@
+import asyncio
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
+
+from app.models import JudgeConfig, Message, MessageRole
+from app.services import LLMService
+from app.services.providers import ModelRegistry, Provider
+from app.verification.verifier import Verifier
+
+
+class JudgeProvider(Provider):
+    """Answers every judge call with a fixed verdict and fixed usage"""
+    name = "anthropic"
+
+    def __init__(self, verdict="YES"):
+        self.verdict = verdict
+
+    async def generate(self, model, system_prompt, messages, temperature, max_tokens):
+        return f"SUCCESS: {self.verdict}\nEXPLANATION: because", None
+
+    async def sample(self, model, system_prompt, messages, temperature, max_tokens, n):
+        content, reasoning = await self.generate(model, system_prompt, messages, temperature, max_tokens)
+        return [(content, reasoning)] * n, {"input_tokens": 100 * n, "output_tokens": 10 * n}
+
+    async def stream(self, model, system_prompt, messages, temperature, max_tokens):
+        yield {"type": "content", "delta": f"SUCCESS: {self.verdict}\nEXPLANATION: because"}
+        yield {"type": "usage", "input_tokens": 100, "output_tokens": 10}
+
+
+def verifier():
+    registry = ModelRegistry()
+    registry._providers["anthropic"] = JudgeProvider()
+    return Verifier(LLMService(registry=registry, cassette=None))
+
+
+HISTORY = [Message(role=MessageRole.CANDIDATE, content="done", turn_number=1)]
+JUDGES = [JudgeConfig(model="claude-3-haiku-20240307", temperature=t) for t in (0.0, 0.5, 1.0)]
+
+
+def test_generate_response_reports_and_records_usage():
+    llm_service = verifier().llm_service
+    content, _, usage = asyncio.run(llm_service.generate_response(
+        model="claude-3-haiku-20240307", system_prompt="s", messages=[{"role": "user", "content": "hi"}]
+    ))
+
+    assert content.startswith("SUCCESS: YES")
+    assert usage == {"input_tokens": 100, "output_tokens": 10}
+    assert llm_service.token_usage.total() == 110
+
+
+def test_ensemble_stream_reports_judge_usage():
+    judge = verifier()
+
+    async def collect():
+        return [event async for event in judge.verify_stream("objective", "criteria", HISTORY, judges=JUDGES)]
+
+    events = asyncio.run(collect())
+    usage = [event for event in events if event["type"] == "usage"]
+    result = events[-1]["result"]
+
+    assert result.success
+    # Two agreeing judges decide a majority of three; the third is cancelled
+    answered = sum(1 for vote in result.votes if vote.success is not None)
+    assert usage == [{"type": "usage", "input_tokens": 100 * answered, "output_tokens": 10 * answered}]
+    assert judge.llm_service.token_usage.total() == 110 * answered
+
+
+def test_single_judge_verify_records_usage():
+    judge = verifier()
+    result = asyncio.run(judge.verify("objective", "criteria", HISTORY, model="claude-3-haiku-20240307"))
+
+    assert result.success
+    assert judge.llm_service.token_usage.total() == 110
@@ -14,6 +14,7 @@ interface SimulationRunProps {
   currentSpeaker: MessageRole | null;
   streamingContent: { candidate: string; sim: string };
   streamingReasoning: { candidate: string; sim: string };
+  onCancel?: () => void;
 }
 
 export default function SimulationRun({
@@ -25,6 +26,7 @@ export default function SimulationRun({
   currentSpeaker,
   streamingContent,
   streamingReasoning,
+  onCancel,
 }: SimulationRunProps) {
   return (
     <div className="border-2 rounded-lg p-4 bg-white">
@@ -42,9 +44,19 @@ export default function SimulationRun({
           </span>
         )}
         {isRunning && !verificationResult && (
-          <span className="px-3 py-1 rounded-full text-sm font-semibold bg-yellow-100 text-yellow-700">
-            ⏳ Running...
-          </span>
+          <div className="flex items-center gap-2">
+            <span className="px-3 py-1 rounded-full text-sm font-semibold bg-yellow-100 text-yellow-700">
+              ⏳ Running...
+            </span>
+            {onCancel && (
+              <button
+                onClick={onCancel}
+                className="px-3 py-1 rounded text-sm font-semibold bg-red-600 hover:bg-red-700 text-white"
+              >
+                Stop
+              </button>
+            )}
+          </div>
         )}
       </div>
 
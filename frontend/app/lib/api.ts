@@ -69,6 +69,16 @@ export class SimulationAPI {
     }
   }
 
+  static async cancelSimulation(simulationId: string): Promise<void> {
+    const response = await fetch(`${API_BASE_URL}/simulations/${simulationId}/cancel`, {
+      method: 'POST',
+    });
+
+    if (!response.ok) {
+      throw new Error(`Failed to cancel simulation: ${response.statusText}`);
+    }
+  }
+
   static async updateMessage(
     simulationId: string,
     turnNumber: number,
@@ -114,3 +124,77 @@ export class SimulationAPI {
     return response.json();
   }
 }
+
+/**
+ * One WebSocket carrying the event streams of many simulations.
+ * Each events() call subscribes to one simulation; iteration ends with the run.
+ */
+export class SimulationSocket {
+  private socket: WebSocket | null = null;
+  private opening: Promise<WebSocket> | null = null;
+  private listeners = new Map<string, (event: StreamEvent | null) => void>();
+
+  private connect(): Promise<WebSocket> {
+    if (this.opening) return this.opening;
+
+    this.opening = new Promise((resolve, reject) => {
+      const socket = new WebSocket(`${API_BASE_URL.replace(/^http/, 'ws')}/ws`);
+      socket.onopen = () => resolve(socket);
+      socket.onerror = () => reject(new Error('Failed to open simulation socket'));
+      socket.onclose = () => {
+        this.socket = null;
+        this.opening = null;
+        // End every open stream
+        this.listeners.forEach((listener) => listener(null));
+        this.listeners.clear();
+      };
+      socket.onmessage = (message) => {
+        const frame = JSON.parse(message.data);
+        if (frame.type === 'events') {
+          for (const event of frame.events as StreamEvent[]) {
+            this.listeners.get(event.simulation_id)?.(event);
+          }
+        } else if (frame.type === 'error' && frame.simulation_id) {
+          this.listeners.get(frame.simulation_id)?.({ type: 'error', message: frame.message });
+          this.listeners.get(frame.simulation_id)?.(null);
+        }
+      };
+      this.socket = socket;
+    });
+    return this.opening;
+  }
+
+  async *events(simulationId: string): AsyncGenerator<StreamEvent> {
+    const buffered: (StreamEvent | null)[] = [];
+    let wake: (() => void) | null = null;
+    this.listeners.set(simulationId, (event) => {
+      buffered.push(event);
+      wake?.();
+    });
+
+    const socket = await this.connect();
+    socket.send(JSON.stringify({ action: 'subscribe', simulation_ids: [simulationId] }));
+
+    try {
+      while (true) {
+        if (buffered.length === 0) {
+          await new Promise<void>((resolve) => (wake = resolve));
+          wake = null;
+        }
+        const event = buffered.shift();
+        if (event === null || event === undefined) return;
+        yield event;
+        if (['simulation_complete', 'simulation_cancelled', 'error'].includes(event.type)) return;
+      }
+    } finally {
+      this.listeners.delete(simulationId);
+      if (this.socket?.readyState === WebSocket.OPEN) {
+        this.socket.send(JSON.stringify({ action: 'unsubscribe', simulation_ids: [simulationId] }));
+      }
+    }
+  }
+
+  close() {
+    this.socket?.close();
+  }
+}
@@ -2,7 +2,7 @@
 
 import { useState } from 'react';
 import { SimulationConfig, MessageRole, Message, VerificationResult } from './types/simulation';
-import { SimulationAPI } from './lib/api';
+import { SimulationAPI, SimulationSocket } from './lib/api';
 import ConfigPanel from './components/ConfigPanel';
 import SimulationRun from './components/SimulationRun';
 
@@ -43,6 +43,9 @@ export default function Home() {
       }
       setRuns(initialRuns);
 
+      // All runs stream over one multiplexed WebSocket
+      const socket = new SimulationSocket();
+
       // Run all simulations in parallel - COMPLETELY ISOLATED
       const runPromises = initialRuns.map(async (run, index) => {
         try {
@@ -57,7 +60,8 @@ export default function Home() {
           });
 
           // Run this simulation and update ONLY this run's state
-          for await (const event of SimulationAPI.runSimulation(simulation_id)) {
+          let verificationText = '';
+          for await (const event of socket.events(simulation_id)) {
             switch (event.type) {
               case 'turn_start':
                 setRuns((prev) => {
@@ -116,6 +120,72 @@ export default function Home() {
                 });
                 break;
 
+              case 'snapshot':
+                // Sent instead of a backlog of events (slow connection or joining mid-run)
+                verificationText = event.verification?.text ?? '';
+                setRuns((prev) => {
+                  const updated = [...prev];
+                  const streaming = event.streaming;
+                  const verification = event.verification;
+                  updated[index] = {
+                    ...updated[index],
+                    messages: event.state.messages as Message[],
+                    currentSpeaker: streaming
+                      ? (streaming.speaker === 'candidate' ? MessageRole.CANDIDATE : MessageRole.SIM)
+                      : null,
+                    streamingContent: {
+                      candidate: streaming?.speaker === 'candidate' ? streaming.content : '',
+                      sim: streaming?.speaker === 'sim' ? streaming.content : '',
+                    },
+                    streamingReasoning: {
+                      candidate: streaming?.speaker === 'candidate' ? streaming.reasoning : '',
+                      sim: streaming?.speaker === 'sim' ? streaming.reasoning : '',
+                    },
+                    verificationResult: verification && verification.success !== null
+                      ? {
+                          success: verification.success,
+                          explanation: verificationText.split(/EXPLANATION:/i)[1]?.trim() ?? '',
+                          timestamp: new Date().toISOString(),
+                        }
+                      : (event.state.verification_result as VerificationResult | null) ?? null,
+                  };
+                  return updated;
+                });
+                break;
+
+              case 'verification_verdict':
+                // Show the verdict while the judge is still explaining it
+                setRuns((prev) => {
+                  const updated = [...prev];
+                  updated[index] = {
+                    ...updated[index],
+                    verificationResult: {
+                      success: event.success,
+                      explanation: '',
+                      timestamp: new Date().toISOString(),
+                    },
+                  };
+                  return updated;
+                });
+                break;
+
+              case 'verification_delta':
+                verificationText += event.delta;
+                setRuns((prev) => {
+                  const current = prev[index].verificationResult;
+                  if (!current) return prev;
+                  const updated = [...prev];
+                  updated[index] = {
+                    ...updated[index],
+                    verificationResult: {
+                      ...current,
+                      explanation: verificationText.split(/EXPLANATION:/i)[1]?.trim() ?? '',
+                    },
+                  };
+                  return updated;
+                });
+                break;
+
               case 'verification_complete':
                 setRuns((prev) => {
                   const updated = [...prev];
@@ -139,8 +209,11 @@ export default function Home() {
                 });
                 break;
 
+              case 'simulation_cancelled':
               case 'error':
-                console.error(`Run ${index + 1} error:`, event.message);
+                if (event.type === 'error') {
+                  console.error(`Run ${index + 1} error:`, event.message);
+                }
                 setRuns((prev) => {
                   const updated = [...prev];
                   updated[index] = {
@@ -168,6 +241,7 @@ export default function Home() {
 
       // Wait for all runs to complete
       await Promise.all(runPromises);
+      socket.close();
       setIsAnyRunning(false);
     } catch (error) {
       console.error('Failed to start simulations:', error);
@@ -176,6 +250,16 @@ export default function Home() {
     }
   };
 
+  const handleCancelRun = async (simulationId: string) => {
+    try {
+      // The run ends with a simulation_cancelled event on its stream
+      await SimulationAPI.cancelSimulation(simulationId);
+    } catch (error) {
+      // Most likely it finished in the meantime
+      console.error(`Failed to cancel simulation ${simulationId}:`, error);
+    }
+  };
+
   // Calculate pass@k statistics
   const completedRuns = runs.filter((r) => r.verificationResult !== null);
   const passedRuns = completedRuns.filter((r) => r.verificationResult?.success);
@@ -231,6 +315,7 @@ export default function Home() {
                 currentSpeaker={run.currentSpeaker}
                 streamingContent={run.streamingContent}
                 streamingReasoning={run.streamingReasoning}
+                onCancel={run.simulationId ? () => handleCancelRun(run.simulationId) : undefined}
               />
             )
           ))}
@@ -8,7 +8,8 @@ export enum SimulationStatus {
   IDLE = "idle",
   RUNNING = "running",
   COMPLETED = "completed",
-  FAILED = "failed"
+  FAILED = "failed",
+  CANCELLED = "cancelled"
 }
 
 export interface AgentConfig {
@@ -17,6 +18,10 @@ export interface AgentConfig {
   model: string;
   temperature: number;
   max_tokens: number;
+  hedge_after_seconds?: number;
+  hedge_adaptive?: boolean;
+  hedge_model?: string;
+  failover_models?: Record<string, string>;
 }
 
 export interface Message {
@@ -27,9 +32,27 @@ export interface Message {
   turn_number: number;
 }
 
+export interface JudgeConfig {
+  model: string;
+  temperature?: number;
+  weight?: number;
+}
+
+export interface JudgeVote {
+  model: string;
+  temperature: number;
+  weight: number;
+  success?: boolean;
+  explanation?: string;
+  cancelled: boolean;
+  error?: string;
+}
+
 export interface VerificationResult {
   success: boolean;
   explanation: string;
+  votes?: JudgeVote[];
+  version?: string;
   timestamp: string;
 }
 
@@ -39,17 +62,29 @@ export interface SimulationConfig {
   verification_prompt: string;
   max_turns: number;
   first_speaker: MessageRole;
+  turn_timeout_seconds?: number;
+  timeout_seconds?: number;
+  loop_similarity_threshold?: number;
+  loop_window?: number;
+  loop_patience?: number;
+  judges?: JudgeConfig[];
+  judge_vote?: 'majority' | 'weighted';
 }
 
 export interface SimulationState {
   simulation_id: string;
   config: SimulationConfig;
+  config_hash?: string;
   status: SimulationStatus;
   messages: Message[];
   current_turn: number;
+  termination_reason?: string;
   verification_result?: VerificationResult;
+  rescores?: Record<string, VerificationResult>;
   created_at: string;
   updated_at: string;
+  started_at?: string;
+  finished_at?: string;
 }
 
 export interface StreamEvent {